@@ -0,0 +1,89 @@
+"""
+Микробенчмарк разбора и диспетчеризации команды: текстовый протокол
+(ProcessManager.handle_command + форматирование ответа) против бинарного
+(BinaryCommandHandler.handle). Дополнительно проверяется конвейерная
+отправка бинарных запросов через NetworkModule с сопоставлением ответов по request_id.
+
+Запуск: python benchmarks/bench_binary_protocol.py
+"""
+import socket
+import timeit
+
+from common import make_workspace, quiet_logger
+from main_process import binary_protocol as bp
+from main_process.network_module import NetworkModule
+from main_process.process_manager import ProcessManager
+
+ITERATIONS = 20000
+PIPELINE = 1000
+WINDOW = 128
+
+
+def format_text_response(response):
+    success, message = response
+    return f"{'SUCCESS' if success else 'ERROR'}: {message}".encode('utf-8')
+
+
+def main():
+    names = [f'proc{i}' for i in range(12)]
+    config_manager = make_workspace(
+        scripts={name: 'import time\ntime.sleep(60)\n' for name in names},
+        processes={name: {'enable': 'false', 'type': 'hello'} for name in names},
+    )
+    logger = quiet_logger()
+    process_manager = ProcessManager(logger=logger, config_manager=config_manager)
+    handler = bp.BinaryCommandHandler(process_manager, logger=logger)
+
+    cases = [
+        ('status proc3', bp.encode_request(bp.OP_STATUS, 1, 'proc3')),
+        ('status processes', bp.encode_request(bp.OP_STATUS_ALL, 2)),
+        ('stop proc3', bp.encode_request(bp.OP_STOP, 3, 'proc3')),
+    ]
+    for text, frame in cases:
+        text_time = timeit.timeit(
+            lambda: format_text_response(process_manager.handle_command(text)), number=ITERATIONS)
+        binary_time = timeit.timeit(lambda: handler.handle(frame), number=ITERATIONS)
+        print(f"{text:<18} текст: {text_time / ITERATIONS * 1e6:7.2f} мкс  "
+              f"бинарный: {binary_time / ITERATIONS * 1e6:7.2f} мкс  "
+              f"ускорение x{text_time / binary_time:.1f}")
+
+    server = NetworkModule(host='127.0.0.1', port=0, logger=logger,
+                           command_handler=process_manager.handle_command,
+                           target_resolver=process_manager.command_target,
+                           binary_handler=handler)
+    server.start()
+    address = server.socket.getsockname()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sock.settimeout(2)
+
+    # Окно неподтвержденных запросов меньше приемного буфера сервера
+    pending = set()
+    received = reordered = 0
+    last_id = -1
+    next_id = 0
+    try:
+        while received < PIPELINE:
+            while next_id < PIPELINE and len(pending) < WINDOW:
+                name = names[next_id % len(names)]
+                sock.sendto(bp.encode_request(bp.OP_STATUS, next_id, name), address)
+                pending.add(next_id)
+                next_id += 1
+            frame = bp.decode_frame(sock.recv(2048))
+            pending.discard(frame.request_id)
+            received += 1
+            reordered += frame.request_id < last_id
+            last_id = frame.request_id
+    except socket.timeout:
+        pass
+    sock.sendto(b'status processes', address)
+    text_reply = sock.recv(4096).decode('utf-8')
+    server.stop()
+
+    print(f"Конвейер: {received}/{PIPELINE} ответов сопоставлено по request_id, "
+          f"из них пришло не по порядку: {reordered}")
+    print(f"Текстовый протокол на том же порту: {text_reply.splitlines()[0]}")
+
+
+if __name__ == '__main__':
+    main()
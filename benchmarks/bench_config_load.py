@@ -0,0 +1,102 @@
+"""
+Загрузка конфигурации: разбор cfg.ini против снимка .cfg.ini.cache.
+
+Конфигурация проекта (cfg.ini) копируется во временный каталог.
+Замеряются:
+- импорт ConfigManager и load_config() в отдельном процессе (как при
+  запуске main.py): разбор файла (снимка нет) и загрузка из снимка;
+  при разборе в измеренное время входит импорт configparser;
+- load_config() в одном процессе (модули уже импортированы): разбор
+  с проверкой схем и загрузка из снимка;
+- доступ к параметрам: get_process_config()[...] со строками против
+  полей схемы get_process_schema().
+
+Запуск: python benchmarks/bench_config_load.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from common import ROOT_DIR, make_workspace, percentiles
+from main_process.cfg import ConfigManager
+
+ROUNDS = 30
+ACCESSES = 100000
+
+# asyncio, logging и json main.py импортирует в любом случае (NetworkModule, Supervisor, логгер)
+LOAD = ("import asyncio, json, logging, time; started = time.perf_counter(); "
+        "from main_process.cfg import ConfigManager; "
+        "ConfigManager('cfg.ini', use_cache={cache}).load_config(); "
+        "print(time.perf_counter() - started)")
+
+
+def subprocess_load(cache):
+    samples = []
+    for _ in range(ROUNDS):
+        if not cache and os.path.exists('.cfg.ini.cache'):
+            os.unlink('.cfg.ini.cache')
+        output = subprocess.run([sys.executable, "-c", LOAD.format(cache=cache)],
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.split()[-1]))
+    return percentiles(samples)
+
+
+def in_process_load(cache):
+    samples = []
+    for _ in range(ROUNDS):
+        manager = ConfigManager('cfg.ini', use_cache=cache)
+        started = time.perf_counter()
+        manager.load_config()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def access(manager):
+    started = time.perf_counter()
+    for _ in range(ACCESSES):
+        process_config = manager.get_process_config('fft')
+        int(process_config.get('window_size', 4096))
+        float(process_config.get('overlap', 0.5))
+        str(process_config.get('ready', '')).lower() == 'notify'
+    strings = (time.perf_counter() - started) / ACCESSES
+
+    started = time.perf_counter()
+    for _ in range(ACCESSES):
+        schema = manager.get_process_schema('fft')
+        schema.window_size
+        schema.overlap
+        schema.notify
+    typed = (time.perf_counter() - started) / ACCESSES
+    return strings, typed
+
+
+def main():
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    make_workspace(scripts={}, processes={})
+    shutil.copy(os.path.join(ROOT_DIR, 'cfg.ini'), 'cfg.ini')
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        results = [
+            ("процесс, разбор", subprocess_load(False)),
+            ("процесс, снимок", subprocess_load(True)),
+            ("в процессе, разбор", in_process_load(False)),
+            ("в процессе, снимок", in_process_load(True)),
+        ]
+        manager = ConfigManager('cfg.ini')
+        manager.load_config()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    for title, stats in results:
+        print(f"[{title:<19}] load_config p50 {stats['p50'] * 1000:6.2f} мс, p99 {stats['p99'] * 1000:6.2f} мс")
+    strings, typed = access(manager)
+    print(f"параметры fft: строки {strings * 1e6:.2f} мкс, схема {typed * 1e6:.2f} мкс на обращение")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Частичная перезагрузка ADAU1761 по теневой копии регистров (utils/dsp_shadow.py)
+на программной модели шины FakeSMBus (400 кГц).
+
+Конфигурация - default_download, дополненная полным ОЗУ параметров
+(1024 слова) и ОЗУ программы (1024 слова), чтобы размер был как у
+реального проекта SigmaStudio. Для каждого сценария изменений выводится
+время сравнения, время шины и число транзакций в сравнении с полной
+загрузкой, а также проверяется, что после применения содержимое модели
+совпадает с целевой конфигурацией и полностью обновленная копия не дает
+новых отличий.
+
+Запуск: python benchmarks/bench_dsp_delta.py
+"""
+import random
+import time
+
+import common  # noqa: F401  (добавляет корень проекта в sys.path)
+from utils.dsp_shadow import RegisterShadow, apply_delta, apply_overrides, default_records, is_volatile, words_of
+from utils.i2c import ADAU1761, FakeSMBus
+
+PARAM_WORDS = 1024
+PROGRAM_WORDS = 1024
+
+
+def base_records():
+    rng = random.Random(1)
+    records = default_records()
+    params = bytes(rng.randrange(256) for _ in range(PARAM_WORDS * 4))
+    program = bytes(rng.randrange(256) for _ in range(PROGRAM_WORDS * 5))
+    # Полные ОЗУ пишутся при остановленном DSP, до записи его запуска (R29)
+    run_index = next(i for i, record in enumerate(records) if record[0] == "write" and record[1] == 0x40F6)
+    return records[:run_index] + [("write", 0x0800, program), ("write", 0x0000, params)] + records[run_index:]
+
+
+def scenario(records, kind, count, rng):
+    overrides = {}
+    if kind == "param":
+        for address in rng.sample(range(8, PARAM_WORDS), count):
+            overrides[address] = bytes(rng.randrange(256) for _ in range(4))
+    elif kind == "program":
+        for address in rng.sample(range(0x0800, 0x0800 + PROGRAM_WORDS), count):
+            overrides[address] = bytes(rng.randrange(256) for _ in range(5))
+    elif kind == "control":
+        overrides[0x4019] = bytes([rng.randrange(256)])
+    return apply_overrides(records, overrides)
+
+
+def verify(bus, records):
+    target = words_of(records)
+    return all(bus.memory.get(address) == value for address, value in target.items() if not is_volatile(address))
+
+
+def main():
+    records = base_records()
+    bus = FakeSMBus()
+    programmer = ADAU1761(bus=bus)
+    shadow = RegisterShadow()
+
+    apply_delta(programmer, shadow, records)
+    full_time, full_transactions = bus.bus_time, bus.transactions
+    print(f"Полная загрузка: слов {len(words_of(records))}, время шины {full_time * 1000:.1f} мс "
+          f"(без задержки R3), транзакций {full_transactions}, проверка {'OK' if verify(bus, records) else 'ОШИБКА'}")
+
+    rng = random.Random(2)
+    for title, kind, count in (("без изменений", None, 0),
+                               ("1 регистр управления", "control", 1),
+                               ("1 параметр", "param", 1),
+                               ("10 параметров", "param", 10),
+                               ("100 параметров", "param", 100),
+                               ("1 слово программы", "program", 1),
+                               ("50 слов программы", "program", 50)):
+        target = scenario(records, kind, count, rng)
+        started_time, started_transactions = bus.bus_time, bus.transactions
+        diff_started = time.perf_counter()
+        shadow.diff(words_of(target))
+        diff_ms = (time.perf_counter() - diff_started) * 1000
+        stats = apply_delta(programmer, shadow, target)
+        bus_ms = (bus.bus_time - started_time) * 1000
+        ok = verify(bus, target) and not shadow.diff(words_of(target))
+        print(f"{title:<22}: сравнение {diff_ms:6.2f} мс, шина {bus_ms:7.2f} мс "
+              f"({bus_ms / (full_time * 1000) * 100:5.1f}% полной), транзакций {bus.transactions - started_transactions:>4}, "
+              f"блоков {stats['blocks']:>3}, safeload {stats['safeloads']:>3}, проверка {'OK' if ok else 'ОШИБКА'}")
+        records = target
+
+    # Копия, прочитанная из микросхемы, совпадает с сохраненной
+    readback = RegisterShadow()
+    readback.read_from_chip(programmer, words_of(records).keys())
+    print(f"Чтение копии из микросхемы: отличий от конфигурации {len(readback.diff(words_of(records)))}")
+
+
+if __name__ == '__main__':
+    main()
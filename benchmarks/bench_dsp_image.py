@@ -0,0 +1,94 @@
+"""
+Стоимость старта программатора DSP: получение последовательности записей
+из кода Python со списками (как default_download) и из двоичного образа
+(utils/dsp_image.py, mmap). Сравниваются текущая конфигурация и проект
+размером с полные ОЗУ программы и параметров (1024 + 1024 слова).
+Холодный старт замеряется в отдельном интерпретаторе (импорт модулей
+и получение записей; .pyc модуля со списками уже скомпилирован).
+
+Запуск: python benchmarks/bench_dsp_image.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT_DIR
+from utils.dsp_image import DspImage, write_image
+from utils.dsp_shadow import default_records
+
+RUNS = 200
+
+COLD_BUILTIN = "from utils.dsp_shadow import default_records; default_records()"
+COLD_IMAGE = "from utils.dsp_image import DspImage; DspImage({path!r}).records()"
+COLD_MODULE = "import sys; sys.path.insert(0, {directory!r}); import large_config; large_config.records()"
+
+
+def write_module(path, records):
+    """Модуль Python со списками данных в коде, как default_download."""
+    lines = ["def records():", "    return ["]
+    for record in records:
+        if record[0] == "delay":
+            lines.append(f"        ('delay', {record[1]}),")
+        else:
+            lines.append(f"        ('write', {record[1]}, bytes([{', '.join(f'0x{b:02X}' for b in record[2])}])),")
+    lines.append("    ]")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def large_records():
+    records = default_records()
+    program = bytes(index * 7 % 256 for index in range(1024 * 5))
+    params = bytes(index * 13 % 256 for index in range(1024 * 4))
+    return records + [("write", 0x0800, program), ("write", 0x0000, params)]
+
+
+def timed(function, runs=RUNS):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def cold(code, runs=10):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": ROOT_DIR})
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="popgm_dsp_")
+    path = os.path.join(directory, "default.dspimg")
+    write_image(path, default_records())
+    large_path = os.path.join(directory, "large.dspimg")
+    write_image(large_path, large_records())
+    write_module(os.path.join(directory, "large_config.py"), large_records())
+
+    def from_image():
+        image = DspImage(path)
+        image.records()
+        image.close()
+
+    print(f"Записи из default_download: {timed(default_records):8.1f} мкс")
+    print(f"Записи из образа (mmap):    {timed(from_image):8.1f} мкс (размер образа {os.path.getsize(path)} байт)")
+
+    print(f"Холодный старт, default_download: {cold(COLD_BUILTIN):6.1f} мс")
+    print(f"Холодный старт, образ:            {cold(COLD_IMAGE.format(path=path)):6.1f} мс")
+    print(f"Пустой интерпретатор:             {cold('pass'):6.1f} мс")
+
+    module_code = COLD_MODULE.format(directory=directory)
+    cold(module_code, runs=1)  # компиляция .pyc
+    print(f"Большой проект, модуль со списками: {cold(module_code):6.1f} мс")
+    print(f"Большой проект, образ ({os.path.getsize(large_path)} байт): {cold(COLD_IMAGE.format(path=large_path)):6.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Федерация супервизоров на петлевом интерфейсе.
+
+NODES экземпляров main.py запускаются в отдельных рабочих каталогах
+на портах BASE_PORT, BASE_PORT + 1, ...; каждому в [network] hosts
+перечислены остальные. Замеряются:
+- сходимость: время от запуска до момента, когда "cluster view" первого
+  узла показывает все узлы;
+- "cluster status processes" на первом узле против последовательного
+  опроса "status processes" каждого узла;
+- распространение: время от "cluster stop worker" до момента, когда вид
+  первого узла (gossip) показывает worker=Stopped на всех узлах;
+- потеря узла: после SIGKILL последнего узла - время ответа
+  "cluster status processes" (ограничено timeout) и время, через которое
+  вид помечает узел недоступным.
+
+Запуск: python benchmarks/bench_federation.py
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from common import ROOT_DIR, make_workspace, percentiles
+from main_process.fragmentation import receive_message
+
+NODES = 3
+BASE_PORT = 31700
+ROUNDS = 50
+TIMEOUT = 1.0
+GOSSIP_INTERVAL = 0.2
+PEER_TTL = 1.0
+
+SLEEPER = '''
+import time
+time.sleep(600)
+'''
+
+
+def request(port, command, timeout=5.0):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.sendto(command.encode('utf-8'), ('127.0.0.1', port))
+        return receive_message(sock, ('127.0.0.1', port), timeout=timeout).decode('utf-8')
+    finally:
+        sock.close()
+
+
+def wait_until(predicate, timeout=10.0):
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        try:
+            if predicate():
+                return time.monotonic() - started
+        except socket.timeout:
+            # Узел еще не запустил UDP-сервер
+            pass
+        time.sleep(0.01)
+    raise RuntimeError("условие не выполнено за отведенное время")
+
+
+def start_node(index):
+    port = BASE_PORT + index
+    peers = ",".join(f"127.0.0.1:{BASE_PORT + other}" for other in range(NODES) if other != index)
+    make_workspace(
+        scripts={'worker': SLEEPER},
+        processes={'worker': {'enable': 'true'}},
+        extra_sections={
+            'logging': {'log_dir': 'logs', 'log_level': 'WARNING', 'use_console': 'false'},
+            'network': {'host': '127.0.0.1', 'port': port, 'hosts': peers, 'federation': 'true',
+                        'node': f'node{index}', 'timeout': TIMEOUT, 'gossip_interval': GOSSIP_INTERVAL,
+                        'peer_ttl': PEER_TTL},
+            'output': {'capture': 'false'},
+            'reload': {'watch': 'false'},
+        },
+    )
+    return subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, 'main.py')],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def view_header(port):
+    return request(port, 'cluster view', timeout=0.5).splitlines()[0]
+
+
+def main():
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    started = time.monotonic()
+    nodes = [start_node(index) for index in range(NODES)]
+    port = BASE_PORT
+    try:
+        wait_until(lambda: view_header(port).endswith(f"доступно: {NODES}"), timeout=20.0)
+        print(f"сходимость: все {NODES} узла в виде первого через {time.monotonic() - started:.2f} с после запуска")
+
+        fan_out, sequential = [], []
+        for _ in range(ROUNDS):
+            moment = time.perf_counter()
+            reply = request(port, 'cluster status processes')
+            fan_out.append(time.perf_counter() - moment)
+            moment = time.perf_counter()
+            for index in range(NODES):
+                request(BASE_PORT + index, 'status processes')
+            sequential.append(time.perf_counter() - moment)
+        print(reply.splitlines()[0])
+        for title, samples in (("cluster status processes", fan_out), ("последовательный опрос", sequential)):
+            stats = percentiles(samples)
+            print(f"[{title:<24}] p50 {stats['p50'] * 1000:6.2f} мс, p99 {stats['p99'] * 1000:6.2f} мс")
+
+        moment = time.monotonic()
+        print(request(port, 'cluster stop worker').splitlines()[0])
+        replied = time.monotonic() - moment
+        converged = wait_until(lambda: request(port, 'cluster view').count('worker=Stopped') == NODES)
+        print(f"cluster stop worker: ответ через {replied * 1000:.1f} мс, "
+              f"вид первого узла показывает остановку на всех через {converged * 1000:.0f} мс")
+
+        # Вместе с дочерними процессами узла, иначе они останутся сиротами
+        os.killpg(nodes[-1].pid, signal.SIGKILL)
+        nodes[-1].wait()
+        killed = moment = time.monotonic()
+        reply = request(port, 'cluster status processes', timeout=TIMEOUT * 3)
+        print(f"после SIGKILL node{NODES - 1}: ответ за {(time.monotonic() - moment) * 1000:.0f} мс - "
+              f"{reply.splitlines()[0]}; {reply.splitlines()[-1]}")
+        wait_until(lambda: view_header(port).endswith(f"доступно: {NODES - 1}"))
+        print(f"узел помечен недоступным через {(time.monotonic() - killed) * 1000:.0f} мс после SIGKILL "
+              f"(peer_ttl {PEER_TTL:g} с)")
+    finally:
+        for node in nodes:
+            if node.poll() is None:
+                node.send_signal(signal.SIGTERM)
+        for node in nodes:
+            node.wait()
+
+
+if __name__ == '__main__':
+    main()
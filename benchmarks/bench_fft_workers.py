@@ -0,0 +1,93 @@
+"""
+Масштабирование пула исполнителей fft: спектров в секунду на выходе
+сборщика при 1..N исполнителях. Отсчеты пишутся в кольцевой буфер adc
+из текущего процесса с управлением потоком (писатель ждет, пока самый
+медленный читатель не догонит), поэтому замер показывает предельную
+пропускную способность пула, а не скорость писателя.
+
+Параметры STFT как в cfg.ini (window_size=4096, overlap=0.5,
+frequency_range=1-1500), 4 канала по 16 кГц.
+
+Запуск: python benchmarks/bench_fft_workers.py [максимум исполнителей]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import ROOT_DIR, make_workspace, quiet_logger
+from main_process.process_manager import ProcessManager
+from utils.spectrum_store import SpectrumReader
+
+DURATION = 5.0
+WARMUP = 2.0
+CHANNELS = 4
+FRAME_SAMPLES = 1024
+SLOTS = 256
+SAMPLE_RATE = 16000
+
+
+def stored_rows(reader):
+    return sum(segment.rows for segment in reader.segments()) if os.path.isdir(reader.output_dir) else 0
+
+
+def run(workers):
+    with open(os.path.join(ROOT_DIR, 'processes', 'fft.py'), encoding='utf-8') as f:
+        fft_source = f.read()
+    config = make_workspace(
+        scripts={'fft': fft_source},
+        processes={
+            'adc': {'enable': 'false', 'type': 'adc', 'sampling_rate': SAMPLE_RATE, 'bit_depth': 16,
+                    'channels': CHANNELS, 'frame_samples': FRAME_SAMPLES, 'ring_slots': SLOTS},
+            'fft': {'enable': 'true', 'type': 'fft', 'source': 'adc', 'window_size': 4096, 'overlap': 0.5,
+                    'frequency_range': '1-1500', 'output_dir': 'out', 'workers': workers,
+                    'poll_interval': 0.001},
+        },
+    )
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    manager.start_process('fft')
+    ring = manager.rings['adc']
+
+    t = np.arange(FRAME_SAMPLES * 64) / SAMPLE_RATE
+    signal = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    block = np.repeat(signal[:, None], CHANNELS, axis=1).reshape(64, FRAME_SAMPLES, CHANNELS)
+
+    time.sleep(WARMUP)
+    reader = SpectrumReader('out')
+    started = time.perf_counter()
+    initial = stored_rows(reader)
+    written = 0
+    while time.perf_counter() - started < DURATION:
+        # Управление потоком: не обгоняем самого медленного читателя
+        if max(stats['lag'] for stats in ring.stats()) > SLOTS // 2:
+            time.sleep(0.0005)
+            continue
+        np.copyto(ring.claim(), block[written % 64])
+        ring.commit()
+        written += 1
+    elapsed = time.perf_counter() - started
+    spectra = stored_rows(reader) - initial
+    reader.close()
+
+    status = manager.handle_command('status fft')[1]
+    manager.stop_all_processes()
+    manager.close_rings()
+
+    print(f"исполнителей {workers}: {spectra / elapsed:8.1f} спектров/с "
+          f"(реальное время x{written * FRAME_SAMPLES / SAMPLE_RATE / elapsed:.1f}), "
+          f"записано кадров {written}")
+    print("\n".join("    " + line for line in status.splitlines()))
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(2, os.cpu_count() or 1)
+    print(f"Ядер процессора: {os.cpu_count()}")
+    for workers in range(1, max_workers + 1):
+        run(workers)
+
+
+if __name__ == '__main__':
+    main()
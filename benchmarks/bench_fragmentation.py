@@ -0,0 +1,80 @@
+"""
+Доставка больших ответов "status processes" фрагментами по MTU
+при искусственных потерях на стороне клиента с выборочным повтором (NACK).
+
+Запуск: python benchmarks/bench_fragmentation.py
+"""
+import random
+import socket
+import time
+
+from common import make_workspace, quiet_logger, percentiles
+from main_process.fragmentation import receive_message
+from main_process.network_module import NetworkModule
+from main_process.process_manager import ProcessManager
+
+PROCESSES = 200
+REQUESTS = 50
+MTU = 512
+
+
+class LossySocket:
+    """Обертка сокета, теряющая заданную долю входящих датаграмм."""
+
+    def __init__(self, sock, loss):
+        self.sock = sock
+        self.loss = loss
+        self.dropped = 0
+
+    def settimeout(self, timeout):
+        self.sock.settimeout(timeout)
+
+    def sendto(self, data, address):
+        return self.sock.sendto(data, address)
+
+    def recv(self, size):
+        while True:
+            data = self.sock.recv(size)
+            if random.random() >= self.loss:
+                return data
+            self.dropped += 1
+
+
+def main():
+    names = [f'acquisition_channel_{i:03d}' for i in range(PROCESSES)]
+    config_manager = make_workspace(
+        scripts={},
+        processes={name: {'enable': 'false'} for name in names},
+    )
+    logger = quiet_logger()
+    process_manager = ProcessManager(logger=logger, config_manager=config_manager)
+    expected = 'SUCCESS: ' + process_manager.handle_command('status processes')[1]
+
+    server = NetworkModule(host='127.0.0.1', port=0, logger=logger,
+                           command_handler=process_manager.handle_command, mtu=MTU)
+    server.start()
+    address = server.socket.getsockname()
+    print(f"Размер ответа: {len(expected.encode('utf-8'))} байт, MTU {MTU}")
+
+    random.seed(1)
+    for loss in (0.0, 0.05, 0.2):
+        sock = LossySocket(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), loss)
+        latencies, intact = [], 0
+        for _ in range(REQUESTS):
+            started = time.perf_counter()
+            sock.sendto(b'status processes', address)
+            try:
+                reply = receive_message(sock, address, timeout=0.05, retries=10).decode('utf-8')
+            except socket.timeout:
+                continue
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            intact += reply == expected
+        stats = percentiles(latencies)
+        print(f"Потери {loss * 100:4.0f}%: целых ответов {intact}/{REQUESTS}, потеряно датаграмм {sock.dropped}, "
+              f"задержка p50={stats['p50']:.1f} мс p99={stats['p99']:.1f} мс")
+        sock.sock.close()
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
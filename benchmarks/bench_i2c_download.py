@@ -0,0 +1,77 @@
+"""
+Время загрузки конфигурации ADAU1761 (default_download) на программной
+модели шины FakeSMBus с реальным временем передачи при 400 кГц.
+
+Сравниваются:
+  - прежняя схема: отдельная запись на каждый вызов write_register_block
+    и sleep(0.001) после каждой записи (списки отправляются блоками SMBus);
+  - пакетная запись через блоки SMBus (шина без i2c_rdwr);
+  - пакетная запись через i2c_rdwr с объединением непрерывных диапазонов.
+Обязательная задержка R3 (100 мс) входит во все варианты.
+
+Запуск: python benchmarks/bench_i2c_download.py
+"""
+import contextlib
+import io
+import time
+
+import common  # noqa: F401  (добавляет корень проекта в sys.path)
+from utils.i2c import ADAU1761, FakeSMBus, SMBUS_BLOCK_MAX, word_size
+
+RUNS = 5
+
+
+class LegacyADAU1761(ADAU1761):
+    """Прежнее поведение: запись сразу, блоками SMBus, с паузой 1 мс после каждой."""
+
+    def write_register_block(self, address, data):
+        data = list(data) if isinstance(data, list) else [data]
+        size = word_size(address)
+        chunk = (SMBUS_BLOCK_MAX - 1) // size * size
+        for offset in range(0, len(data), chunk):
+            part_address = address + offset // size
+            self.bus.write_i2c_block_data(self.address, (part_address >> 8) & 0xFF,
+                                          [part_address & 0xFF] + data[offset:offset + chunk])
+        time.sleep(0.001)
+        return True
+
+
+class BlockOnlyBus:
+    """Шина без i2c_rdwr (как модуль smbus): только блочная запись SMBus."""
+
+    def __init__(self, bus):
+        self._bus = bus
+
+    def __getattr__(self, name):
+        if name == 'i2c_rdwr':
+            raise AttributeError(name)
+        return getattr(self._bus, name)
+
+
+def measure(programmer_class, block_only=False):
+    timings = []
+    for _ in range(RUNS):
+        bus = FakeSMBus(realtime=True)
+        programmer = programmer_class(bus=BlockOnlyBus(bus) if block_only else bus)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            programmer.default_download()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), bus
+
+
+def main():
+    _, reference = measure(LegacyADAU1761)
+    for title, programmer_class, block_only in (("Прежняя запись (1 мс после каждой)", LegacyADAU1761, True),
+                                                ("Пакетная, блоки SMBus", ADAU1761, True),
+                                                ("Пакетная, i2c_rdwr", ADAU1761, False)):
+        elapsed, bus = measure(programmer_class, block_only)
+        # Итоговое содержимое регистров должно совпадать с прежней схемой
+        same = bus.memory == reference.memory
+        print(f"{title:<36}: {elapsed:7.1f} мс (без задержки R3 {elapsed - 100:6.1f} мс), "
+              f"транзакций {bus.transactions:>3}, вызовов {bus.calls:>3}, время шины {bus.bus_time * 1000:5.1f} мс, "
+              f"регистры {'совпадают' if same else 'РАЗЛИЧАЮТСЯ'}")
+
+
+if __name__ == '__main__':
+    main()
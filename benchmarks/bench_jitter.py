@@ -0,0 +1,86 @@
+"""
+Дрожание периодического производителя (как чтение кадров adc) под нагрузкой.
+
+Производитель просыпается каждые PERIOD секунд и отмечает опоздание
+пробуждения относительно расписания. Одновременно работают LOAD_PROCESSES
+процессов, занимающих процессор в цикле (как расчет fft). Производитель
+запускается через ProcessManager без ограничений, с nice = -10 и с
+rt_priority (SCHED_FIFO) и привязкой к отдельному ядру (cpu_affinity);
+нагрузка при наличии нескольких ядер привязывается к остальным.
+
+Запуск: python benchmarks/bench_jitter.py
+"""
+import os
+
+from common import ROOT_DIR, make_workspace, quiet_logger
+from main_process.process_manager import ProcessManager
+
+PERIOD = 0.002
+DURATION = 4.0
+LOAD_PROCESSES = 4
+
+PRODUCER = '''
+import argparse
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--period", type=float)
+parser.add_argument("--duration", type=float)
+parser.add_argument("--output", type=str)
+args, _ = parser.parse_known_args()
+
+lateness = []
+deadline = time.monotonic() + args.period
+finish = deadline + args.duration
+while deadline < finish:
+    time.sleep(max(0.0, deadline - time.monotonic()))
+    lateness.append(time.monotonic() - deadline)
+    deadline += args.period
+lateness.sort()
+with open(args.output, "w") as f:
+    f.write(" ".join(repr(lateness[int(len(lateness) * q)]) for q in (0.5, 0.99)) + f" {lateness[-1]!r}")
+'''
+
+LOAD = '''
+while True:
+    sum(range(10000))
+'''
+
+
+def run(title, limits, load_limits):
+    processes = {'producer': {'enable': 'false', 'period': PERIOD, 'duration': DURATION, 'output': 'lateness.txt',
+                              **limits}}
+    scripts = {'producer': PRODUCER}
+    for index in range(LOAD_PROCESSES):
+        processes[f'load{index}'] = {'enable': 'false', **load_limits}
+        scripts[f'load{index}'] = LOAD
+    config = make_workspace(scripts=scripts, processes=processes)
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    for index in range(LOAD_PROCESSES):
+        manager.start_process(f'load{index}')
+    manager.start_process('producer')
+    _, resources = manager.handle_command('status producer')
+    manager.processes['producer'].wait()
+    manager.stop_all_processes()
+
+    with open('lateness.txt') as f:
+        p50, p99, worst = (float(value) * 1000 for value in f.read().split())
+    print(f"{title:<32}: опоздание p50 {p50:6.3f} мс, p99 {p99:7.3f} мс, max {worst:7.3f} мс")
+    print(f"  {resources.splitlines()[-1].strip()}")
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    cpus = os.cpu_count() or 1
+    # При нескольких ядрах производитель получает последнее ядро, нагрузка - остальные
+    pinned = {'cpu_affinity': cpus - 1}
+    load_pinned = {'cpu_affinity': f"0-{cpus - 2}"} if cpus > 1 else {}
+    print(f"Период {PERIOD * 1000:.0f} мс, {DURATION:.0f} с, процессов нагрузки {LOAD_PROCESSES}, ядер {cpus}")
+    run("без ограничений", {}, {})
+    run("nice = -10", {'nice': -10}, {})
+    run("rt_priority = 50, cpu_affinity", {'rt_priority': 50, **pinned}, load_pinned)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Стоимость журналирования для потока, обрабатывающего запросы.
+
+Обработчик команд записывает одну строку INFO на каждый запрос
+(как команды start/stop/status в ProcessManager). Замеряется задержка
+запросов "status processes" через NetworkModule при журнале, настроенном
+LoggerManager:
+- напрямую: консоль и файл в потоке вызова (прежнее поведение);
+- через очередь: QueueHandler и поток QueueListener (queue = true);
+- через очередь с файлом в формате JSON Lines (format = json).
+
+Второй замер - пачка из BURST сообщений подряд: время одного вызова
+logger.info и число записей, отброшенных при переполнении очереди.
+Консольный вывод перенаправляется в /dev/null.
+
+Запуск: python benchmarks/bench_logging.py
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from common import make_workspace, quiet_logger, percentiles
+from main_process.logger import LoggerManager
+from main_process.network_module import NetworkModule
+from main_process.process_manager import ProcessManager
+
+REQUESTS = 3000
+CLIENTS = 4
+BURST = 50000
+QUEUE_SIZE = 10000
+
+
+def status_client(address, count, latencies):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(10)
+    for _ in range(count):
+        started = time.perf_counter()
+        sock.sendto(b'status processes', address)
+        sock.recv(65535)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    sock.close()
+
+
+def make_logger(log_dir, **options):
+    config = {'log_dir': log_dir, 'log_file': 'app.log', 'log_level': 'INFO',
+              'max_bytes': 1 << 30, 'max_files': 1, 'use_console': True}
+    config.update(options)
+    return LoggerManager(config)
+
+
+def run_requests(process_manager, logger):
+    def handle_command(command):
+        result = process_manager.handle_command(command)
+        logger.info(f"Команда '{command}' выполнена: {result[0]}")
+        return result
+
+    server = NetworkModule(host='127.0.0.1', port=0, logger=logger,
+                           command_handler=handle_command, max_workers=4)
+    server.start()
+    address = server.socket.getsockname()
+    latencies = []
+    clients = [threading.Thread(target=status_client, args=(address, REQUESTS // CLIENTS, latencies))
+               for _ in range(CLIENTS)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    server.stop()
+    return latencies
+
+
+def run_burst(logger):
+    started = time.perf_counter()
+    for index in range(BURST):
+        logger.info(f"Сообщение {index} из пачки")
+    return (time.perf_counter() - started) / BURST
+
+
+def main():
+    config_manager = make_workspace(scripts={}, processes={'idle': {'enable': 'false'}})
+    process_manager = ProcessManager(logger=quiet_logger(), config_manager=config_manager)
+
+    modes = [
+        ('напрямую', {}),
+        ('очередь', {'queue': True, 'queue_size': QUEUE_SIZE, 'queue_policy': 'drop'}),
+        ('очередь, json', {'queue': True, 'queue_size': QUEUE_SIZE, 'queue_policy': 'drop', 'format': 'json'}),
+    ]
+    stderr = sys.stderr
+    for title, options in modes:
+        log_dir = tempfile.mkdtemp(prefix='popgm_log_')
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            manager = make_logger(log_dir, **options)
+            latencies = run_requests(process_manager, manager.logger)
+            per_call = run_burst(manager.logger)
+            dropped = manager.queue_handler.dropped if manager.queue_handler else 0
+            manager.stop()
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
+        stats = percentiles(latencies)
+        print(f"[{title:<13}] запросы: p50 {stats['p50']:.2f} мс, p99 {stats['p99']:.2f} мс, "
+              f"max {stats['max']:.2f} мс; пачка: {per_call * 1e6:.1f} мкс на вызов, "
+              f"отброшено {dropped} из {BURST}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Пропускная способность NetworkModule на loopback (пакетов в секунду):
+протокол asyncio (по датаграмме за пробуждение) против пакетного режима
+(неблокирующее вычитывание сокета в пул буферов).
+
+Клиенты держат ограниченное окно неподтвержденных запросов, чтобы
+не переполнять приемный буфер сокета.
+
+Запуск: python benchmarks/bench_network_batch.py
+"""
+import socket
+import threading
+import time
+
+from common import quiet_logger
+from main_process.network_module import NetworkModule
+
+DURATION = 3.0
+CLIENTS = 4
+WINDOW = 32
+
+
+def handler(command):
+    return True, command
+
+
+def client(address, counter, deadline):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(1.0)
+    payload = b'status processes'
+    received = 0
+    for _ in range(WINDOW):
+        sock.sendto(payload, address)
+    while time.perf_counter() < deadline:
+        try:
+            sock.recv(2048)
+        except socket.timeout:
+            # Потерянные датаграммы восполняем, чтобы окно не схлопнулось
+            for _ in range(WINDOW):
+                sock.sendto(payload, address)
+            continue
+        received += 1
+        sock.sendto(payload, address)
+    sock.close()
+    counter.append(received)
+
+
+def run(batch_size):
+    server = NetworkModule(host='127.0.0.1', port=0, logger=quiet_logger(),
+                           command_handler=handler, batch_size=batch_size)
+    server.start()
+    address = server.socket.getsockname()
+    counter = []
+    deadline = time.perf_counter() + DURATION
+    threads = [threading.Thread(target=client, args=(address, counter, deadline)) for _ in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.stop()
+    return sum(counter) / DURATION
+
+
+def main():
+    for batch_size in (1, 8, 32, 64):
+        mode = 'протокол asyncio' if batch_size == 1 else f'пакетный, batch_size={batch_size}'
+        print(f"[{mode}] {run(batch_size):.0f} ответов/с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Нагрузочный тест NetworkModule: тысячи запросов "status processes"
+во время медленной команды "stop".
+
+Сравниваются два режима:
+- последовательный: один поток и общая блокировка (как прежний прием в одном потоке);
+- конкурентный: пул потоков и блокировки по процессам.
+
+Запуск: python benchmarks/bench_network_load.py
+"""
+import socket
+import threading
+import time
+
+from common import make_workspace, quiet_logger, percentiles
+from main_process.network_module import NetworkModule
+from main_process.process_manager import ProcessManager
+
+STATUS_REQUESTS = 4000
+CLIENTS = 4
+STOP_DELAY = 2.0
+
+SLOW_STOPPER = '''
+import signal
+import sys
+import time
+
+def on_term(signum, frame):
+    time.sleep(%s)
+    sys.exit(0)
+
+signal.signal(signal.SIGTERM, on_term)
+while True:
+    time.sleep(1)
+''' % STOP_DELAY
+
+
+def request(sock, address, command):
+    sock.sendto(command.encode('utf-8'), address)
+    return sock.recv(65535).decode('utf-8')
+
+
+def status_client(address, count, latencies):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(10)
+    for _ in range(count):
+        started = time.perf_counter()
+        request(sock, address, 'status processes')
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    sock.close()
+
+
+def run_mode(process_manager, logger, max_workers, target_resolver):
+    server = NetworkModule(host='127.0.0.1', port=0, logger=logger,
+                           command_handler=process_manager.handle_command,
+                           target_resolver=target_resolver, max_workers=max_workers)
+    server.start()
+    address = server.socket.getsockname()
+
+    process_manager.start_process('slow')
+    time.sleep(0.5)
+
+    stop_result = {}
+
+    def stop_client():
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.settimeout(10)
+        started = time.perf_counter()
+        stop_result['reply'] = request(sock, address, 'stop slow')
+        stop_result['seconds'] = time.perf_counter() - started
+        sock.close()
+
+    stopper = threading.Thread(target=stop_client)
+    stopper.start()
+    time.sleep(0.05)
+
+    latencies = []
+    clients = [threading.Thread(target=status_client, args=(address, STATUS_REQUESTS // CLIENTS, latencies))
+               for _ in range(CLIENTS)]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+    stopper.join()
+    server.stop()
+    return latencies, elapsed, stop_result
+
+
+def main():
+    config_manager = make_workspace(
+        scripts={'slow': SLOW_STOPPER},
+        processes={'slow': {'enable': 'false'}},
+    )
+    logger = quiet_logger()
+    process_manager = ProcessManager(logger=logger, config_manager=config_manager)
+
+    modes = [
+        ('последовательный', 1, lambda command: 'all'),
+        ('конкурентный', 8, process_manager.command_target),
+    ]
+    for title, max_workers, resolver in modes:
+        latencies, elapsed, stop_result = run_mode(process_manager, logger, max_workers, resolver)
+        stats = percentiles(latencies)
+        print(f"[{title}] {len(latencies)} запросов за {elapsed:.2f} с, "
+              f"p50={stats['p50']:.2f} мс p99={stats['p99']:.2f} мс max={stats['max']:.2f} мс; "
+              f"stop выполнен за {stop_result['seconds']:.2f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Перехват stdout и stderr дочерних процессов под нагрузкой.
+
+CHILDREN процессов SECONDS секунд печатают строки так быстро, как могут
+(каждая сотая - в stderr), и в конце записывают число напечатанных строк.
+Сравниваются режимы:
+- без перехвата: вывод процессов идет в консоль (перенаправлена в /dev/null);
+- перехват, быстрый журнал: обработчик только считает записи;
+- перехват, медленный журнал: обработчик тратит SLOW_RECORD секунд на запись;
+- то же для запуска через zygote.
+
+Для каждого режима выводится скорость печати процессов (перехват
+не должен ее снижать, даже если журнал не успевает), число строк,
+дошедших до журнала, и число отброшенных; сумма двух последних должна
+совпасть с числом напечатанных строк.
+
+На одном ядре процессы делят процессор с потоками чтения и записи
+журнала, поэтому скорость печати с перехватом ниже, чем в /dev/null;
+с медленным журналом она выше, чем с быстрым: поток записи больше
+спит, а лишние строки отбрасываются, не останавливая процессы.
+
+Запуск: python benchmarks/bench_output_capture.py
+"""
+import logging
+import os
+import time
+
+from common import ROOT_DIR, make_workspace
+from main_process.process_manager import ProcessManager
+
+CHILDREN = 4
+SECONDS = 2.0
+SLOW_RECORD = 0.0002
+
+CHATTY = '''
+import argparse
+import sys
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--seconds", type=float, default=2.0)
+parser.add_argument("--count_file", type=str)
+args, _ = parser.parse_known_args()
+
+count = 0
+deadline = time.monotonic() + args.seconds
+while time.monotonic() < deadline:
+    for _ in range(100):
+        count += 1
+        if count % 100 == 0:
+            print(f"ошибка {count}", file=sys.stderr)
+        else:
+            print(f"строка {count}: отсчеты обработаны")
+sys.stdout.flush()
+with open(args.count_file, "w") as f:
+    f.write(str(count))
+'''
+
+
+class CountingHandler(logging.Handler):
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.delay = delay
+        self.lines = 0
+
+    def emit(self, record):
+        if record.getMessage().startswith("["):
+            self.lines += 1
+            if self.delay:
+                time.sleep(self.delay)
+
+
+def run(capture, delay, zygote):
+    names = [f"chatty{index}" for index in range(CHILDREN)]
+    config = make_workspace(
+        scripts={name: CHATTY for name in names},
+        processes={name: {'enable': 'false', 'seconds': SECONDS, 'count_file': f'{name}.txt'}
+                   for name in names},
+        extra_sections={'zygote': {'enable': 'true' if zygote else 'false', 'preload': 'argparse'}},
+    )
+    logger = logging.getLogger(f'bench_output_{capture}_{delay}_{zygote}')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = CountingHandler(delay)
+    logger.addHandler(handler)
+
+    manager = ProcessManager(logger=logger, config_manager=config)
+    if capture:
+        manager.start_output_capture()
+    if zygote:
+        manager._zygote_for(names[0])
+    for name in names:
+        manager.start_process(name)
+    for name in names:
+        manager.processes[name].wait()
+    manager.stop_output_capture()
+    manager.stop_all_processes()
+
+    printed = 0
+    for name in names:
+        with open(f'{name}.txt') as f:
+            printed += int(f.read())
+    dropped = sum(manager.output.stats(name)['dropped'] for name in names) if capture else 0
+    return printed, handler.lines, dropped
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    # Как при выводе в терминал: каждая строка - отдельная запись (перехват включает то же сам)
+    os.environ["PYTHONUNBUFFERED"] = "1"
+    modes = [
+        ("без перехвата", False, 0.0, False),
+        ("быстрый журнал", True, 0.0, False),
+        ("медленный журнал", True, SLOW_RECORD, False),
+        ("zygote, быстрый", True, 0.0, True),
+        ("zygote, медленный", True, SLOW_RECORD, True),
+    ]
+    console = os.dup(1), os.dup(2)
+    for title, capture, delay, zygote in modes:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        os.close(devnull)
+        try:
+            printed, logged, dropped = run(capture, delay, zygote)
+        finally:
+            os.dup2(console[0], 1)
+            os.dup2(console[1], 2)
+        line = f"[{title:<17}] печать {printed / SECONDS / 1000:7.1f} тыс. строк/с"
+        if capture:
+            line += (f", в журнале {logged}, отброшено {dropped}, "
+                     f"{'сходится' if logged + dropped == printed else 'НЕ сходится'}")
+        print(line, flush=True)
+
+
+if __name__ == '__main__':
+    main()
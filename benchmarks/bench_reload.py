@@ -0,0 +1,256 @@
+"""
+Перезагрузка конфигурации без остановки незатронутых процессов.
+
+Стенд: производитель adc пишет кадры в кольцевой буфер каждые PERIOD
+секунд, читатель fft обрабатывает их. В cfg.ini меняется window_size
+читателя. Сравниваются:
+- полный перезапуск: остановка всех процессов и запуск с новой конфигурацией
+  (как перезапуск супервизора);
+- reload: запись cfg.ini, ConfigWatcher и Supervisor перезагружают
+  конфигурацию сами, перезапускается только читатель.
+
+Для каждого способа выводится наибольший перерыв в записи кадров
+производителем (потерянное время сбора данных), сохранился ли PID
+производителя и время от записи файла до запуска читателя с новым
+аргументом. Параллельно поток выполняет "status processes" и проверяет,
+что get_config() всегда возвращает согласованную версию (метка version
+секции [meta] соответствует window_size читателя).
+
+Запуск: python benchmarks/bench_reload.py
+"""
+import asyncio
+import os
+import threading
+import time
+
+from common import ROOT_DIR, make_workspace, quiet_logger
+from main_process.config_watcher import ConfigWatcher
+from main_process.process_manager import ProcessManager
+from main_process.supervisor import Supervisor
+
+PERIOD = 0.005
+
+ADC = '''
+import argparse
+import signal
+import time
+
+import numpy as np
+
+from utils.ring_buffer import RingBuffer
+
+running = True
+
+
+def on_terminate(signum, frame):
+    global running
+    running = False
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--ring", type=str, required=True)
+parser.add_argument("--period", type=float, default=0.005)
+args, _ = parser.parse_known_args()
+signal.signal(signal.SIGTERM, on_terminate)
+
+ring = RingBuffer.attach(args.ring)
+frame = np.zeros((ring.frame_samples, ring.channels), dtype=ring.dtype)
+while running:
+    ring.write(frame)
+    time.sleep(args.period)
+ring.close()
+'''
+
+FFT = '''
+import argparse
+import signal
+import time
+
+from utils.ready import notify_ready
+from utils.ring_buffer import RingBuffer
+
+running = True
+
+
+def on_terminate(signum, frame):
+    global running
+    running = False
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--ring", type=str, required=True)
+parser.add_argument("--ring_consumer", type=int, default=0)
+parser.add_argument("--window_size", type=int, default=4096)
+parser.add_argument("--stamps", type=str)
+args, _ = parser.parse_known_args()
+signal.signal(signal.SIGTERM, on_terminate)
+
+ring = RingBuffer.attach(args.ring)
+consumer = ring.consumer(args.ring_consumer)
+with open(args.stamps, "a") as f:
+    f.write(f"{args.window_size} {time.monotonic()!r}\\n")
+notify_ready()
+while running:
+    if consumer.acquire() is not None:
+        consumer.release()
+    time.sleep(0.002)
+ring.close()
+'''
+
+
+def write_config(window_size, version):
+    """Переписывает cfg.ini, как редактор: во временный файл и переименование."""
+    lines = [
+        '[meta]', f'version = {version}',
+        '[process:adc]', 'enable = true', 'type = adc', 'sampling_rate = 16000', 'channels = 1',
+        'frame_samples = 256', 'ring_slots = 256', f'period = {PERIOD}',
+        '[process:fft]', 'enable = true', 'type = fft', 'source = adc', 'depends_on = adc', 'ready = notify',
+        f'window_size = {window_size}', 'stamps = stamps.txt',
+    ]
+    with open('cfg.ini.tmp', 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace('cfg.ini.tmp', 'cfg.ini')
+
+
+class WriteMonitor:
+    """Следит за write_seq буфера производителя и запоминает наибольший перерыв в записи."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.max_gap = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        last_seq, last_change = None, time.monotonic()
+        while not self._stop.is_set():
+            ring = self.manager.rings.get('adc')
+            try:
+                seq = ring.write_seq if ring is not None else None
+            except TypeError:
+                # Буфер закрыт при полном перезапуске, пока его читал монитор
+                seq = None
+            now = time.monotonic()
+            if seq != last_seq:
+                self.max_gap = max(self.max_gap, now - last_change)
+                last_seq, last_change = seq, now
+            time.sleep(0.0005)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class StatusChecker:
+    """Поток, который выполняет status и проверяет согласованность снимка конфигурации."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.calls = 0
+        self.inconsistent = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            config = self.manager.config_manager.get_config()
+            expected = '4096' if config['meta']['version'] == 1 else '2048'
+            if config['processes']['fft']['window_size'] != expected:
+                self.inconsistent += 1
+            self.manager.handle_command('status processes')
+            self.calls += 1
+            time.sleep(0.0002)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def wait_for_stamp(window_size, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists('stamps.txt'):
+            with open('stamps.txt') as f:
+                for line in f:
+                    size, moment = line.split()
+                    if int(size) == window_size:
+                        return float(moment)
+        time.sleep(0.002)
+    raise RuntimeError(f"читатель с window_size={window_size} не запустился")
+
+
+def full_restart():
+    config = make_workspace(scripts={'adc': ADC, 'fft': FFT}, processes={})
+    write_config(4096, 1)
+    config.load_config()
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    manager.start_configured_processes()
+    pid = manager.processes['adc'].pid
+    time.sleep(0.5)
+
+    with WriteMonitor(manager) as monitor:
+        written = time.monotonic()
+        write_config(2048, 2)
+        manager.stop_all_processes()
+        manager.close_rings()
+        config.load_config()
+        manager.all_processes = config.processes_names
+        manager.start_configured_processes()
+        started = wait_for_stamp(2048) - written
+        time.sleep(0.3)
+    same_pid = manager.processes['adc'].pid == pid
+    manager.stop_all_processes()
+    manager.close_rings()
+    return monitor.max_gap, same_pid, started, None
+
+
+async def hot_reload():
+    config = make_workspace(scripts={'adc': ADC, 'fft': FFT}, processes={})
+    write_config(4096, 1)
+    config.load_config()
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    manager.start_configured_processes()
+    pid = manager.processes['adc'].pid
+    watcher = ConfigWatcher('cfg.ini')
+    watcher.open()
+    supervisor = Supervisor(manager, logger=quiet_logger(), config_watcher=watcher, reload_delay=0.05)
+    serve_task = asyncio.create_task(supervisor.serve())
+    await asyncio.sleep(0.5)
+
+    with WriteMonitor(manager) as monitor, StatusChecker(manager) as checker:
+        written = time.monotonic()
+        write_config(2048, 2)
+        started = await asyncio.get_running_loop().run_in_executor(None, wait_for_stamp, 2048) - written
+        await asyncio.sleep(0.3)
+    same_pid = manager.processes['adc'].pid == pid
+
+    supervisor.request_stop()
+    await serve_task
+    watcher.close()
+    manager.stop_all_processes()
+    manager.close_rings()
+    return monitor.max_gap, same_pid, started, checker
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    for title, run in (("полный перезапуск", full_restart), ("reload", lambda: asyncio.run(hot_reload()))):
+        gap, same_pid, started, checker = run()
+        line = (f"[{title:<17}] перерыв записи adc {gap * 1000:7.1f} мс, PID adc {'сохранен' if same_pid else 'новый'}, "
+                f"fft с новым window_size через {started * 1000:6.1f} мс после записи файла")
+        if checker is not None:
+            line += f"; status: {checker.calls} вызовов, несогласованных снимков {checker.inconsistent}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Автоматический перезапуск по политике restart = on-failure.
+
+Стенд: процесс crasher при каждом запуске отмечает время старта,
+через LIFE секунд отмечает время сбоя и завершается с кодом 1.
+Supervisor обнаруживает завершение по SIGCHLD и перезапускает процесс
+с экспоненциальной задержкой, пока не сработает защита от циклических
+падений (restart_limit сбоев за restart_window секунд).
+
+Для каждого перезапуска выводится задержка политики и фактический
+перерыв от сбоя до старта нового процесса; их разность - накладные
+расходы обнаружения и запуска. Замер выполняется для запуска через
+Popen и через zygote.
+
+Запуск: python benchmarks/bench_restart.py
+"""
+import asyncio
+import os
+import time
+
+from common import ROOT_DIR, make_workspace, quiet_logger, percentiles
+from main_process.process_manager import ProcessManager
+from main_process.supervisor import Supervisor
+
+LIFE = 0.2
+RESTART_DELAY = 0.05
+RESTART_LIMIT = 6
+
+CRASHER = '''
+import argparse
+import os
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--life", type=float, default=0.2)
+parser.add_argument("--stamps", type=str)
+args, _ = parser.parse_known_args()
+with open(args.stamps, "a") as f:
+    f.write(f"start {time.monotonic()!r}\\n")
+time.sleep(args.life)
+with open(args.stamps, "a") as f:
+    f.write(f"crash {time.monotonic()!r}\\n")
+os._exit(1)
+'''
+
+
+async def run_harness(zygote):
+    config = make_workspace(
+        scripts={'crasher': CRASHER},
+        processes={'crasher': {'enable': 'false', 'restart': 'on-failure', 'restart_delay': RESTART_DELAY,
+                               'restart_max_delay': 1.0, 'restart_limit': RESTART_LIMIT, 'restart_window': 30,
+                               'life': LIFE, 'stamps': 'stamps.txt'}},
+        extra_sections={'zygote': {'enable': 'true' if zygote else 'false', 'preload': 'numpy'}},
+    )
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    supervisor = Supervisor(manager, logger=quiet_logger())
+    serve_task = asyncio.create_task(supervisor.serve())
+    await asyncio.sleep(0.5)
+
+    manager.handle_command('start crasher')
+    policy = manager.restart_policies['crasher']
+    deadline = time.monotonic() + 30
+    while not policy.tripped and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    _, status = manager.handle_command('status crasher')
+
+    supervisor.request_stop()
+    await serve_task
+    manager.stop_all_processes()
+
+    events = []
+    with open('stamps.txt') as f:
+        for line in f:
+            kind, moment = line.split()
+            events.append((kind, float(moment)))
+    gaps = [following[1] - event[1] for event, following in zip(events, events[1:])
+            if event[0] == 'crash' and following[0] == 'start']
+    return gaps, status
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    for title, zygote in (("Popen", False), ("zygote", True)):
+        gaps, status = asyncio.run(run_harness(zygote))
+        print(f"{title}: перезапусков {len(gaps)}")
+        overheads = []
+        delay = RESTART_DELAY
+        for index, gap in enumerate(gaps, 1):
+            overheads.append(gap - delay)
+            print(f"  {index}: задержка политики {delay * 1000:6.0f} мс, перерыв {gap * 1000:7.1f} мс, "
+                  f"накладные расходы {(gap - delay) * 1000:5.1f} мс")
+            delay = min(delay * 2, 1.0)
+        stats = percentiles(overheads)
+        print(f"  накладные расходы: p50 {stats['p50'] * 1000:.1f} мс, max {stats['max'] * 1000:.1f} мс")
+        print("  " + status.replace("\n", "\n  "))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Пропускная способность кольцевого буфера в разделяемой памяти (МБ/с)
+при разных размерах кадра: писатель в текущем процессе, два читателя
+в отдельных процессах получают кадры как представления NumPy без копирования.
+
+Запуск: python benchmarks/bench_ring_buffer.py
+"""
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import common  # noqa: F401  (добавляет корень проекта в sys.path)
+from utils.ring_buffer import RingBuffer
+
+DURATION = 2.0
+SLOTS = 256
+CONSUMERS = 2
+IDLE_EXIT = 0.5
+
+
+def consumer_main(spec, index):
+    """Читатель: работает, пока писатель не замолчит на IDLE_EXIT секунд."""
+    ring = RingBuffer.attach(spec)
+    consumer = ring.consumer(index)
+    checksum = 0
+    last_data = None
+    while True:
+        frames = consumer.acquire()
+        if frames is None:
+            if last_data is not None and time.perf_counter() - last_data > IDLE_EXIT:
+                break
+            time.sleep(0)
+            continue
+        # Касаемся данных кадров, не копируя их
+        checksum += int(frames[:, 0, 0].sum())
+        consumer.release()
+        last_data = time.perf_counter()
+    ring.close()
+
+
+def run(frame_samples):
+    ring = RingBuffer.create(slots=SLOTS, frame_samples=frame_samples, channels=1,
+                             dtype=np.int16, max_consumers=CONSUMERS)
+    # Как и дочерние процессы ProcessManager, читатели запускаются отдельным интерпретатором
+    workers = [subprocess.Popen([sys.executable, __file__, '--consume', ring.spec(), str(i)])
+               for i in range(CONSUMERS)]
+    time.sleep(1.0)
+
+    source = np.arange(frame_samples, dtype=np.int16).reshape(frame_samples, 1)
+    written = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < DURATION:
+        for _ in range(64):
+            np.copyto(ring.claim(), source)
+            ring.commit()
+        written += 64
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.wait()
+
+    stats = ring.stats()
+    ring.close()
+    megabytes = frame_samples * 2 / 1e6
+    print(f"кадр {frame_samples * 2:>7} Б: запись {written * megabytes / elapsed:8.1f} МБ/с, "
+          + ", ".join(f"читатель {i}: {(s['read_seq'] - s['dropped']) * megabytes / elapsed:8.1f} МБ/с "
+                      f"(переполнений {s['overruns']}, потеряно {s['dropped']}, max_lag {s['max_lag']})"
+                      for i, s in enumerate(stats)))
+
+
+def main():
+    for frame_samples in (256, 1024, 4096, 16384):
+        run(frame_samples)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--consume':
+        consumer_main(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,73 @@
+"""
+Пропускная способность хранилища спектров (utils/spectrum_store.py):
+запись блоками по 16 спектров (4 канала x 384 бина, как fft с cfg.ini),
+выборка случайных диапазонов времени через np.memmap и полный просмотр.
+Файлы только что записаны, поэтому чтение идет из страничного кэша.
+
+Запуск: python benchmarks/bench_spectrum_store.py
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from common import percentiles
+from utils.spectrum_store import SpectrumReader, SpectrumWriter
+
+CHANNELS = 4
+BINS = 384
+BLOCK = 16
+BLOCKS = 4000
+HOP_NS = 128_000_000
+QUERIES = 500
+QUERY_SPAN = 600  # спектров в выборке (~77 с при шаге 128 мс)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='popgm_store_')
+    block = np.random.rand(BLOCK, CHANNELS, BINS).astype(np.float32)
+    megabytes = BLOCKS * block.nbytes / 1e6
+    start_ns = 1_700_000_000 * 10 ** 9
+
+    writer = SpectrumWriter(os.path.join(workdir, 'store'), bins=BINS, channels=CHANNELS,
+                            segment_bytes=16 * 1024 * 1024, max_files=100)
+    started = time.perf_counter()
+    for index in range(BLOCKS):
+        timestamps = start_ns + (index * BLOCK + np.arange(BLOCK, dtype=np.int64)) * HOP_NS
+        writer.append(block, timestamps)
+    writer.close()
+    elapsed = time.perf_counter() - started
+    segments = len(os.listdir(os.path.join(workdir, 'store')))
+    print(f"Запись в сегменты:       {megabytes / elapsed:8.1f} МБ/с ({BLOCKS * BLOCK / elapsed:8.0f} спектров/с, "
+          f"сегментов {segments})")
+
+    reader = SpectrumReader(os.path.join(workdir, 'store'))
+    total = BLOCKS * BLOCK
+    latencies = []
+    for _ in range(QUERIES):
+        first = random.randrange(total - QUERY_SPAN)
+        query_started = time.perf_counter()
+        timestamps, spectra = reader.read(start_ns + first * HOP_NS, start_ns + (first + QUERY_SPAN) * HOP_NS)
+        float(spectra[:, 0, 0].sum())
+        latencies.append((time.perf_counter() - query_started) * 1000)
+        assert len(timestamps) == QUERY_SPAN
+    stats = percentiles(latencies)
+    print(f"Выборка {QUERY_SPAN} спектров:    p50 {stats['p50']:.3f} мс, p99 {stats['p99']:.3f} мс")
+
+    started = time.perf_counter()
+    checksum = 0.0
+    for segment in reader.segments():
+        _, spectra = segment.slice()
+        checksum += float(spectra.sum())
+    elapsed = time.perf_counter() - started
+    print(f"Полный просмотр:         {megabytes / elapsed:8.1f} МБ/с")
+
+    reader.close()
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Время запуска конфигурации из 20 процессов с зависимостями depends_on.
+
+Процессы образуют 4 уровня по 5: процесс уровня k зависит от процесса
+с тем же номером и от первого процесса уровня k-1. Каждый процесс
+инициализируется INIT_SECONDS (как импорт numpy и подключение буферов),
+сообщает о готовности (utils.ready.notify_ready) и работает до SIGTERM.
+
+Сравниваются:
+  - прежний цикл: процессы запускаются по очереди без учета зависимостей
+    (быстро, но зависимые стартуют раньше готовности своих зависимостей);
+  - последовательный запуск в порядке зависимостей с ожиданием готовности
+    каждого процесса;
+  - планировщик ProcessManager.start_processes.
+Время запуска - от начала до готовности последнего процесса; нарушения -
+число процессов, запущенных раньше готовности какой-либо зависимости.
+
+Запуск: python benchmarks/bench_startup_order.py
+"""
+import os
+import time
+
+from common import ROOT_DIR, make_workspace, quiet_logger
+from main_process.process_manager import ProcessManager
+
+LEVELS = 4
+WIDTH = 5
+INIT_SECONDS = 0.3
+ROUNDS = 3
+
+SERVICE = '''
+import argparse
+import os
+import signal
+import time
+
+from utils.ready import notify_ready
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--init", type=float, default=0.3)
+parser.add_argument("--stamps", type=str)
+parser.add_argument("--name", type=str)
+args, _ = parser.parse_known_args()
+started = time.monotonic()
+signal.signal(signal.SIGTERM, lambda signum, frame: os._exit(0))
+time.sleep(args.init)
+with open(os.path.join(args.stamps, args.name), "w") as f:
+    f.write(f"{started!r} {time.monotonic()!r}")
+notify_ready()
+while True:
+    time.sleep(3600)
+'''
+
+
+def process_names():
+    return [f"p{level}_{index}" for level in range(LEVELS) for index in range(WIDTH)]
+
+
+def dependencies(name):
+    level, index = map(int, name[1:].split('_'))
+    if level == 0:
+        return []
+    return sorted({f"p{level - 1}_{index}", f"p{level - 1}_0"})
+
+
+def make_manager():
+    processes = {}
+    # Порядок секций обратный, чтобы прежний цикл запускал зависимые процессы первыми
+    for name in reversed(process_names()):
+        processes[name] = {'enable': 'true', 'type': 'service', 'ready': 'notify',
+                           'depends_on': ', '.join(dependencies(name)) or '',
+                           'init': INIT_SECONDS, 'stamps': 'stamps', 'name': name}
+    config = make_workspace(scripts={name: SERVICE for name in process_names()}, processes=processes)
+    # Скрипты запускаются из рабочего каталога, созданного make_workspace
+    os.makedirs('stamps')
+    return ProcessManager(logger=quiet_logger(), config_manager=config), os.path.abspath('stamps')
+
+
+def collect(stamps, started):
+    """Время до готовности последнего процесса и число нарушений порядка."""
+    deadline = time.monotonic() + 10
+    while len(os.listdir(stamps)) < LEVELS * WIDTH and time.monotonic() < deadline:
+        time.sleep(0.005)
+    times = {}
+    for name in os.listdir(stamps):
+        with open(os.path.join(stamps, name)) as f:
+            times[name] = tuple(map(float, f.read().split()))
+    violations = sum(1 for name, (launched, _) in times.items()
+                     if any(dependency not in times or times[dependency][1] > launched
+                            for dependency in dependencies(name)))
+    return max(ready for _, ready in times.values()) - started, violations
+
+
+def run(mode):
+    manager, stamps = make_manager()
+    started = time.monotonic()
+    if mode == "old":
+        for name in manager.all_processes:
+            manager.start_process(name)
+    elif mode == "serial":
+        # Порядок зависимостей: уровни по очереди, каждый процесс - после готовности предыдущего
+        for name in process_names():
+            manager.start_processes([name])
+    else:
+        manager.start_processes(manager.all_processes)
+    result = collect(stamps, started)
+    manager.stop_all_processes()
+    return result
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    print(f"Процессов {LEVELS * WIDTH}, уровней зависимостей {LEVELS}, инициализация {INIT_SECONDS * 1000:.0f} мс")
+    for title, mode in (("Прежний цикл (без порядка)", "old"),
+                        ("Последовательно с готовностью", "serial"),
+                        ("Планировщик depends_on", "dag")):
+        results = [run(mode) for _ in range(ROUNDS)]
+        best = min(elapsed for elapsed, _ in results)
+        violations = max(count for _, count in results)
+        print(f"{title:<30}: {best * 1000:7.0f} мс, нарушений порядка {violations}")
+
+
+if __name__ == '__main__':
+    main()
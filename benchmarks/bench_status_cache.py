@@ -0,0 +1,111 @@
+"""
+Таблица статусов процессов против вычисления статуса при каждом запросе.
+
+В конфигурации PROCESSES процессов, половина запущена (спят), у четверти
+нет скрипта. Замеряется обработчик "status processes" (без разбора
+команды shlex, который одинаков во всех случаях и замеряется отдельно):
+- пересчет: статус каждого процесса вычисляется заново (проверка скрипта
+  в processes/, poll() дочернего процесса) - как до таблицы статусов;
+- таблица: чтение снимка, обновляемого по событиям;
+- условный запрос "status processes since N" без изменений.
+
+Затем проверяется, что таблица реагирует на события: удаление скрипта
+(ScriptsWatcher в цикле Supervisor), завершение процесса (SIGCHLD),
+и что версия при этом увеличивается.
+
+Запуск: python benchmarks/bench_status_cache.py
+"""
+import asyncio
+import os
+import time
+
+from common import ROOT_DIR, make_workspace, percentiles, quiet_logger
+from main_process.config_watcher import ScriptsWatcher
+from main_process.process_manager import ProcessManager
+from main_process.supervisor import Supervisor
+
+PROCESSES = 16
+CALLS = 5000
+
+SLEEPER = '''
+import time
+time.sleep(60)
+'''
+
+
+def measure(call):
+    samples = []
+    for _ in range(CALLS):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def recompute(manager):
+    """Статусы, как их считала команда status processes до таблицы статусов."""
+    statuses = {name: manager._compute_status(name) for name in manager.all_processes}
+    return True, "\n".join(f"{name}: {status}" for name, status in statuses.items())
+
+
+async def wait_status(manager, name, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while manager.get_process_status(name) != status:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"статус '{name}' не стал {status}")
+        await asyncio.sleep(0.005)
+
+
+async def events(manager):
+    watcher = ScriptsWatcher('processes')
+    watcher.open()
+    supervisor = Supervisor(manager, logger=quiet_logger(), scripts_watcher=watcher)
+    serve_task = asyncio.create_task(supervisor.serve())
+    await asyncio.sleep(0.1)
+
+    # Остановленный процесс без скрипта получает статус None
+    manager.handle_command('stop proc1')
+    version = manager.status_version
+    os.unlink('processes/proc1.py')
+    started = time.monotonic()
+    await wait_status(manager, 'proc1', 'None')
+    print(f"удаление скрипта: статус None через {(time.monotonic() - started) * 1000:.1f} мс, "
+          f"версия {version} -> {manager.status_version}")
+
+    version = manager.status_version
+    manager.processes['proc0'].kill()
+    started = time.monotonic()
+    await wait_status(manager, 'proc0', 'Crashed')
+    print(f"завершение процесса: статус Crashed через {(time.monotonic() - started) * 1000:.1f} мс, "
+          f"версия {version} -> {manager.status_version}")
+
+    supervisor.request_stop()
+    await serve_task
+    watcher.close()
+
+
+def main():
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    names = [f"proc{index}" for index in range(PROCESSES)]
+    config = make_workspace(
+        scripts={name: SLEEPER for name in names[:PROCESSES * 3 // 4]},
+        processes={name: {'enable': 'true' if index < PROCESSES // 2 else 'false', 'restart': 'never'}
+                   for index, name in enumerate(names)},
+    )
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    manager.start_configured_processes()
+    try:
+        version = manager.status_version
+        for title, call in (("пересчет", lambda: recompute(manager)),
+                            ("таблица", lambda: manager._handle_status_all()),
+                            ("since, без изменений", lambda: manager._handle_status_all(version)),
+                            ("команда целиком", lambda: manager.handle_command(f'status processes since {version}'))):
+            stats = measure(call)
+            print(f"[{title:<20}] p50 {stats['p50'] * 1e6:7.1f} мкс, p99 {stats['p99'] * 1e6:7.1f} мкс")
+        asyncio.run(events(manager))
+    finally:
+        manager.stop_all_processes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Рассылка изменений статусов подписчикам против опроса "status processes".
+
+Супервизор (Supervisor + NetworkModule) управляет PROCESSES процессами;
+каждые KILL_INTERVAL секунд один из них аварийно завершается и через
+restart_delay перезапускается (Running -> Restarting -> Running).
+MONITORS клиентов в отдельном процессе SECONDS секунд следят за статусами:
+- опрос: "status processes" каждые POLL_INTERVAL секунд;
+- подписка: subscribe с продлением (keepalive) каждую секунду, изменения
+  приходят сообщениями STATUS.
+
+Выводятся: датаграммы и байты, принятые клиентами, запросы клиентов,
+время процессора супервизора, задержка обнаружения сбоя (от kill до
+момента, когда клиент увидел статус не Running) и число сбоев,
+которые клиенты не заметили.
+
+Запуск: python benchmarks/bench_status_push.py
+"""
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from common import ROOT_DIR, make_workspace, percentiles, quiet_logger
+from main_process.network_module import NetworkModule
+from main_process.process_manager import ProcessManager
+from main_process.supervisor import Supervisor
+
+PROCESSES = 12
+MONITORS = 8
+SECONDS = 6.0
+KILL_INTERVAL = 0.7
+POLL_INTERVAL = 0.2
+
+SLEEPER = '''
+import time
+time.sleep(600)
+'''
+
+CLIENT = '''
+import json
+import socket
+import sys
+import threading
+import time
+
+mode, port, seconds, monitors, interval = sys.argv[1], int(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4]), float(sys.argv[5])
+address = ("127.0.0.1", port)
+notices = []
+traffic = {"sent": 0, "received": 0, "bytes": 0}
+lock = threading.Lock()
+
+
+def observe(index, known, name, status, now):
+    if status != "Running" and known.get(name) == "Running":
+        with lock:
+            notices.append((index, name, now))
+    known[name] = status
+
+
+def poll(index, sock, deadline):
+    known = {}
+    while time.monotonic() < deadline:
+        sock.sendto(b"status processes", address)
+        data = sock.recv(65535)
+        now = time.monotonic()
+        with lock:
+            traffic["sent"] += 1
+            traffic["received"] += 1
+            traffic["bytes"] += len(data)
+        for line in data.decode("utf-8").splitlines()[1:]:
+            name, status = line.split(": ", 1)
+            observe(index, known, name, status.split(" (")[0], now)
+        time.sleep(interval)
+
+
+def subscribe(index, sock, deadline):
+    known, version = {}, None
+    next_keepalive = 0.0
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if now >= next_keepalive:
+            command = "subscribe 3" if version is None else f"subscribe 3 {version}"
+            sock.sendto(command.encode("utf-8"), address)
+            with lock:
+                traffic["sent"] += 1
+            next_keepalive = now + 1.0
+        sock.settimeout(max(0.001, min(next_keepalive, deadline) - now))
+        try:
+            data = sock.recv(65535)
+        except socket.timeout:
+            continue
+        now = time.monotonic()
+        with lock:
+            traffic["received"] += 1
+            traffic["bytes"] += len(data)
+        if not data.startswith(b"STATUS"):
+            continue
+        _, since, current, *items = data.decode("utf-8").split()
+        if version is not None and int(since) > version:
+            # Пропущено сообщение: полный список при следующем продлении
+            version, next_keepalive = None, now
+            continue
+        for item in items:
+            name, status = item.split("=", 1)
+            observe(index, known, name, status, now)
+        version = max(version or 0, int(current))
+    sock.sendto(b"unsubscribe", address)
+
+
+def monitor(index, deadline):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(2)
+    (poll if mode == "poll" else subscribe)(index, sock, deadline)
+    sock.close()
+
+
+deadline = time.monotonic() + seconds
+threads = [threading.Thread(target=monitor, args=(index, deadline)) for index in range(monitors)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(json.dumps({"traffic": traffic, "notices": notices}))
+'''
+
+
+async def killer(manager, kills):
+    while True:
+        await asyncio.sleep(KILL_INTERVAL)
+        running = [name for name, process in manager.processes.items() if process.poll() is None]
+        name = random.choice(running)
+        manager.processes[name].kill()
+        kills.append((name, time.monotonic()))
+
+
+async def run(mode):
+    names = [f"proc{index}" for index in range(PROCESSES)]
+    config = make_workspace(
+        scripts={name: SLEEPER for name in names},
+        processes={name: {'enable': 'true', 'restart': 'on-failure', 'restart_delay': 0.5,
+                          'restart_limit': 1000} for name in names},
+    )
+    logger = quiet_logger()
+    manager = ProcessManager(logger=logger, config_manager=config)
+    manager.start_configured_processes()
+    server = NetworkModule(host='127.0.0.1', port=0, logger=logger, command_handler=manager.handle_command,
+                           target_resolver=manager.command_target, status_source=manager.status_snapshot)
+    manager.add_status_listener(server.publish_status)
+    supervisor = Supervisor(manager, server, logger=logger)
+    serve_task = asyncio.create_task(supervisor.serve())
+    await asyncio.sleep(0.3)
+
+    loop = asyncio.get_running_loop()
+    kills = []
+    kill_task = asyncio.create_task(killer(manager, kills))
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    command = [sys.executable, "-c", CLIENT, mode, str(server.socket.getsockname()[1]),
+               str(SECONDS), str(MONITORS), str(POLL_INTERVAL)]
+    output = await loop.run_in_executor(
+        None, lambda: subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    kill_task.cancel()
+
+    supervisor.request_stop()
+    await serve_task
+    manager.stop_all_processes()
+
+    result = json.loads(output)
+    cpu = (after.ru_utime - usage.ru_utime) + (after.ru_stime - usage.ru_stime)
+    delays, missed = [], 0
+    for name, killed in kills:
+        for index in range(MONITORS):
+            noticed = [moment for monitor, notice, moment in result["notices"]
+                       if monitor == index and notice == name and moment >= killed]
+            if noticed:
+                delays.append(min(noticed) - killed)
+            else:
+                missed += 1
+    return result["traffic"], cpu, delays, missed, len(kills) * MONITORS
+
+
+def main():
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    random.seed(1)
+    for title, mode in (("опрос 5 Гц", "poll"), ("подписка", "subscribe")):
+        traffic, cpu, delays, missed, total = asyncio.run(run(mode))
+        stats = percentiles(delays) if delays else {'p50': float('nan'), 'p99': float('nan')}
+        print(f"[{title:<10}] запросов {traffic['sent']:5d}, принято {traffic['received']:5d} датаграмм "
+              f"({traffic['bytes'] / 1024:7.1f} КБ), CPU супервизора {cpu * 1000:6.0f} мс, "
+              f"обнаружение сбоя p50 {stats['p50'] * 1000:6.1f} мс, p99 {stats['p99'] * 1000:6.1f} мс, "
+              f"не замечено {missed} из {total}")
+
+
+if __name__ == '__main__':
+    main()
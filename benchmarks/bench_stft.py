@@ -0,0 +1,55 @@
+"""
+Производительность потокового STFT на одном ядре: кадров в секунду
+и коэффициент реального времени при 16 кГц (window_size=4096, overlap=0.5,
+frequency_range=1-1500, как в cfg.ini). Для сравнения приведен наивный
+вариант с циклом по кадрам на Python.
+
+Запуск: python benchmarks/bench_stft.py
+"""
+import time
+
+import numpy as np
+
+import common  # noqa: F401  (добавляет корень проекта в sys.path)
+from utils.stft import StreamingSTFT
+
+SAMPLE_RATE = 16000
+SECONDS = 120
+BLOCKS = (1024, 16384)
+WINDOW = 4096
+OVERLAP = 0.5
+FREQUENCY_RANGE = (1.0, 1500.0)
+
+
+def naive_stft(signal, window_size, hop):
+    window = np.hanning(window_size)
+    frames = []
+    for start in range(0, len(signal) - window_size + 1, hop):
+        frames.append(np.abs(np.fft.rfft(signal[start:start + window_size] * window)))
+    return frames
+
+
+def main():
+    t = np.arange(SAMPLE_RATE * SECONDS) / SAMPLE_RATE
+    signal = (8000 * np.sin(2 * np.pi * 440 * t) + 500 * np.random.randn(len(t))).astype(np.int16)
+
+    for channels in (1, 4):
+        samples = np.repeat(signal[:, None], channels, axis=1)
+        for block in BLOCKS:
+            stft = StreamingSTFT(WINDOW, OVERLAP, SAMPLE_RATE, FREQUENCY_RANGE, channels=channels)
+            started = time.perf_counter()
+            for offset in range(0, len(samples), block):
+                stft.push(samples[offset:offset + block])
+            elapsed = time.perf_counter() - started
+            print(f"Потоковое STFT, каналов {channels}, блок {block:>5}: {stft.frames_total / elapsed:8.0f} кадров/с, "
+                  f"реальное время x{SECONDS / elapsed:.0f}, бинов в кадре {stft.bins}")
+
+    started = time.perf_counter()
+    frames = naive_stft(signal.astype(np.float32), WINDOW, int(WINDOW * (1 - OVERLAP)))
+    elapsed = time.perf_counter() - started
+    print(f"Наивный цикл по кадрам, каналов 1:           {len(frames) / elapsed:8.0f} кадров/с, "
+          f"реальное время x{SECONDS / elapsed:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Запас производительности str3_saver: процесс запускается через ProcessManager,
+кадры 16 кГц x 16 бит x N каналов пишутся в кольцевой буфер adc со скоростью
+АЦП, умноженной на x100 / x300 / x1000. Потери - доля поданных байт, не
+дошедших до файлов (переполнение кольца или отброшенные блоки write-behind).
+Запас - наибольший множитель без потерь.
+
+Запуск: python benchmarks/bench_str3_saver.py
+"""
+import os
+import time
+
+import numpy as np
+
+from common import ROOT_DIR, make_workspace, quiet_logger
+from main_process.process_manager import ProcessManager
+
+DURATION = 3.0
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 1024
+SLOTS = 256
+SPEEDUPS = (100, 300, 1000)
+
+
+def stored_bytes(directory):
+    if not os.path.isdir(directory):
+        return 0
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory) if name.endswith('.raw'))
+
+
+def run(channels, speedup):
+    """Подает кадры со скоростью АЦП, умноженной на speedup; возвращает (МБ/с на носитель, доля потерь)."""
+    with open(os.path.join(ROOT_DIR, 'processes', 'str3_saver.py'), encoding='utf-8') as f:
+        saver_source = f.read()
+    config = make_workspace(
+        scripts={'str3_saver': saver_source},
+        processes={
+            'adc': {'enable': 'false', 'type': 'adc', 'sampling_rate': SAMPLE_RATE, 'bit_depth': 16,
+                    'channels': channels, 'frame_samples': FRAME_SAMPLES, 'ring_slots': SLOTS},
+            'str3_saver': {'enable': 'true', 'type': 'str3_saver', 'source': 'adc', 'output_dir': 'out',
+                           'max_files': 1000, 'file_mb': 64, 'poll_interval': 0.001, 'stats_interval': 3600},
+        },
+    )
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    manager.start_process('str3_saver')
+    ring = manager.rings['adc']
+    frame = np.random.randint(-2 ** 15, 2 ** 15, size=(FRAME_SAMPLES, channels), dtype=np.int16)
+    frames_per_second = SAMPLE_RATE * speedup / FRAME_SAMPLES
+    time.sleep(1.0)
+
+    written = 0
+    started = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= DURATION:
+            break
+        due = int(elapsed * frames_per_second)
+        if written >= due:
+            time.sleep(0.001)
+            continue
+        for _ in range(due - written):
+            np.copyto(ring.claim(), frame)
+            ring.commit()
+        written = due
+    elapsed = time.perf_counter() - started
+    # При остановке saver дописывает очередь и неполный буфер
+    manager.stop_all_processes()
+    manager.close_rings()
+
+    stored = stored_bytes('out')
+    expected = written * frame.nbytes
+    return stored / elapsed / 1e6, 1 - stored / expected if expected else 0.0
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    for channels in (1, 4, 8, 16):
+        required = SAMPLE_RATE * 2 * channels / 1e6
+        results = []
+        for speedup in SPEEDUPS:
+            achieved, lost = run(channels, speedup)
+            results.append(f"x{speedup}: {achieved:6.1f} МБ/с, потери {lost * 100:.2f}%")
+        print(f"каналов {channels:>2} (реальное время {required:.3f} МБ/с) - " + "; ".join(results))
+
+
+if __name__ == '__main__':
+    main()
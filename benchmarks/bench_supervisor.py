@@ -0,0 +1,96 @@
+"""
+Бенчмарк цикла супервизора.
+
+1. Загрузка CPU в простое: событийный цикл против прежнего `while True: pass`.
+2. Задержка от завершения дочернего процесса до его обнаружения ProcessManager.
+
+Запуск: python benchmarks/bench_supervisor.py
+"""
+import asyncio
+import time
+
+from common import make_workspace, quiet_logger, percentiles
+from main_process.process_manager import ProcessManager
+from main_process.supervisor import Supervisor
+
+IDLE_SECONDS = 3.0
+CRASH_ROUNDS = 30
+
+CRASHER = '''
+import argparse
+import os
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--delay", type=float, default=0.1)
+parser.add_argument("--stamp", type=str)
+args = parser.parse_args()
+time.sleep(args.delay)
+with open(args.stamp, "w") as f:
+    f.write(repr(time.monotonic()))
+os._exit(1)
+'''
+
+
+class RecordingSupervisor(Supervisor):
+    """Супервизор, запоминающий момент обнаружения завершения процессов."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.detected = asyncio.Queue()
+
+    def _on_sigchld(self):
+        now = time.monotonic()
+        for name, returncode in self.process_manager.reap_children():
+            self.detected.put_nowait((name, now))
+
+
+def busy_loop_cpu(seconds: float) -> float:
+    start_wall, start_cpu = time.monotonic(), time.process_time()
+    while time.monotonic() - start_wall < seconds:
+        pass
+    return (time.process_time() - start_cpu) / (time.monotonic() - start_wall)
+
+
+async def run_benchmark():
+    config_manager = make_workspace(
+        scripts={'crasher': CRASHER},
+        processes={'crasher': {'enable': 'false', 'delay': 0.1}},
+    )
+    logger = quiet_logger()
+    process_manager = ProcessManager(logger=logger, config_manager=config_manager)
+    supervisor = RecordingSupervisor(process_manager, logger=logger)
+    serve_task = asyncio.create_task(supervisor.serve())
+    await asyncio.sleep(0)
+
+    start_wall, start_cpu = time.monotonic(), time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = (time.process_time() - start_cpu) / (time.monotonic() - start_wall)
+
+    latencies = []
+    for i in range(CRASH_ROUNDS):
+        stamp = f'exit_{i}.stamp'
+        process_manager.start_process('crasher', {'stamp': stamp})
+        name, detected_at = await supervisor.detected.get()
+        with open(stamp) as f:
+            exited_at = float(f.read())
+        latencies.append((detected_at - exited_at) * 1000.0)
+
+    supervisor.request_stop()
+    await serve_task
+    return idle_cpu, latencies
+
+
+def main():
+    idle_cpu, latencies = asyncio.run(run_benchmark())
+    busy_cpu = busy_loop_cpu(IDLE_SECONDS)
+    stats = percentiles(latencies)
+
+    print(f"CPU в простое, событийный цикл: {idle_cpu * 100:.2f}%")
+    print(f"CPU в простое, while True: pass: {busy_cpu * 100:.2f}%")
+    print(f"Задержка обнаружения завершения ({len(latencies)} процессов), мс: "
+          f"p50={stats['p50']:.2f} p99={stats['p99']:.2f} max={stats['max']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Стоимость телеметрии процессов (main_process/telemetry.py).
+
+Запускается PROCESSES процессов; замеряется время одной фоновой выборки
+из /proc по всем процессам и время ответа на команды metrics all,
+metrics <имя> history и status processes, которые читают только кэш.
+Для сравнения - время чтения /proc по всем процессам прямо в запросе.
+
+Запуск: python benchmarks/bench_telemetry.py
+"""
+import json
+import os
+import time
+
+from common import ROOT_DIR, make_workspace, quiet_logger, percentiles
+from main_process.process_manager import ProcessManager
+from main_process.telemetry import read_proc
+
+PROCESSES = 10
+ROUNDS = 200
+
+WORKER = '''
+import time
+import numpy as np
+
+data = np.zeros(1 << 20)
+while True:
+    data += 1
+    time.sleep(0.01)
+'''
+
+
+def measure(function):
+    samples = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return percentiles(samples)
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    names = [f"worker{index}" for index in range(PROCESSES)]
+    config = make_workspace(scripts={name: WORKER for name in names},
+                            processes={name: {'enable': 'true'} for name in names})
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    manager.start_configured_processes()
+    manager.start_telemetry(interval=0.2, history_seconds=60)
+    time.sleep(1.5)
+
+    print(f"Процессов {PROCESSES}")
+    for title, function in (
+            ("выборка из /proc (фоновый поток)", manager.telemetry.sample),
+            ("чтение /proc в запросе", lambda: [read_proc(process.pid) for process in manager.processes.values()]),
+            ("metrics all", lambda: manager.handle_command("metrics all")),
+            ("metrics worker0 history", lambda: manager.handle_command("metrics worker0 history")),
+            ("status processes", lambda: manager.handle_command("status processes"))):
+        stats = measure(function)
+        print(f"{title:<34}: p50 {stats['p50']:8.1f} мкс, p99 {stats['p99']:8.1f} мкс")
+
+    _, payload = manager.handle_command("metrics worker0")
+    print(f"metrics worker0 ({len(payload)} байт): {payload}")
+    _, history = manager.handle_command("metrics worker0 history")
+    print(f"metrics worker0 history: выборок {len(json.loads(history)['t'])}, {len(history)} байт")
+    manager.stop_telemetry()
+    manager.stop_all_processes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Задержка от запуска процесса до его готовности: Popen против zygote.
+
+Процесс импортирует NumPy и модули проекта (как adc и fft), подключается
+к кольцевому буферу запущенного заранее производителя adc и сообщает
+о готовности (utils.ready.notify_ready).
+Замеряется время ProcessManager.start_processes([имя]) - от запроса
+на запуск до сигнала готовности - для запуска через Popen и через zygote
+с предварительно импортированными модулями, а также однократная
+стоимость запуска самого zygote.
+
+Запуск: python benchmarks/bench_zygote.py
+"""
+import os
+import time
+
+from common import ROOT_DIR, make_workspace, quiet_logger, percentiles
+from main_process.process_manager import ProcessManager
+
+ROUNDS = 15
+PRELOAD = "numpy, utils.ring_buffer, utils.stft"
+
+SERVICE = '''
+import argparse
+import signal
+import time
+
+import numpy as np
+
+from utils.ready import notify_ready
+from utils.ring_buffer import RingBuffer
+from utils.stft import StreamingSTFT
+
+running = True
+
+
+def on_terminate(signum, frame):
+    global running
+    running = False
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--ring", type=str, required=True)
+parser.add_argument("--ring_consumer", type=int, default=0)
+args, _ = parser.parse_known_args()
+signal.signal(signal.SIGTERM, on_terminate)
+
+ring = RingBuffer.attach(args.ring)
+consumer = ring.consumer(args.ring_consumer)
+stft = StreamingSTFT(window_size=4096, overlap=0.5, sample_rate=16000, channels=ring.channels)
+notify_ready()
+while running:
+    time.sleep(0.01)
+ring.close()
+'''
+
+SLEEPER = '''
+import time
+time.sleep(600)
+'''
+
+
+def run(zygote):
+    config = make_workspace(
+        scripts={'service': SERVICE, 'adc': SLEEPER},
+        processes={
+            'adc': {'enable': 'false', 'type': 'adc', 'channels': 4, 'zygote': 'false'},
+            'service': {'enable': 'false', 'type': 'service', 'source': 'adc', 'ready': 'notify'},
+        },
+        extra_sections={'zygote': {'enable': 'true' if zygote else 'false', 'preload': PRELOAD}},
+    )
+    manager = ProcessManager(logger=quiet_logger(), config_manager=config)
+    # Читатель не запускается без источника данных
+    manager.start_processes(['adc'])
+
+    warmup = 0.0
+    if zygote:
+        started = time.perf_counter()
+        manager._zygote_for('service')
+        warmup = time.perf_counter() - started
+
+    samples = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        ready = manager.start_processes(['service'])['service']
+        samples.append(time.perf_counter() - started)
+        if not ready:
+            raise RuntimeError("процесс не сообщил о готовности")
+        manager.stop_process('service')
+    manager.stop_all_processes()
+    manager.close_rings()
+    return percentiles(samples), warmup
+
+
+def main():
+    # Дочерние процессы импортируют utils из корня проекта
+    os.environ["PYTHONPATH"] = ROOT_DIR
+    for title, zygote in (("Popen", False), ("zygote", True)):
+        stats, warmup = run(zygote)
+        line = (f"{title:<7}: запуск до готовности p50 {stats['p50'] * 1000:7.1f} мс, "
+                f"p99 {stats['p99'] * 1000:7.1f} мс, max {stats['max'] * 1000:7.1f} мс")
+        if zygote:
+            line += f" (запуск zygote {warmup * 1000:.0f} мс, однократно)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
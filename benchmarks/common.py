@@ -0,0 +1,71 @@
+"""Общие помощники для бенчмарков: временное рабочее окружение с cfg.ini и processes/."""
+import os
+import sys
+import tempfile
+import logging
+import statistics
+from typing import Dict, Any, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from main_process.cfg import ConfigManager
+
+
+def make_workspace(scripts: Dict[str, str], processes: Dict[str, Dict[str, Any]],
+                   extra_sections: Dict[str, Dict[str, Any]] = None) -> ConfigManager:
+    """
+    Создает временный каталог с cfg.ini и скриптами processes/<name>.py
+    и делает его текущим (ProcessManager ищет скрипты по относительному пути).
+
+    Args:
+        scripts: Исходные тексты скриптов процессов по именам
+        processes: Содержимое секций [process:<name>]
+        extra_sections: Прочие секции конфигурации
+
+    Returns:
+        ConfigManager с загруженной конфигурацией
+    """
+    workdir = tempfile.mkdtemp(prefix='popgm_bench_')
+    os.makedirs(os.path.join(workdir, 'processes'))
+    for name, source in scripts.items():
+        with open(os.path.join(workdir, 'processes', f'{name}.py'), 'w', encoding='utf-8') as f:
+            f.write(source)
+
+    lines = []
+    for section, values in (extra_sections or {}).items():
+        lines.append(f'[{section}]')
+        lines.extend(f'{key} = {value}' for key, value in values.items())
+    for name, values in processes.items():
+        lines.append(f'[process:{name}]')
+        lines.extend(f'{key} = {value}' for key, value in values.items())
+
+    cfg_path = os.path.join(workdir, 'cfg.ini')
+    with open(cfg_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    os.chdir(workdir)
+    config_manager = ConfigManager(cfg_path, logger=quiet_logger())
+    config_manager.load_config()
+    return config_manager
+
+
+def quiet_logger(name: str = 'bench') -> logging.Logger:
+    """Логгер, пишущий только ошибки, чтобы не искажать замеры."""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.ERROR)
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+    return logger
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Возвращает p50/p99/max по списку замеров."""
+    ordered = sorted(samples)
+    p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+    return {
+        'p50': statistics.median(ordered),
+        'p99': ordered[p99_index],
+        'max': ordered[-1],
+    }
@@ -1,27 +1,256 @@
-import smbus
 import time
-import subprocess
+from typing import Dict, List, Tuple
+
+try:
+    # smbus2 умеет i2c_rdwr - несколько сообщений за один вызов ioctl
+    from smbus2 import SMBus, i2c_msg
+except ImportError:
+    SMBus = i2c_msg = None
+    try:
+        import smbus
+    except ImportError:
+        smbus = None
+
+# Предел сообщений в одном вызове I2C_RDWR (I2C_RDWR_IOCTL_MAX_MSGS в ядре Linux)
+MAX_MESSAGES = 42
+# Предел данных в блочной записи SMBus (без i2c_rdwr), включая младший байт подадреса
+SMBUS_BLOCK_MAX = 32
+
+
+# Размер слова по адресу ADAU1761: ОЗУ параметров - 4 байта,
+# ОЗУ программы - 5 байт, управляющие регистры - 1 байт на адрес
+def word_size(address):
+    if address < 0x0800:
+        return 4
+    if address < 0x4000:
+        return 5
+    return 1
+
+
+# Адреса ADAU1761, используемые при частичной перезагрузке
+DSP_RUN_REGISTER = 0x40F6
+# Регистры safeload в ОЗУ параметров: данные (до 5 слов), целевой адрес - 1, число слов (запуск)
+SAFELOAD_DATA = 0x0001
+SAFELOAD_TARGET = 0x0006
+SAFELOAD_TRIGGER = 0x0007
+SAFELOAD_MAX_WORDS = 5
+
+I2C_M_RD = 0x0001
+
+
+class _Message:
+    # Сообщение в формате smbus2.i2c_msg для шины без smbus2 (FakeSMBus)
+    def __init__(self, addr, flags, data):
+        self.addr = addr
+        self.flags = flags
+        self.buf = bytes(data)
+        self.len = len(self.buf)
+
+    def __iter__(self):
+        return iter(self.buf)
+
+    @classmethod
+    def write(cls, addr, data):
+        return cls(addr, 0, data)
+
+    @classmethod
+    def read(cls, addr, length):
+        return cls(addr, I2C_M_RD, bytes(length))
+
+
+class FakeSMBus:
+    # Программная модель шины с ADAU1761 для проверки и замеров без железа.
+    # Хранит записанные значения по адресам, выполняет safeload и считает
+    # время передачи на заданной частоте шины (9 тактов на байт плюс START/STOP).
+    msg_factory = _Message
+
+    def __init__(self, bit_rate=400000, realtime=False):
+        self.bit_rate = bit_rate
+        self.realtime = realtime
+        self.memory: Dict[int, bytes] = {}
+        self.transactions = 0
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bus_time = 0.0
+        self.safeloads = 0
+        self.log: List[Tuple[int, bytes]] = []
+        # Текущий подадрес и смещение байта внутри слова для последовательного чтения
+        self._pointer = (0, 0)
+
+    def _account(self, length):
+        # Байт адреса устройства + length байт, по 9 тактов, и START/STOP
+        duration = ((1 + length) * 9 + 2) / self.bit_rate
+        self.transactions += 1
+        self.bytes_sent += length
+        self.bus_time += duration
+        if self.realtime:
+            time.sleep(duration)
+
+    def _write(self, payload):
+        payload = bytes(payload)
+        address = (payload[0] << 8) | payload[1]
+        data = payload[2:]
+        self._pointer = (address, 0)
+        self._account(len(payload))
+        if not data:
+            # Только подадрес - подготовка к чтению
+            return
+        size = word_size(address)
+        for offset in range(0, len(data), size):
+            self.memory[address + offset // size] = data[offset:offset + size]
+        self.log.append((address, data))
+        if address <= SAFELOAD_TRIGGER < address + len(data) // size:
+            self._safeload()
+
+    def _safeload(self):
+        # Перенос слов из регистров safeload по целевому адресу (на границе кадра в реальном DSP)
+        count = int.from_bytes(self.memory.get(SAFELOAD_TRIGGER, bytes(4)), 'big')
+        target = int.from_bytes(self.memory.get(SAFELOAD_TARGET, bytes(4)), 'big') + 1
+        if count == 0:
+            return
+        for index in range(min(count, SAFELOAD_MAX_WORDS)):
+            self.memory[target + index] = self.memory.get(SAFELOAD_DATA + index, bytes(4))
+        self.safeloads += 1
+
+    def _read(self, length):
+        address, offset = self._pointer
+        result = bytearray()
+        while len(result) < length:
+            size = word_size(address)
+            word = self.memory.get(address, bytes(size))
+            take = min(size - offset, length - len(result))
+            result += word[offset:offset + take]
+            offset += take
+            if offset == size:
+                address, offset = address + 1, 0
+        self._pointer = (address, offset)
+        self._account(length)
+        return bytes(result)
+
+    def i2c_rdwr(self, *messages):
+        self.calls += 1
+        for message in messages:
+            if message.flags & I2C_M_RD:
+                message.buf = self._read(message.len)
+            else:
+                self._write(list(message))
+
+    def write_i2c_block_data(self, i2c_addr, register, data):
+        self.calls += 1
+        self._write([register] + list(data))
+
+    def write_byte_data(self, i2c_addr, register, value):
+        self.calls += 1
+        self._write([register, value])
+
+    def read_byte(self, i2c_addr):
+        self.calls += 1
+        return self._read(1)[0]
+
+    def peek(self, address, count):
+        # Значения count адресов начиная с address (для проверки, без учета времени шины)
+        return [self.memory.get(address + index) for index in range(count)]
+
 
 class ADAU1761:
-    # Инициализация шины и адреса DSP
-    def __init__(self, i2c_bus=5, i2c_address=0x38):
-        self.bus = smbus.SMBus(i2c_bus)
+    # Инициализация шины и адреса DSP.
+    # bus - готовый объект шины (например FakeSMBus), иначе открывается /dev/i2c-<i2c_bus>.
+    # max_transfer - наибольшее число байт данных в одном сообщении I2C.
+    def __init__(self, i2c_bus=5, i2c_address=0x38, bus=None, max_transfer=4096):
+        if bus is None:
+            if SMBus is not None:
+                bus = SMBus(i2c_bus)
+            elif smbus is not None:
+                bus = smbus.SMBus(i2c_bus)
+            else:
+                raise ImportError("Не установлен модуль smbus2 или smbus")
+        self.bus = bus
         self.address = i2c_address
-        
-    # Метод записи блоков данных в адреса   
+        # i2c_rdwr позволяет передать весь блок с 2-байтовым подадресом одним сообщением,
+        # иначе используется блочная запись SMBus (до 32 байт)
+        self.combined = hasattr(bus, "i2c_rdwr")
+        self.msg = getattr(bus, "msg_factory", None) or i2c_msg or _Message
+        self.max_transfer = max_transfer if self.combined else SMBUS_BLOCK_MAX - 1
+        self._pending: List[Tuple[int, bytearray]] = []
+
+    # Метод записи блоков данных в адреса.
+    # Запись откладывается: подряд идущие блоки с непрерывными адресами
+    # объединяются и уходят на шину при flush() или перед задержкой
     def write_register_block(self, address, data):
-        # Преобразуем адрес в 2 байта (старший и младший)
-        # Т.е если адрес 0x4002, то 0x40 старший, 0x02 младший
-        
-        addr_high = (address >> 8) & 0xFF
-        addr_low = address & 0xFF
-        if not isinstance(data, list):
-            self.bus.write_byte_data(self.address, addr_high, data)
-        time.sleep(0.001)
+        data = bytes(data) if isinstance(data, (list, tuple, bytes, bytearray, memoryview)) else bytes([data & 0xFF])
+        if self._pending:
+            last_address, last_data = self._pending[-1]
+            size = word_size(last_address)
+            if word_size(address) == size and last_address + len(last_data) // size == address:
+                last_data.extend(data)
+                return True
+        self._pending.append((address, bytearray(data)))
         return True
 
-    # Метод задержки между запясями    
+    # Разбивает отложенные записи на сообщения: не длиннее max_transfer
+    # и по границам слов (адрес следующей части должен быть целым)
+    def _messages(self):
+        for address, data in self._pending:
+            size = word_size(address)
+            chunk = max(size, self.max_transfer // size * size)
+            for offset in range(0, len(data), chunk):
+                part_address = address + offset // size
+                # Преобразуем адрес в 2 байта (старший и младший)
+                # Т.е если адрес 0x4002, то 0x40 старший, 0x02 младший
+                yield bytes([(part_address >> 8) & 0xFF, part_address & 0xFF]) + bytes(data[offset:offset + chunk])
+
+    # Передает отложенные записи на шину
+    def flush(self):
+        if not self._pending:
+            return
+        payloads = list(self._messages())
+        self._pending = []
+        if self.combined:
+            for start in range(0, len(payloads), MAX_MESSAGES):
+                self.bus.i2c_rdwr(*(self._message(payload) for payload in payloads[start:start + MAX_MESSAGES]))
+        else:
+            for payload in payloads:
+                self.bus.write_i2c_block_data(self.address, payload[0], list(payload[1:]))
+
+    def _message(self, payload):
+        return self.msg.write(self.address, payload)
+
+    # Чтение count слов начиная с address (для проверки состояния и теневой копии регистров)
+    def read_register_block(self, address, count):
+        self.flush()
+        size = word_size(address)
+        chunk = max(1, self.max_transfer // size)
+        result = bytearray()
+        for start in range(0, count, chunk):
+            part_address = address + start
+            length = min(chunk, count - start) * size
+            subaddress = [(part_address >> 8) & 0xFF, part_address & 0xFF]
+            if self.combined:
+                # Запись подадреса и чтение с повторным START одним вызовом
+                read = self.msg.read(self.address, length)
+                self.bus.i2c_rdwr(self.msg.write(self.address, subaddress), read)
+                result += bytes(list(read))
+            else:
+                self.bus.write_byte_data(self.address, subaddress[0], subaddress[1])
+                result += bytes(self.bus.read_byte(self.address) for _ in range(length))
+        return bytes(result)
+
+    # Запись слов ОЗУ параметров через safeload: DSP подменяет их на границе
+    # кадра, поэтому работающий звуковой тракт не прерывается.
+    # Слова передаются частями по SAFELOAD_MAX_WORDS
+    def safeload(self, address, data):
+        data = bytes(data)
+        for offset in range(0, len(data), SAFELOAD_MAX_WORDS * 4):
+            part = data[offset:offset + SAFELOAD_MAX_WORDS * 4]
+            self.write_register_block(SAFELOAD_DATA, part)
+            self.write_register_block(SAFELOAD_TARGET, (address + offset // 4 - 1).to_bytes(4, 'big'))
+            self.write_register_block(SAFELOAD_TRIGGER, (len(part) // 4).to_bytes(4, 'big'))
+            # Следующий safeload нельзя начинать до переноса предыдущего
+            self.flush()
+
+    # Метод задержки между запясями: сначала отправляем все, что записано до нее
     def write_delay(self, delay_ms):
+        self.flush()
         time.sleep(delay_ms / 1000.0)
     
     # Загрузка начальной конфигурации
@@ -152,6 +381,7 @@ class ADAU1761:
         self.write_register_block(0x4036, 0x00)
         # (R31_DEJITTER_REGISTER_CONTROL_IC_1_Default)
         self.write_register_block(0x4036, 0x03)
+        self.flush()
         
         print("Конфигурация DSP успешно завершена")
 
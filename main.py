@@ -2,12 +2,19 @@ from main_process.network_module import NetworkModule
 from main_process.cfg import ConfigManager
 from main_process.process_manager import ProcessManager
 from main_process.logger import LoggerManager
+from main_process.supervisor import Supervisor
+from main_process.binary_protocol import BinaryCommandHandler
+from main_process.config_watcher import ConfigWatcher, ScriptsWatcher
+from main_process.federation import Federation, parse_peers
 import logging
+import socket
 
-def create_command_handler(process_manager):
-    """Создает обработчик команд для ProcessManager."""
+def create_command_handler(process_manager, federation=None):
+    """Создает обработчик команд для ProcessManager (команды cluster - для Federation)."""
     def handler(command):
         try:
+            if federation is not None and command.split(None, 1)[0].lower() == "cluster":
+                return federation.handle_command(command)
             # Обрабатываем команду через ProcessManager
             return process_manager.handle_command(command)
         except Exception as e:
@@ -30,17 +37,54 @@ if __name__ == "__main__":
     
     # Инициализация ProcessManager с конфигурацией
     process_manager = ProcessManager(logger=logger, config_manager=config_manager)
+    telemetry_config = config.get('telemetry', {})
+    process_manager.start_telemetry(
+        interval=float(telemetry_config.get('interval', 1.0)),
+        history_seconds=float(telemetry_config.get('history_minutes', 10)) * 60,
+    )
+    output_config = config.get('output', {})
+    if output_config.get('capture', True):
+        process_manager.start_output_capture(
+            queue_size=int(output_config.get('queue_size', 10000)),
+            max_line=int(output_config.get('max_line', 4096)),
+        )
     
-    # Создаем обработчик команд
-    command_handler = create_command_handler(process_manager)
+    # Создаем обработчик команд (команды cluster выполняет федерация узлов)
+    network_config = config.get('network', {})
+    federation = None
+    if network_config.get('federation', False):
+        port = network_config.get('port', 30000)
+        federation = Federation(
+            parse_peers(network_config.get('hosts', ''), port, network_config.get('host')),
+            node=str(network_config.get('node') or f"{socket.gethostname()}:{port}"),
+            command_handler=process_manager.handle_command,
+            status_source=process_manager.status_snapshot,
+            timeout=float(network_config.get('timeout', 10)),
+            gossip_interval=float(network_config.get('gossip_interval', 1.0)),
+            gossip_fanout=int(network_config.get('gossip_fanout', 2)),
+            peer_ttl=float(network_config.get('peer_ttl', 5)),
+            logger=logger,
+        )
+    command_handler = create_command_handler(process_manager, federation)
     
     # Инициализация NetworkModule с обработчиком команд
     server = NetworkModule(
         host=config.get('network', {}).get('host', '0.0.0.0'),
         port=config.get('network', {}).get('port', 30000),
         logger=logger,
-        command_handler=command_handler
+        command_handler=command_handler,
+        target_resolver=process_manager.command_target,
+        batch_size=config.get('network', {}).get('batch_size', 1),
+        binary_handler=BinaryCommandHandler(process_manager, logger=logger),
+        mtu=config.get('network', {}).get('mtu', 1400),
+        status_source=process_manager.status_snapshot,
+        subscribe_ttl=config.get('network', {}).get('subscribe_ttl', 30),
+        subscribe_max_ttl=config.get('network', {}).get('subscribe_max_ttl', 300),
+        coalesce_delay=config.get('network', {}).get('subscribe_coalesce', 0.05),
+        max_subscribers=config.get('network', {}).get('subscribers', 64)
     )
+    # Изменения статусов процессов рассылаются подписчикам (команда subscribe)
+    process_manager.add_status_listener(server.publish_status)
     
     try:
         logger.info("Запуск системы...")
@@ -49,13 +93,34 @@ if __name__ == "__main__":
         
         logger.info("Текущие процессы: %s", process_manager.list_all_processes_statuses())
         
-        # Запуск сервера
-        server.start()
-        logger.info("UDP-сервер запущен")
-        
-        # Основной цикл
-        while True:
-            pass
+        # Перезагрузка конфигурации при записи cfg.ini (команда reload работает всегда)
+        reload_config = config.get('reload', {})
+        watcher = None
+        if reload_config.get('watch', False):
+            watcher = ConfigWatcher('cfg.ini')
+            try:
+                watcher.open()
+            except OSError as e:
+                logger.warning(f"Наблюдение за cfg.ini недоступно: {e}")
+                watcher = None
+
+        # Статусы процессов обновляются по событиям; появление и удаление скриптов - тоже событие
+        scripts_watcher = ScriptsWatcher('processes')
+        try:
+            scripts_watcher.open()
+        except OSError as e:
+            logger.warning(f"Наблюдение за каталогом processes недоступно: {e}")
+            scripts_watcher = None
+
+        # Основной цикл: сигналы, завершение дочерних процессов и UDP-сервер
+        supervisor = Supervisor(process_manager, server, logger=logger, config_watcher=watcher,
+                                reload_delay=float(reload_config.get('delay', 0.5)),
+                                scripts_watcher=scripts_watcher, federation=federation)
+        supervisor.run()
+        if watcher is not None:
+            watcher.close()
+        if scripts_watcher is not None:
+            scripts_watcher.close()
             
     except KeyboardInterrupt:
         logger.info("Получен сигнал KeyboardInterrupt, остановка системы...")
@@ -64,5 +129,9 @@ if __name__ == "__main__":
     finally:
         # Остановка всех процессов и сервера
         process_manager.stop_all_processes()
+        process_manager.stop_telemetry()
+        process_manager.stop_output_capture()
+        process_manager.close_rings()
         server.stop()
-        logger.info("Система остановлена")
\ No newline at end of file
+        logger.info("Система остановлена")
+        logger_manager.stop()
\ No newline at end of file
@@ -0,0 +1,216 @@
+import struct
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Заголовок кадра: магия, версия, код операции, код результата, id запроса, длина полезной нагрузки.
+# Магия начинается с байта 0xA5, который не может начинать UTF-8 строку,
+# поэтому бинарные кадры однозначно отличаются от текстовых команд на том же порту.
+MAGIC = b'\xa5\x5a'
+VERSION = 1
+HEADER = struct.Struct('!2sBBBIH')
+HEADER_SIZE = HEADER.size
+
+# Коды операций. В ответе код операции совпадает с кодом запроса с установленным RESPONSE_FLAG.
+OP_START = 0x01
+OP_STOP = 0x02
+OP_STATUS = 0x03
+OP_STATUS_ALL = 0x04
+OP_SHUTDOWN = 0x05
+RESPONSE_FLAG = 0x80
+
+# Коды результата
+RESULT_OK = 0
+RESULT_UNKNOWN_OPCODE = 1
+RESULT_MALFORMED = 2
+RESULT_NOT_CONFIGURED = 3
+RESULT_ALREADY_RUNNING = 4
+RESULT_NOT_RUNNING = 5
+RESULT_FAILED = 6
+RESULT_BAD_VERSION = 7
+
+# Итоги ProcessManager.manual_start / manual_stop -> коды результата (как у текстовых команд)
+_START_RESULTS = {"not_configured": RESULT_NOT_CONFIGURED, "already_running": RESULT_ALREADY_RUNNING,
+                  "started": RESULT_OK, "failed": RESULT_FAILED}
+_STOP_RESULTS = {"not_configured": RESULT_NOT_CONFIGURED, "not_running": RESULT_NOT_RUNNING,
+                 "cancelled": RESULT_OK, "stopped": RESULT_OK, "failed": RESULT_FAILED}
+
+# Коды состояния процесса (соответствуют строкам ProcessManager.get_process_status)
+PROCESS_STATES = {
+    "Running": 1,
+    "Stopped": 2,
+    "Crashed": 3,
+    "Disabled": 4,
+    "None": 5,
+    "Not Configured": 6,
+    "Restarting": 7,
+    "CrashLoop": 8,
+}
+PROCESS_STATE_NAMES = {code: name for name, code in PROCESS_STATES.items()}
+
+_U8 = struct.Struct('!B')
+_U16 = struct.Struct('!H')
+
+
+class Frame(NamedTuple):
+    opcode: int
+    result: int
+    request_id: int
+    payload: bytes
+
+
+def is_binary(data) -> bool:
+    """Проверяет, является ли датаграмма бинарным кадром."""
+    return len(data) >= HEADER_SIZE and data[:2] == MAGIC
+
+
+def encode_frame(opcode: int, request_id: int, payload: bytes = b'', result: int = RESULT_OK) -> bytes:
+    return HEADER.pack(MAGIC, VERSION, opcode, result, request_id, len(payload)) + payload
+
+
+def decode_frame(data) -> Frame:
+    """
+    Разбирает кадр.
+
+    Raises:
+        ValueError: Если кадр поврежден или версия не поддерживается
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Кадр короче заголовка")
+    magic, version, opcode, result, request_id, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Неверная сигнатура кадра")
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия протокола: {version}")
+    if len(data) < HEADER_SIZE + length:
+        raise ValueError("Длина полезной нагрузки превышает размер кадра")
+    return Frame(opcode, result, request_id, bytes(data[HEADER_SIZE:HEADER_SIZE + length]))
+
+
+def pack_str(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    return _U8.pack(len(raw)) + raw
+
+
+def unpack_str(payload: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _U8.unpack_from(payload, offset)
+    offset += 1
+    if offset + length > len(payload):
+        raise ValueError("Строка выходит за границы кадра")
+    return payload[offset:offset + length].decode('utf-8'), offset + length
+
+
+def encode_start(request_id: int, name: str, args: Optional[Dict[str, str]] = None) -> bytes:
+    """Кадр запроса start: имя процесса и пары --ключ значение."""
+    args = args or {}
+    parts = [pack_str(name), _U8.pack(len(args))]
+    for key, value in args.items():
+        raw = str(value).encode('utf-8')
+        parts.append(pack_str(key) + _U16.pack(len(raw)) + raw)
+    return encode_frame(OP_START, request_id, b''.join(parts))
+
+
+def encode_request(opcode: int, request_id: int, name: Optional[str] = None) -> bytes:
+    """Кадр запроса stop/status (с именем процесса) или status-all/shutdown (без него)."""
+    return encode_frame(opcode, request_id, pack_str(name) if name is not None else b'')
+
+
+def decode_status_all(payload: bytes) -> Dict[str, str]:
+    """Разбирает ответ status-all в словарь {имя процесса: статус}."""
+    (count,) = _U16.unpack_from(payload, 0)
+    offset = 2
+    statuses = {}
+    for _ in range(count):
+        name, offset = unpack_str(payload, offset)
+        statuses[name] = PROCESS_STATE_NAMES.get(payload[offset], "Unknown")
+        offset += 1
+    return statuses
+
+
+class BinaryCommandHandler:
+    """
+    Обработчик бинарных кадров для ProcessManager.
+
+    Обращается к ProcessManager напрямую, минуя shlex и форматирование
+    текстовых ответов. Запросы несут request_id, поэтому клиент может
+    отправлять их конвейером и сопоставлять ответы в любом порядке.
+    """
+
+    def __init__(self, process_manager, logger=None):
+        self.process_manager = process_manager
+        self.logger = logger or process_manager.logger
+        self._handlers = {
+            OP_START: self._handle_start,
+            OP_STOP: self._handle_stop,
+            OP_STATUS: self._handle_status,
+            OP_STATUS_ALL: self._handle_status_all,
+            OP_SHUTDOWN: self._handle_shutdown,
+        }
+
+    def target(self, data: bytes) -> Optional[str]:
+        """Имя процесса, к которому адресован кадр (для упорядочивания в NetworkModule)."""
+        if len(data) <= HEADER_SIZE or data[3] not in (OP_START, OP_STOP, OP_STATUS):
+            return None
+        try:
+            return unpack_str(data, HEADER_SIZE)[0]
+        except (ValueError, struct.error, UnicodeDecodeError):
+            return None
+
+    def handle(self, data: bytes) -> Optional[bytes]:
+        """Выполняет кадр запроса и возвращает кадр ответа."""
+        try:
+            frame = decode_frame(data)
+        except ValueError as e:
+            self.logger.debug(f"Отброшен поврежденный бинарный кадр: {e}")
+            if len(data) < HEADER_SIZE:
+                return None
+            _, version, opcode, _, request_id, _ = HEADER.unpack_from(data)
+            result = RESULT_BAD_VERSION if version != VERSION else RESULT_MALFORMED
+            return encode_frame(opcode | RESPONSE_FLAG, request_id, result=result)
+
+        handler = self._handlers.get(frame.opcode)
+        if handler is None:
+            return encode_frame(frame.opcode | RESPONSE_FLAG, frame.request_id, result=RESULT_UNKNOWN_OPCODE)
+        try:
+            result, payload = handler(frame.payload)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            result, payload = RESULT_MALFORMED, b''
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки бинарного кадра {frame.opcode:#x}: {e}", exc_info=True)
+            result, payload = RESULT_FAILED, b''
+        return encode_frame(frame.opcode | RESPONSE_FLAG, frame.request_id, payload, result)
+
+    def _handle_start(self, payload: bytes) -> Tuple[int, bytes]:
+        name, offset = unpack_str(payload, 0)
+        user_args = {}
+        (count,) = _U8.unpack_from(payload, offset)
+        offset += 1
+        for _ in range(count):
+            key, offset = unpack_str(payload, offset)
+            (length,) = _U16.unpack_from(payload, offset)
+            offset += 2
+            user_args[key] = payload[offset:offset + length].decode('utf-8')
+            offset += length
+
+        return _START_RESULTS[self.process_manager.manual_start(name, user_args)], b''
+
+    def _handle_stop(self, payload: bytes) -> Tuple[int, bytes]:
+        name, _ = unpack_str(payload, 0)
+        return _STOP_RESULTS[self.process_manager.manual_stop(name)], b''
+
+    def _handle_status(self, payload: bytes) -> Tuple[int, bytes]:
+        name, _ = unpack_str(payload, 0)
+        if name not in self.process_manager.all_processes:
+            return RESULT_NOT_CONFIGURED, b''
+        status = self.process_manager.get_process_status(name)
+        return RESULT_OK, _U8.pack(PROCESS_STATES.get(status, 0))
+
+    def _handle_status_all(self, payload: bytes) -> Tuple[int, bytes]:
+        statuses = self.process_manager.list_all_processes_statuses()
+        parts: List[bytes] = [_U16.pack(len(statuses))]
+        for name, status in statuses.items():
+            parts.append(pack_str(name) + _U8.pack(PROCESS_STATES.get(status, 0)))
+        return RESULT_OK, b''.join(parts)
+
+    def _handle_shutdown(self, payload: bytes) -> Tuple[int, bytes]:
+        count = len(self.process_manager.processes)
+        self.process_manager.stop_all_processes()
+        return RESULT_OK, _U16.pack(count)
@@ -1,28 +1,45 @@
-import configparser
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import os
+from main_process.config_schema import SCHEMA_VERSION, SCHEMAS, ProcessSchema, build_schemas, schema_values
 
 class ConfigManager:
 
     processes_names = []
 
-    def __init__(self, config_path: str, logger=None):
+    def __init__(self, config_path: str, logger=None, use_cache: bool = True):
         """
         Инициализация менеджера конфигурации.
         
         Args:
             config_path: Путь к конфигурационному файлу .ini
             logger: Логгер для записи сообщений
+            use_cache: Сохранять разобранную конфигурацию в снимок .<имя файла>.cache
+                       и загружать из него, пока файл не изменился
         """
         self.config_path = config_path
-        self._config = None
+        # Конфигурация и схемы процессов заменяются вместе одним присваиванием
+        self._snapshot: Optional[Tuple[Dict[str, Any], Dict[str, ProcessSchema]]] = None
         self.logger = logger
         self.processes_names = []
+        self.use_cache = use_cache
+
+    @property
+    def cache_path(self) -> str:
+        directory, filename = os.path.split(self.config_path)
+        return os.path.join(directory, f".{filename}.cache")
 
     def load_config(self):
         if not os.path.isfile(self.config_path) or not os.access(self.config_path, os.R_OK):
             self.logger.error(f"Ошибка чтения файла: {self.config_path}")
 
+        key = self._file_key() if self.use_cache else None
+        cached = self._load_snapshot(key) if key is not None else None
+        if cached is not None:
+            print("Конфигурация загружена из снимка (файл не изменился)")
+            self._install(*cached)
+            return cached[0]
+
+        import configparser
         config = configparser.ConfigParser()
         try:
             # read() возвращает список успешно прочитанных файлов
@@ -41,6 +58,68 @@ class ConfigManager:
         except UnicodeDecodeError as e:
             print(f"Ошибка чтения символов файла: {e}")
 
+        result = self._build(config)
+        schemas = build_schemas(result.get('processes', {}))
+        self._install(result, schemas)
+        if key is not None:
+            self._save_snapshot(key, result, schemas)
+        return result
+
+    def _install(self, config: Dict[str, Any], schemas: Dict[str, ProcessSchema]) -> None:
+        self.processes_names = list(config.get('processes', {}))
+        self._snapshot = (config, schemas)
+
+    def _file_key(self) -> Optional[Tuple[int, int, int]]:
+        """Ключ снимка: время изменения, размер и CRC32 содержимого файла конфигурации."""
+        import zlib
+        try:
+            with open(self.config_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                checksum = zlib.crc32(f.read())
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, checksum
+
+    def _load_snapshot(self, key: Tuple[int, int, int]):
+        """
+        Конфигурация и схемы из снимка или None, если снимка нет или он устарел.
+
+        Снимок хранит уже преобразованные значения схем (marshal), поэтому
+        схемы создаются без разбора строк; производные величины
+        пересчитываются в __post_init__.
+        """
+        import marshal
+        try:
+            with open(self.cache_path, 'rb') as f:
+                version, cached_key, config, values = marshal.load(f)
+            if version != SCHEMA_VERSION or cached_key != key:
+                return None
+            schemas = {name: SCHEMAS.get(process_type, ProcessSchema)(**kwargs)
+                       for name, (process_type, kwargs) in values.items()}
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return config, schemas
+
+    def _save_snapshot(self, key: Tuple[int, int, int], config: Dict[str, Any],
+                       schemas: Dict[str, ProcessSchema]) -> None:
+        import marshal
+        values = {name: (schema.type, schema_values(schema)) for name, schema in schemas.items()}
+        temporary = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                marshal.dump((SCHEMA_VERSION, key, config, values), f)
+            os.replace(temporary, self.cache_path)
+        except (OSError, ValueError) as e:
+            # Снимок - только ускорение запуска: без него конфигурация читается из файла
+            if self.logger:
+                self.logger.debug(f"Снимок конфигурации не сохранен: {e}")
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def _build(self, config) -> Dict[str, Any]:
+        """Словарь конфигурации из разобранного файла: секции [process:*] собираются в 'processes'."""
         result = {}
         processes = {}
         
@@ -48,19 +127,74 @@ class ConfigManager:
             if section.startswith('process:'):
                 process_name = section.split(':', 1)[1]
                 processes[process_name] = dict(config[section])
-                self.processes_names.append(process_name)
             else:
                 result[section] = dict(config[section])
         
         if processes:
             result['processes'] = processes
+            self._check_dependencies(processes)
         
         # Конвертируем значения
         self._convert_values(result)
-        
-        self._config = result
         return result
 
+    def parse_config(self) -> Dict[str, Any]:
+        """
+        Заново читает файл конфигурации, не меняя текущую (для перезагрузки).
+
+        Returns:
+            Новая конфигурация в том же виде, что и load_config()
+
+        Raises:
+            ValueError: Если файл не читается, пуст или содержит ошибки
+        """
+        import configparser
+        config = configparser.ConfigParser()
+        try:
+            if not config.read(self.config_path, encoding='utf-8'):
+                raise ValueError(f"Ошибка чтения файла: {self.config_path}")
+        except (configparser.Error, UnicodeDecodeError) as e:
+            raise ValueError(f"Ошибка чтения файла: {e}")
+        if not config.sections():
+            raise ValueError("В файле конфигурации не обнаружены секции")
+        result = self._build(config)
+        # Проверка типов и значений секций процессов до замены текущей конфигурации
+        build_schemas(result.get('processes', {}))
+        return result
+
+    def swap_config(self, config: Dict[str, Any]) -> None:
+        """
+        Заменяет текущую конфигурацию новой (результатом parse_config).
+
+        Замена - одно присваивание ссылки: параллельные вызовы get_config()
+        видят либо прежний словарь целиком, либо новый.
+        """
+        self._install(config, build_schemas(config.get('processes', {})))
+
+    @staticmethod
+    def diff_sections(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Сравнивает две конфигурации по секциям.
+
+        Returns:
+            Секция ('network', 'process:fft', ...) -> 'added', 'removed' или 'changed'
+        """
+        def sections(config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+            flat = {name: values for name, values in config.items() if name != 'processes'}
+            flat.update({f'process:{name}': values for name, values in config.get('processes', {}).items()})
+            return flat
+
+        old_sections, new_sections = sections(old), sections(new)
+        diff = {}
+        for name in old_sections.keys() | new_sections.keys():
+            if name not in new_sections:
+                diff[name] = 'removed'
+            elif name not in old_sections:
+                diff[name] = 'added'
+            elif old_sections[name] != new_sections[name]:
+                diff[name] = 'changed'
+        return dict(sorted(diff.items()))
+
     def get_config(self) -> Dict[str, Any]:
         """
         Возвращает загруженную конфигурацию.
@@ -71,9 +205,9 @@ class ConfigManager:
         Raises:
             RuntimeError: Если конфиг не был загружен
         """
-        if self._config is None:
+        if self._snapshot is None:
             raise RuntimeError("Конфигурация не загружена. Сначала вызовите load_config()")
-        return self._config
+        return self._snapshot[0]
 
     def get_process_config(self, process_name: str) -> Dict[str, Any]:
         """
@@ -88,13 +222,77 @@ class ConfigManager:
         Raises:
             KeyError: Если процесс не найден
         """
-        if self._config is None:
+        if self._snapshot is None:
             raise RuntimeError("Конфигурация не загружена")
+        config = self._snapshot[0]
         
-        if 'processes' not in self._config or process_name not in self._config['processes']:
+        if 'processes' not in config or process_name not in config['processes']:
             raise KeyError(f"Процесс '{process_name}' не найден в конфигурации")
             
-        return self._config['processes'][process_name]
+        return config['processes'][process_name]
+
+    def get_process_schema(self, process_name: str) -> ProcessSchema:
+        """
+        Возвращает типизированные параметры процесса (см. main_process/config_schema.py).
+
+        Raises:
+            KeyError: Если процесс не найден
+        """
+        if self._snapshot is None:
+            raise RuntimeError("Конфигурация не загружена")
+        schemas = self._snapshot[1]
+        if process_name not in schemas:
+            raise KeyError(f"Процесс '{process_name}' не найден в конфигурации")
+        return schemas[process_name]
+
+    def get_process_dependencies(self, process_name: str) -> List[str]:
+        """
+        Возвращает процессы, после готовности которых запускается процесс (ключ depends_on).
+
+        Args:
+            process_name: Имя процесса (например 'fft')
+
+        Returns:
+            Имена процессов из depends_on (через запятую или пробел)
+        """
+        return self._parse_dependencies(self.get_process_config(process_name))
+
+    @staticmethod
+    def _parse_dependencies(process_config: Dict[str, Any]) -> List[str]:
+        value = str(process_config.get('depends_on', ''))
+        return [name for name in value.replace(',', ' ').split() if name]
+
+    def _check_dependencies(self, processes: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Проверяет ключи depends_on: зависимости существуют и не образуют цикл.
+
+        Raises:
+            ValueError: Если зависимость не найдена в конфигурации или найден цикл
+        """
+        graph = {name: self._parse_dependencies(process_config) for name, process_config in processes.items()}
+        for name, dependencies in graph.items():
+            for dependency in dependencies:
+                if dependency not in graph:
+                    raise ValueError(f"Процесс '{name}' зависит от '{dependency}', которого нет в конфигурации")
+
+        # Поиск в глубину: процесс, встреченный повторно на текущем пути, замыкает цикл
+        done = set()
+        for start in graph:
+            if start in done:
+                continue
+            path = [start]
+            stack = [iter(graph[start])]
+            while stack:
+                dependency = next(stack[-1], None)
+                if dependency is None:
+                    done.add(path.pop())
+                    stack.pop()
+                elif dependency in path:
+                    cycle = path[path.index(dependency):] + [dependency]
+                    raise ValueError(f"Циклическая зависимость процессов: {' -> '.join(cycle)}")
+                elif dependency not in done:
+                    path.append(dependency)
+                    stack.append(iter(graph[dependency]))
 
     def _convert_values(self, config_dict: Dict[str, Any]) -> None:
         """Рекурсивно конвертирует строковые значения в соответствующие типы"""
@@ -0,0 +1,283 @@
+"""
+Типизированные схемы секций [process:*].
+
+Для каждого типа процесса (ключ type, по умолчанию - имя процесса)
+объявлен неизменяемый класс с типами и значениями по умолчанию.
+ConfigManager один раз при загрузке разбирает строки секции в этот
+класс, поэтому ошибки вроде window_size = abc или nice = 40 обнаруживаются
+сразу, а не при запуске процесса, и ProcessManager читает готовые значения
+(bool, int, кортежи) вместо строк. Производные величины (диапазон бинов
+fft, ограничения ресурсов) вычисляются здесь же.
+
+Ключи, которых нет в схеме, остаются только в словаре секции
+и передаются процессу как аргументы без проверки.
+"""
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, Optional, Tuple, Union, get_args, get_origin
+
+from main_process.resources import ResourceLimits, parse_cpus, parse_io_class, parse_size
+
+# Меняется при изменении схем: снимок конфигурации с другой версией не используется
+SCHEMA_VERSION = 3
+
+
+def parse_bool(value: Any) -> bool:
+    text = str(value).strip().lower()
+    if text in ("true", "yes", "on", "1"):
+        return True
+    if text in ("false", "no", "off", "0"):
+        return False
+    raise ValueError(f"ожидается true или false, получено '{value}'")
+
+
+def parse_names(value: Any) -> Tuple[str, ...]:
+    """Список имен через запятую или пробел."""
+    return tuple(name for name in str(value).replace(",", " ").split() if name)
+
+
+def parse_integer(value: Any) -> int:
+    """Целое число; ConfigManager приводит "-5" к -5.0, поэтому допускается целое в виде дробного."""
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"ожидается целое число, получено '{value}'")
+    return int(number)
+
+
+def parse_frequency_range(value: Any) -> Optional[Tuple[float, float]]:
+    # numpy (utils.stft) загружается только при наличии секции fft
+    from utils.stft import parse_frequency_range
+    return parse_frequency_range(value)
+
+
+def _option(parse, default=None):
+    return field(default=default, metadata={"parse": parse})
+
+
+def _derived(default=0, compare=True):
+    return field(init=False, default=default, compare=compare)
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessSchema:
+    """Ключи ProcessManager, общие для всех процессов."""
+    name: str = ""
+    type: str = ""
+    enable: bool = False
+    depends_on: Tuple[str, ...] = _option(parse_names, ())
+    ready: str = ""
+    # Сколько ждать сигнала готовности процесса с ready = notify, секунд
+    ready_timeout: float = 10.0
+    zygote: bool = True
+    capture_output: bool = True
+    source: Optional[str] = None
+    # Ограничения ресурсов (см. main_process/resources.py)
+    cpu_affinity: Optional[Tuple[int, ...]] = _option(lambda value: tuple(sorted(parse_cpus(value))))
+    nice: Optional[int] = _option(parse_integer)
+    rt_priority: Optional[int] = _option(parse_integer)
+    memory_limit: Optional[int] = _option(parse_size)
+    io_class: Optional[Tuple[int, int]] = _option(parse_io_class)
+    # Производное: ResourceLimits для запуска процесса или None, если ограничений нет
+    limits: Optional[ResourceLimits] = _derived(None, compare=False)
+
+    def __post_init__(self):
+        # ResourceLimits проверяет диапазоны nice и rt_priority
+        limits = ResourceLimits(cpus=set(self.cpu_affinity) if self.cpu_affinity is not None else None,
+                                nice=self.nice, rt_priority=self.rt_priority,
+                                memory_limit=self.memory_limit, io_class=self.io_class)
+        object.__setattr__(self, "limits", limits if limits else None)
+
+    @property
+    def notify(self) -> bool:
+        return self.ready.lower() == "notify"
+
+
+@dataclass(frozen=True, slots=True)
+class AdcSchema(ProcessSchema):
+    sampling_rate: float = 16000.0
+    bit_depth: int = 16
+    channels: int = 1
+    frame_samples: int = 1024
+    ring_slots: int = 256
+    spi_bus: int = 0
+    # Производное: поток источника в байтах в секунду (24 бита хранятся в int32, как в кольцевом буфере)
+    bytes_per_second: float = _derived(0.0)
+
+    def __post_init__(self):
+        ProcessSchema.__post_init__(self)
+        if self.sampling_rate <= 0:
+            raise ValueError(f"sampling_rate {self.sampling_rate} должна быть положительной")
+        if self.bit_depth not in (16, 24, 32):
+            raise ValueError(f"bit_depth {self.bit_depth} не поддерживается (16, 24 или 32)")
+        if self.channels < 1 or self.frame_samples < 1 or self.ring_slots < 2:
+            raise ValueError("channels, frame_samples и ring_slots должны быть положительными (ring_slots >= 2)")
+        sample_bytes = 2 if self.bit_depth <= 16 else 4
+        object.__setattr__(self, "bytes_per_second", self.sampling_rate * self.channels * sample_bytes)
+
+
+@dataclass(frozen=True, slots=True)
+class FftSchema(ProcessSchema):
+    window_size: int = 4096
+    overlap: float = 0.5
+    frequency_range: Optional[Tuple[float, float]] = _option(parse_frequency_range)
+    # Если не задана, наследуется от источника (ConfigManager)
+    sampling_rate: float = 16000.0
+    output_dir: str = "/data/fft"
+    workers: int = 1
+    chunk_frames: int = 8
+    result_slots: int = 32
+    max_files: Optional[int] = None
+    segment_mb: float = 64.0
+    segment_seconds: float = 3600.0
+    poll_interval: float = 0.005
+    # Производные: шаг кадров в отсчетах, полуинтервал [bin_start, bin_stop) бинов
+    # в диапазоне частот (размер результатов пула)
+    hop: int = _derived()
+    bin_start: int = _derived()
+    bin_stop: int = _derived()
+    bins: int = _derived()
+
+    def __post_init__(self):
+        ProcessSchema.__post_init__(self)
+        if self.window_size < 2:
+            raise ValueError(f"window_size {self.window_size} слишком мал")
+        if self.sampling_rate <= 0:
+            raise ValueError(f"sampling_rate {self.sampling_rate} должна быть положительной")
+        if not 0 <= self.overlap < 1:
+            raise ValueError(f"перекрытие должно быть в диапазоне [0, 1): {self.overlap}")
+        if self.workers < 1:
+            raise ValueError(f"workers {self.workers} должно быть не меньше 1")
+        if self.chunk_frames < 1 or self.result_slots < 2:
+            raise ValueError("chunk_frames должно быть положительным, result_slots - не меньше 2")
+        from utils.stft import frame_geometry
+        hop, bin_start, bin_stop = frame_geometry(self.window_size, self.overlap, self.sampling_rate,
+                                                self.frequency_range)
+        object.__setattr__(self, "hop", hop)
+        object.__setattr__(self, "bin_start", bin_start)
+        object.__setattr__(self, "bin_stop", bin_stop)
+        object.__setattr__(self, "bins", bin_stop - bin_start)
+
+
+@dataclass(frozen=True, slots=True)
+class Str3SaverSchema(ProcessSchema):
+    output_dir: str = "/data/str3"
+    max_files: Optional[int] = None
+    buffer_kb: int = 4096
+    queue_buffers: int = 8
+    file_mb: int = 256
+    direct: bool = False
+    stats_interval: float = 60.0
+    poll_interval: float = 0.005
+
+    def __post_init__(self):
+        ProcessSchema.__post_init__(self)
+        if self.buffer_kb < 1 or self.queue_buffers < 1 or self.file_mb < 1:
+            raise ValueError("buffer_kb, queue_buffers и file_mb должны быть положительными")
+
+
+@dataclass(frozen=True, slots=True)
+class DspSchema(ProcessSchema):
+    i2c_bus: int = 5
+    i2c_address: int = _option(lambda value: int(str(value), 0), 0x38)
+    shadow: str = "/data/dsp/shadow.json"
+    image: Optional[str] = None
+    params: Optional[str] = None
+    readback: bool = False
+    safeload: bool = True
+    fake_bus: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class HelloSchema(ProcessSchema):
+    directory: str = "./processes"
+    message: Optional[str] = None
+    file: str = "data.txt"
+    time: int = 5
+
+
+SCHEMAS = {
+    "adc": AdcSchema,
+    "fft": FftSchema,
+    "str3_saver": Str3SaverSchema,
+    "dsp": DspSchema,
+    "hello": HelloSchema,
+}
+
+_PARSERS = {bool: parse_bool, int: int, float: float, str: str}
+
+
+def _parser(schema_field):
+    parse = schema_field.metadata.get("parse")
+    if parse is not None:
+        return parse
+    annotation = schema_field.type
+    if get_origin(annotation) is Union:
+        # Optional[X] -> X
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    return _PARSERS[annotation]
+
+
+def build_schema(name: str, values: Dict[str, Any]) -> ProcessSchema:
+    """
+    Разбирает секцию [process:<name>] в схему ее типа (ProcessSchema для неизвестных типов).
+
+    Пустое значение ключа означает значение по умолчанию.
+
+    Raises:
+        ValueError: Если значение не соответствует типу или ограничениям схемы
+    """
+    process_type = str(values.get("type", name))
+    schema = SCHEMAS.get(process_type, ProcessSchema)
+    kwargs = {"name": name, "type": process_type, **_parse_values(name, schema, values)}
+    try:
+        return schema(**kwargs)
+    except ValueError as e:
+        raise ValueError(f"[process:{name}] {e}")
+
+
+def override_schema(schema: ProcessSchema, values: Dict[str, Any]) -> ProcessSchema:
+    """
+    Схема с замененными значениями ключей (аргументы команды start); ключи,
+    которых нет в схеме, не учитываются.
+
+    Raises:
+        ValueError: Если значение не соответствует типу или ограничениям схемы
+    """
+    changes = _parse_values(schema.name, type(schema), values)
+    if not changes:
+        return schema
+    try:
+        return replace(schema, **changes)
+    except ValueError as e:
+        raise ValueError(f"[process:{schema.name}] {e}")
+
+
+def _parse_values(name: str, schema, values: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs = {}
+    for schema_field in fields(schema):
+        if not schema_field.init or schema_field.name in ("name", "type"):
+            continue
+        raw = values.get(schema_field.name)
+        if raw is None or str(raw).strip() == "":
+            continue
+        try:
+            kwargs[schema_field.name] = _parser(schema_field)(str(raw).strip())
+        except ValueError as e:
+            raise ValueError(f"[process:{name}] {schema_field.name} = {raw}: {e}")
+    return kwargs
+
+
+def build_schemas(processes: Dict[str, Dict[str, Any]]) -> Dict[str, ProcessSchema]:
+    """Схемы всех процессов; читатели без sampling_rate наследуют его от источника (source)."""
+    schemas = {}
+    for name, values in processes.items():
+        source = processes.get(values.get("source"))
+        if "sampling_rate" not in values and source is not None and "sampling_rate" in source:
+            values = {**values, "sampling_rate": source["sampling_rate"]}
+        schemas[name] = build_schema(name, values)
+    return schemas
+
+
+def schema_values(schema: ProcessSchema) -> Dict[str, Any]:
+    """Аргументы конструктора схемы (без производных величин) - для снимка конфигурации."""
+    return {schema_field.name: getattr(schema, schema_field.name)
+            for schema_field in fields(schema) if schema_field.init}
@@ -0,0 +1,103 @@
+"""
+Наблюдение за файлом конфигурации и каталогом скриптов через inotify.
+
+Наблюдается каталог файла, а не сам файл: редакторы обычно записывают
+новую версию во временный файл и переименовывают его, и наблюдение
+за прежним inode после этого ничего бы не сообщило. Supervisor
+регистрирует fileno() в своем цикле asyncio и вызывает changed(),
+когда дескриптор готов к чтению.
+
+ScriptsWatcher так же сообщает о появлении и удалении скриптов в каталоге
+processes/: от них зависит статус None/Stopped остановленных процессов.
+"""
+import ctypes
+import os
+import struct
+from typing import Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# struct inotify_event: wd, mask, cookie, len, затем имя длиной len
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class ConfigWatcher:
+    # События каталога, на которые подписывается наблюдатель
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+
+    def __init__(self, config_path: str):
+        """
+        Args:
+            config_path: Путь к файлу конфигурации
+        """
+        self.config_path = os.path.abspath(config_path)
+        self.directory = os.path.dirname(self.config_path)
+        self.filename = os.fsencode(os.path.basename(self.config_path))
+        self._fd: Optional[int] = None
+
+    def open(self) -> None:
+        """
+        Raises:
+            OSError: Если inotify недоступен
+        """
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        directory = os.fsencode(self.directory)
+        if libc.inotify_add_watch(fd, directory, self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"inotify_add_watch {os.fsdecode(directory)}")
+        self._fd = fd
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def _matches(self, name: bytes) -> bool:
+        return name == self.filename
+
+    def changed(self) -> bool:
+        """Читает накопившиеся события; True, если среди них есть запись наблюдаемого файла."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                if mask & self.MASK and self._matches(name):
+                    changed = True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ScriptsWatcher(ConfigWatcher):
+    """Появление, удаление и переименование скриптов *.py в каталоге процессов."""
+
+    MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+    def __init__(self, directory: str = "processes"):
+        """
+        Args:
+            directory: Каталог скриптов процессов
+        """
+        self.config_path = None
+        self.directory = os.path.abspath(directory)
+        self.filename = None
+        self._fd: Optional[int] = None
+
+    def _matches(self, name: bytes) -> bool:
+        return name.endswith(b".py")
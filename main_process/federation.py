@@ -0,0 +1,284 @@
+"""
+Федерация супервизоров: рассылка команд узлам и общий вид статусов.
+
+Одинаковый стек main.py работает на нескольких платах; узлы перечислены
+в [network] hosts (адрес или адрес:порт, по умолчанию - порт этого узла).
+
+- "cluster <команда>" выполняет команду на этом узле и параллельно
+  отправляет ее всем узлам, ожидая ответа каждого не дольше timeout
+  секунд; ответы собираются в один, по строке на узел.
+- Каждые gossip_interval секунд узел отправляет gossip_fanout случайным
+  узлам сообщение "gossip {...}" со своими статусами и известными ему
+  записями других узлов. Запись содержит поколение (время запуска узла)
+  и счетчик heartbeat; получатель оставляет более новую запись, поэтому
+  статусы доходят и через посредников. "cluster view" отвечает из этого
+  кэша без опроса узлов; узел, запись которого не обновлялась peer_ttl
+  секунд, считается недоступным. Gossip всегда умещается в одну датаграмму
+  (MTU фрагментатора): фрагменты gossip не собираются. Если собственные
+  статусы не помещаются, передается их часть, а узлы видят усеченный список.
+"""
+import json
+import logging
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from main_process.fragmentation import receive_message
+
+# Команды, которые не рассылаются узлам: обрабатываются в цикле сервера или рекурсивны
+LOCAL_ONLY = ("cluster", "gossip", "subscribe", "unsubscribe")
+
+
+def parse_peers(hosts: Any, default_port: int, local_host: Optional[str] = None) -> List[Tuple[str, int]]:
+    """
+    Список узлов "адрес[:порт]" через запятую или пробел -> [(адрес, порт)].
+
+    Одинаковый список hosts удобно раздать всем узлам, поэтому запись
+    с портом этого узла (default_port) и его адресом - петлевым, local_host
+    или адресом имени хоста - пропускается: иначе узел отправлял бы
+    команды и gossip самому себе.
+    """
+    local = _addresses(socket.gethostname())
+    if local_host and local_host not in ("0.0.0.0", "::"):
+        local |= _addresses(local_host)
+    peers = []
+    for item in str(hosts or "").replace(",", " ").split():
+        host, _, port = item.partition(":")
+        port = int(port) if port else int(default_port)
+        if port == int(default_port) and any(address.startswith("127.") or address in local
+                                             for address in _addresses(host)):
+            continue
+        peers.append((host, port))
+    return peers
+
+
+def _addresses(host: str) -> set:
+    """IPv4-адреса имени host (само имя, если оно не разрешается)."""
+    try:
+        return set(socket.gethostbyname_ex(host)[2])
+    except OSError:
+        return {host}
+
+
+class Federation:
+    def __init__(self, peers: List[Tuple[str, int]], node: str,
+                 command_handler: Callable[[str], Tuple[bool, str]],
+                 status_source: Callable[[], Tuple[int, Dict[str, str]]], timeout: float = 10.0,
+                 gossip_interval: float = 1.0, gossip_fanout: int = 2, peer_ttl: float = 5.0, logger=None):
+        """
+        Args:
+            peers: Адреса остальных узлов
+            node: Имя этого узла в федерации
+            command_handler: Обработчик команд этого узла (ProcessManager.handle_command)
+            status_source: Функция, возвращающая (версия, имя -> статус) процессов этого узла
+            timeout: Сколько ждать ответа каждого узла на разосланную команду, секунд
+            gossip_interval: Период отправки gossip, секунд
+            gossip_fanout: Скольким случайным узлам отправлять gossip за период
+            peer_ttl: Через сколько секунд без обновлений узел считается недоступным
+            logger: Логгер для записи сообщений
+        """
+        self.network_module = None
+        self.peers = peers
+        self.node = node
+        self.command_handler = command_handler
+        self.status_source = status_source
+        self.timeout = timeout
+        self.gossip_interval = gossip_interval
+        self.gossip_fanout = max(1, int(gossip_fanout))
+        self.peer_ttl = peer_ttl
+        self.logger = logger or logging.getLogger('federation')
+        self.generation = int(time.time() * 1000)
+        self.loop = None
+        self._heartbeat = 0
+        self._timer = None
+        # Вид федерации: узел -> запись (поколение, heartbeat, версия и статусы, время обновления).
+        # Изменяется только в цикле сервера заменой словаря, читается из потоков команд
+        self._view: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[Tuple[str, int], str] = {}
+        self._lost = set()
+        # Сколько своих статусов передано в последнем усеченном gossip (для предупреждения об изменении)
+        self._trimmed = None
+        self._executor = ThreadPoolExecutor(max_workers=min(16, max(1, len(peers))),
+                                            thread_name_prefix='federation')
+
+    def start(self, network_module) -> None:
+        """
+        Начинает обмен gossip в цикле запущенного NetworkModule: он принимает
+        gossip и отправляет его со своего порта (вызывается Supervisor).
+        """
+        self.network_module = network_module
+        self.loop = network_module.loop
+        network_module.add_local_command("gossip", self._on_gossip)
+        self.logger.info(f"Федерация: узел '{self.node}', узлов в списке {len(self.peers)}")
+        self._tick()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _tick(self) -> None:
+        self._heartbeat += 1
+        version, statuses = self.status_source()
+        now = time.monotonic()
+        self._set(self.node, self.generation, self._heartbeat, version, statuses, now)
+        for node, entry in self._view.items():
+            if node != self.node and now - entry["seen"] > self.peer_ttl and node not in self._lost:
+                self._lost.add(node)
+                self.logger.warning(f"Узел '{node}' не обновлялся {now - entry['seen']:.1f} с, считается недоступным")
+        message = self._gossip_message(now) if self.peers else None
+        if message is not None:
+            for peer in random.sample(self.peers, min(self.gossip_fanout, len(self.peers))):
+                self.network_module.send_to_client(peer, message)
+        self._timer = self.loop.call_later(self.gossip_interval, self._tick)
+
+    def _set(self, node: str, generation: int, heartbeat: int, version: int, statuses: Dict[str, str],
+             now: float) -> None:
+        entry = {"gen": generation, "hb": heartbeat, "v": version, "s": statuses, "seen": now}
+        self._view = {**self._view, node: entry}
+
+    def _gossip_message(self, now: float) -> Optional[str]:
+        """
+        Своя запись и свежие записи других узлов, пока сообщение помещается
+        в одну датаграмму; None, если не помещается даже запись без статусов.
+        """
+        limit = min(self.network_module.fragmenter.mtu, self.network_module.RECV_SIZE)
+        own = self._view[self.node]
+        entries = {self.node: self._own_entry(own, limit)}
+        if entries[self.node] is None:
+            return None
+        message = self._encode(entries)
+        for node, entry in sorted(self._view.items()):
+            if node == self.node or now - entry["seen"] > self.peer_ttl:
+                continue
+            entries[node] = [entry["gen"], entry["hb"], entry["v"], entry["s"]]
+            candidate = self._encode(entries)
+            if len(candidate.encode("utf-8")) > limit:
+                break
+            message = candidate
+        return message
+
+    def _own_entry(self, own: Dict[str, Any], limit: int) -> Optional[list]:
+        """Своя запись; если статусы не помещаются в limit байт, передается столько, сколько помещается."""
+        statuses = own["s"]
+        names = sorted(statuses)
+
+        def entry(count: int) -> list:
+            return [own["gen"], own["hb"], own["v"], {name: statuses[name] for name in names[:count]}]
+
+        def fits(count: int) -> bool:
+            return len(self._encode({self.node: entry(count)}).encode("utf-8")) <= limit
+
+        if fits(len(names)):
+            if self._trimmed is not None:
+                self.logger.info("Статусы узла снова помещаются в gossip целиком")
+                self._trimmed = None
+            return entry(len(names))
+        if not fits(0):
+            if self._trimmed != 0:
+                self.logger.error(f"Запись узла '{self.node}' не помещается в gossip ({limit} байт), gossip не отправляется")
+                self._trimmed = 0
+            return None
+        # Наибольшее число статусов, при котором запись помещается
+        low, high = 0, len(names)
+        while high - low > 1:
+            middle = (low + high) // 2
+            low, high = (middle, high) if fits(middle) else (low, middle)
+        if self._trimmed != low:
+            self.logger.warning(f"Статусы узла не помещаются в gossip ({limit} байт): передается {low} из {len(names)}")
+            self._trimmed = low
+        return entry(low)
+
+    @staticmethod
+    def _encode(entries: Dict[str, list]) -> str:
+        return "gossip " + json.dumps(entries, ensure_ascii=False, separators=(",", ":"))
+
+    def _on_gossip(self, message: str, client_address) -> None:
+        """Слияние записей из gossip: остается запись с большим (поколение, heartbeat)."""
+        try:
+            entries = json.loads(message[len("gossip"):])
+            items = [(str(node), int(gen), int(hb), int(version), dict(statuses))
+                     for node, (gen, hb, version, statuses) in entries.items()]
+        except (ValueError, TypeError, AttributeError) as e:
+            self.logger.debug(f"Отброшен поврежденный gossip от {client_address}: {e}")
+            return
+        if items:
+            # Первая запись - узла-отправителя
+            self._names[tuple(client_address[:2])] = items[0][0]
+        now = time.monotonic()
+        for node, generation, heartbeat, version, statuses in items:
+            if node == self.node:
+                continue
+            current = self._view.get(node)
+            if current is not None and (generation, heartbeat) <= (current["gen"], current["hb"]):
+                continue
+            if current is None:
+                self.logger.info(f"Узел '{node}' присоединился к федерации")
+            elif node in self._lost:
+                self._lost.discard(node)
+                self.logger.info(f"Узел '{node}' снова доступен")
+            self._set(node, generation, heartbeat, version, statuses, now)
+
+    def handle_command(self, command: str) -> Tuple[bool, str]:
+        """
+        cluster [view]      - статусы всех узлов из кэша gossip
+        cluster <команда>   - выполнить команду на всех узлах
+        """
+        parts = command.split(None, 1)
+        if len(parts) == 1 or parts[1].strip().lower() == "view":
+            return True, self.format_view()
+        inner = parts[1].strip()
+        if inner.split(None, 1)[0].lower() in LOCAL_ONLY:
+            return False, f"Команда '{inner}' не рассылается узлам"
+
+        futures = [self._executor.submit(self._request, peer, inner) for peer in self.peers]
+        success, message = self.command_handler(inner)
+        lines = [f"[{self.node}] {'SUCCESS' if success else 'ERROR'}: {message}"]
+        answered = 1
+        for peer, future in zip(self.peers, futures):
+            label = self._names.get(peer, f"{peer[0]}:{peer[1]}")
+            try:
+                reply = future.result()
+            except socket.timeout:
+                success = False
+                lines.append(f"[{label}] нет ответа за {self.timeout:g} с")
+                continue
+            except OSError as e:
+                success = False
+                lines.append(f"[{label}] ошибка: {e}")
+                continue
+            answered += 1
+            success = success and reply.startswith("SUCCESS")
+            lines.append(f"[{label}] {reply}")
+        return success, f"Узлов: {len(self.peers) + 1}, ответили: {answered}\n" + "\n".join(lines)
+
+    def _request(self, peer: Tuple[str, int], command: str) -> str:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.sendto(command.encode("utf-8"), peer)
+            # Общий срок на ответ и повторы фрагментов: один узел не задерживает рассылку дольше timeout
+            return receive_message(sock, peer, timeout=self.timeout,
+                                   deadline=time.monotonic() + self.timeout).decode("utf-8")
+        finally:
+            sock.close()
+
+    def format_view(self) -> str:
+        now = time.monotonic()
+        view = self._view
+        if self.node not in view:
+            version, statuses = self.status_source()
+            view = {**view, self.node: {"v": version, "s": statuses, "seen": now}}
+        lines = []
+        available = 0
+        for node, entry in sorted(view.items()):
+            age = now - entry["seen"]
+            statuses = " ".join(f"{name}={status}" for name, status in entry["s"].items())
+            if node == self.node or age <= self.peer_ttl:
+                available += 1
+                lines.append(f"[{node}] версия {entry['v']}, {age:.1f} с назад: {statuses}")
+            else:
+                lines.append(f"[{node}] недоступен {age:.1f} с (версия {entry['v']}): {statuses}")
+        return f"Узлов: {len(view)}, доступно: {available}\n" + "\n".join(lines)
@@ -0,0 +1,201 @@
+import socket
+import struct
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Фрагмент: сигнатура, версия, id сообщения, номер фрагмента, число фрагментов, затем данные.
+# Запрос повтора (NACK): сигнатура, версия, id сообщения, число номеров, номера недостающих фрагментов.
+# Обе сигнатуры начинаются с 0xA5 и не пересекаются с текстовыми командами и бинарными кадрами (0xA5 0x5A).
+FRAGMENT_MAGIC = b'\xa5\x46'
+NACK_MAGIC = b'\xa5\x4e'
+VERSION = 1
+FRAGMENT_HEADER = struct.Struct('!2sBIHH')
+NACK_HEADER = struct.Struct('!2sBIH')
+_SEQ = struct.Struct('!H')
+
+DEFAULT_MTU = 1400
+MIN_MTU = 128
+
+
+def is_fragment(data) -> bool:
+    return len(data) >= FRAGMENT_HEADER.size and data[:2] == FRAGMENT_MAGIC
+
+
+def is_nack(data) -> bool:
+    return len(data) >= NACK_HEADER.size and data[:2] == NACK_MAGIC
+
+
+def encode_nack(msg_id: int, seqs: List[int]) -> bytes:
+    """Запрос повторной передачи перечисленных фрагментов сообщения."""
+    return NACK_HEADER.pack(NACK_MAGIC, VERSION, msg_id, len(seqs)) + b''.join(_SEQ.pack(seq) for seq in seqs)
+
+
+def decode_nack(data) -> Tuple[int, List[int]]:
+    """
+    Raises:
+        ValueError: Если запрос поврежден
+    """
+    magic, version, msg_id, count = NACK_HEADER.unpack_from(data)
+    if magic != NACK_MAGIC or version != VERSION:
+        raise ValueError("Неверная сигнатура или версия запроса повтора")
+    if len(data) < NACK_HEADER.size + count * _SEQ.size:
+        raise ValueError("Запрос повтора короче заявленного")
+    return msg_id, [_SEQ.unpack_from(data, NACK_HEADER.size + i * _SEQ.size)[0] for i in range(count)]
+
+
+class _SentMessage:
+    """Фрагменты отправленного сообщения, его получатель и число уже повторенных фрагментов."""
+    __slots__ = ('address', 'fragments', 'retransmitted')
+
+    def __init__(self, address, fragments: List[bytes]):
+        self.address = address
+        self.fragments = fragments
+        self.retransmitted = 0
+
+
+class Fragmenter:
+    """
+    Нарезает ответы, превышающие MTU, на пронумерованные фрагменты
+    и хранит последние сообщения для выборочной повторной передачи.
+    """
+
+    def __init__(self, mtu: int = DEFAULT_MTU, cache_size: int = 64, max_retransmits: int = 10):
+        """
+        Args:
+            mtu: Максимальный размер датаграммы в байтах (включая заголовок фрагмента)
+            cache_size: Сколько последних фрагментированных сообщений хранить для повтора
+            max_retransmits: Сколько раз в среднем можно повторить каждый фрагмент сообщения;
+                             дальше запросы повтора этого сообщения игнорируются
+        """
+        self.mtu = max(MIN_MTU, int(mtu))
+        self.chunk_size = self.mtu - FRAGMENT_HEADER.size
+        self.cache_size = cache_size
+        self.max_retransmits = max_retransmits
+        self._ids = itertools.count(1)
+        self._cache: 'OrderedDict[int, _SentMessage]' = OrderedDict()
+
+    def needs_fragmentation(self, data: bytes) -> bool:
+        return len(data) > self.mtu
+
+    def split(self, data: bytes, address=None) -> Tuple[int, List[bytes]]:
+        """
+        Нарезает сообщение на фрагменты и запоминает их для повтора.
+
+        Args:
+            data: Сообщение
+            address: Адрес получателя: повтор фрагментов отправляется только по запросу с этого адреса
+        """
+        msg_id = next(self._ids) & 0xFFFFFFFF
+        view = memoryview(data)
+        total = (len(data) + self.chunk_size - 1) // self.chunk_size
+        if total > 0xFFFF:
+            raise ValueError(f"Сообщение слишком велико для фрагментации: {len(data)} байт")
+        fragments = [
+            FRAGMENT_HEADER.pack(FRAGMENT_MAGIC, VERSION, msg_id, seq, total)
+            + view[seq * self.chunk_size:(seq + 1) * self.chunk_size]
+            for seq in range(total)
+        ]
+        self._cache[msg_id] = _SentMessage(address, fragments)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return msg_id, fragments
+
+    def retransmit(self, msg_id: int, seqs: List[int], address=None) -> List[bytes]:
+        """
+        Возвращает запрошенные фрагменты без повторов номеров.
+
+        Пустой список - если сообщение уже вытеснено, отправлено на другой
+        адрес или лимит повторов (max_retransmits) исчерпан: иначе NACK
+        с чужим обратным адресом превращал бы сервер в усилитель трафика.
+        """
+        message = self._cache.get(msg_id)
+        if message is None or message.address != address:
+            return []
+        total = len(message.fragments)
+        budget = self.max_retransmits * total - message.retransmitted
+        requested = sorted({seq for seq in seqs if 0 <= seq < total})[:max(0, budget)]
+        message.retransmitted += len(requested)
+        return [message.fragments[seq] for seq in requested]
+
+
+class Reassembler:
+    """Собирает фрагментированные сообщения на стороне клиента."""
+
+    def __init__(self, max_pending: int = 16):
+        self.max_pending = max_pending
+        self._pending: 'OrderedDict[int, Dict[int, bytes]]' = OrderedDict()
+        self._totals: Dict[int, int] = {}
+
+    def feed(self, data) -> Optional[Tuple[int, bytes]]:
+        """
+        Принимает датаграмму-фрагмент.
+
+        Returns:
+            (id сообщения, сообщение) когда собраны все фрагменты, иначе None
+        """
+        magic, version, msg_id, seq, total = FRAGMENT_HEADER.unpack_from(data)
+        if magic != FRAGMENT_MAGIC or version != VERSION or seq >= total:
+            return None
+        parts = self._pending.get(msg_id)
+        if parts is None:
+            parts = self._pending[msg_id] = {}
+            self._totals[msg_id] = total
+            while len(self._pending) > self.max_pending:
+                dropped, _ = self._pending.popitem(last=False)
+                self._totals.pop(dropped, None)
+        parts[seq] = bytes(data[FRAGMENT_HEADER.size:])
+        if len(parts) < total:
+            return None
+        del self._pending[msg_id]
+        del self._totals[msg_id]
+        return msg_id, b''.join(parts[i] for i in range(total))
+
+    def missing(self) -> Dict[int, List[int]]:
+        """Недостающие фрагменты по каждому незавершенному сообщению."""
+        return {
+            msg_id: [seq for seq in range(self._totals[msg_id]) if seq not in parts]
+            for msg_id, parts in self._pending.items()
+        }
+
+
+def receive_message(sock: socket.socket, address, timeout: float = 1.0, retries: int = 5,
+                    recv_size: int = 65535, deadline: Optional[float] = None) -> bytes:
+    """
+    Принимает ответ сервера, собирая его из фрагментов при необходимости.
+    Недостающие фрагменты запрашиваются повторно через NACK.
+
+    Args:
+        timeout: Ожидание каждой датаграммы, секунд
+        retries: Сколько раз запрашивать недостающие фрагменты
+        deadline: Общий срок приема по time.monotonic(): ожидания и повторы
+                  не выходят за него (None - каждый повтор ждет timeout заново)
+
+    Raises:
+        socket.timeout: Если ответ не собран после всех повторов или к сроку deadline
+    """
+    reassembler = Reassembler()
+    attempts = 0
+    while True:
+        wait = timeout
+        if deadline is not None:
+            wait = min(timeout, deadline - time.monotonic())
+            if wait <= 0:
+                raise socket.timeout("срок приема ответа истек")
+        sock.settimeout(wait)
+        try:
+            data = sock.recv(recv_size)
+        except socket.timeout:
+            missing = reassembler.missing()
+            if not missing or attempts >= retries:
+                raise
+            attempts += 1
+            for msg_id, seqs in missing.items():
+                sock.sendto(encode_nack(msg_id, seqs), address)
+            continue
+        if not is_fragment(data):
+            return data
+        completed = reassembler.feed(data)
+        if completed is not None:
+            return completed[1]
@@ -1,16 +1,150 @@
+import json
 import logging
-from logging.handlers import TimedRotatingFileHandler, RotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, RotatingFileHandler, QueueHandler, QueueListener
 import os
+import queue
 import re
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON (JSON Lines)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает повторяющиеся сообщения: не больше limit похожих записей
+    за interval секунд. Похожими считаются записи одного уровня, текст
+    которых совпадает с точностью до чисел (адреса, PID, счетчики).
+    Первая запись следующего окна сообщает, сколько похожих было подавлено.
+    Перехваченный вывод процессов (записи с атрибутом captured) не
+    ограничивается: его потери учитывает OutputCapture.
+    """
+
+    _NUMBERS = re.compile(r'\d+')
+
+    def __init__(self, limit: int, interval: float = 1.0):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        # Шаблон -> [начало окна, записей в окне, подавлено]
+        self._windows: Dict[Tuple[int, str], List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "captured", False):
+            return True
+        key = (record.levelno, self._NUMBERS.sub('#', str(record.msg)))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 10000:
+                    # Не копим шаблоны бесконечно: оставляем только текущие окна
+                    self._windows = {k: v for k, v in self._windows.items() if now - v[0] < self.interval}
+                if suppressed:
+                    record.msg = f"{record.getMessage()} (подавлено похожих сообщений: {suppressed})"
+                    record.args = None
+                return True
+            if window[1] < self.limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler с ограниченной очередью: при переполнении запись
+    отбрасывается (block=False) или вызывающий поток ждет (block=True).
+    О числе отброшенных записей сообщается предупреждением, как только
+    в очереди снова появляется место.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block: bool = False):
+        super().__init__(log_queue)
+        self.block = block
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Форматирование выполняется в потоке QueueListener; здесь только
+        # фиксируется текст сообщения, пока аргументы не изменились
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+            return
+        if self._unreported:
+            lost, self._unreported = self._unreported, 0
+            warning = logging.LogRecord(record.name, logging.WARNING, __file__, 0,
+                                        f"Очередь журнала переполнена, отброшено записей: {lost}", None, None)
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                self._unreported += lost
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener, который при остановке ждет места в заполненной очереди."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
 
 class LoggerManager:
     VALID_LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
     
     def __init__(self, logging_config: Dict[str, Any]):
+        """
+        Args:
+            logging_config: Секция [logging]. Кроме файла и ротации поддерживаются:
+                queue = true         - запись в журнал через ограниченную очередь и поток
+                                       QueueListener (форматирование и ввод-вывод вне
+                                       потока, вызвавшего logger.info)
+                queue_size = 10000   - размер очереди
+                queue_policy = drop  - при переполнении отбрасывать записи (drop)
+                                       или ждать места в очереди (block)
+                format = json        - файл журнала в формате JSON Lines (по умолчанию text)
+                rate_limit = 20      - не больше 20 похожих сообщений за rate_interval секунд
+        """
         self.logging_config = logging_config
         self._logger_instance = logging.getLogger('app_main')
         self._logger_instance.handlers.clear()
+        self._logger_instance.filters.clear()
+        self._handlers: List[logging.Handler] = []
+        self._setup_messages: List[Tuple[int, str]] = []
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
 
         self._setup_log_level()
 
@@ -18,6 +152,40 @@ class LoggerManager:
             self._setup_console_handler()
 
         self._setup_file_logger()
+        self._attach_handlers()
+        for level, message in self._setup_messages:
+            self._logger_instance.log(level, message)
+
+    def _attach_handlers(self):
+        """Подключает обработчики к логгеру напрямую или через очередь (queue = true)."""
+        rate_limit = self.logging_config.get('rate_limit')
+        if rate_limit:
+            self._logger_instance.addFilter(
+                RateLimitFilter(int(rate_limit), float(self.logging_config.get('rate_interval', 1.0))))
+
+        if not self.logging_config.get('queue', False):
+            for handler in self._handlers:
+                self._logger_instance.addHandler(handler)
+            return
+
+        policy = str(self.logging_config.get('queue_policy', 'drop')).lower()
+        if policy not in ('drop', 'block'):
+            self._setup_messages.append((logging.WARNING, f"Неверный queue_policy: {policy}, используется drop"))
+            policy = 'drop'
+        log_queue = queue.Queue(maxsize=int(self.logging_config.get('queue_size', 10000)))
+        self.queue_handler = BoundedQueueHandler(log_queue, block=policy == 'block')
+        self.listener = DrainingQueueListener(log_queue, *self._handlers, respect_handler_level=True)
+        self.listener.start()
+        self._logger_instance.addHandler(self.queue_handler)
+
+    def stop(self):
+        """Дописывает записи из очереди и останавливает поток журнала (вызывается при завершении)."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self._logger_instance.removeHandler(self.queue_handler)
+            for handler in self._handlers:
+                self._logger_instance.addHandler(handler)
 
     def _setup_log_level(self):
         log_level_str = self.logging_config.get('log_level', 'INFO').upper()
@@ -47,9 +215,9 @@ class LoggerManager:
 
     def _setup_console_handler(self):
         console_handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+        formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
         console_handler.setFormatter(formatter)
-        self._logger_instance.addHandler(console_handler)
+        self._handlers.append(console_handler)
 
     def _setup_file_logger(self):
         try:
@@ -90,16 +258,19 @@ class LoggerManager:
                     
                     file_handler.rotator = custom_rotator
             
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+            if str(self.logging_config.get('format', 'text')).lower() == 'json':
+                formatter = JsonFormatter()
+            else:
+                formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
             file_handler.setFormatter(formatter)
-            self._logger_instance.addHandler(file_handler)
+            self._handlers.append(file_handler)
             
-            self._logger_instance.info("Файловый логгер успешно настроен")
+            self._setup_messages.append((logging.INFO, "Файловый логгер успешно настроен"))
             
         except Exception as e:
-            self._logger_instance.error(
-                f"Ошибка настройки файлового логгера: {e}. Используется только консольный вывод"
-            )
+            self._setup_messages.append((
+                logging.ERROR, f"Ошибка настройки файлового логгера: {e}. Используется только консольный вывод"
+            ))
 
     def _make_rotator(self, original_rotator, base_filename, max_files):
         def rotator(source, dest):
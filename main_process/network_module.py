@@ -1,84 +1,498 @@
 import socket
+import asyncio
 import threading
 import logging
-from typing import Callable, Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from main_process import binary_protocol
+from main_process.fragmentation import Fragmenter, DEFAULT_MTU, is_nack, decode_nack
+
+
+def format_status(since: int, version: int, statuses: Dict[str, str]) -> bytes:
+    """
+    Сообщение подписчику: "STATUS <от> <до> имя=статус ...".
+
+    Содержит последние статусы всех процессов, изменившихся между версиями
+    <от> и <до>; <от> = 0 - полный список. Клиент применяет сообщение,
+    если <от> не больше известной ему версии, иначе (пропущена датаграмма)
+    продлевает подписку со своей версией и получает полный список.
+    """
+    items = " ".join(f"{name}={status}" for name, status in statuses.items())
+    return f"STATUS {since} {version} {items}".rstrip().encode('utf-8')
+
+
+class _CommandProtocol(asyncio.DatagramProtocol):
+    """Протокол asyncio, передающий принятые датаграммы в NetworkModule."""
+
+    def __init__(self, module: 'NetworkModule'):
+        self.module = module
+
+    def connection_made(self, transport):
+        self.module.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.module._dispatch(data, addr)
+
+    def error_received(self, exc):
+        self.module.logger.error(f"Ошибка при приеме сообщения: {exc}")
+
 
 class NetworkModule:
-    def __init__(self, host='0.0.0.0', port=30000, logger=None, command_handler: Optional[Callable] = None):
+    # Наибольшая датаграмма UDP: меньший буфер молча обрезал бы длинные команды и gossip
+    RECV_SIZE = 65535
+    # Команды только для чтения, которые в пакетном режиме выполняются одним заданием пула.
+    # Остальные (shutdown, reload, cluster, start, stop...) могут блокироваться надолго
+    # и выполняются отдельными заданиями, чтобы не задерживать ответы на status
+    BATCH_COMMANDS = frozenset({"status"})
+    BATCH_OPCODES = frozenset({binary_protocol.OP_STATUS_ALL})
+
+    def __init__(self, host='0.0.0.0', port=30000, logger=None, command_handler: Optional[Callable] = None,
+                 target_resolver: Optional[Callable[[str], Optional[str]]] = None, max_workers: int = 8,
+                 batch_size: int = 1, binary_handler=None, mtu: int = DEFAULT_MTU,
+                 status_source: Optional[Callable[[], Tuple[int, Dict[str, str]]]] = None,
+                 subscribe_ttl: float = 30.0, subscribe_max_ttl: float = 300.0,
+                 coalesce_delay: float = 0.05, max_subscribers: int = 64):
+        """
+        Args:
+            host: Адрес для прослушивания
+            port: UDP-порт
+            logger: Логгер для записи сообщений
+            command_handler: Блокирующий обработчик команд, выполняется в пуле потоков
+            target_resolver: Функция, возвращающая имя процесса, к которому относится команда.
+                             Команды для одного процесса выполняются по очереди,
+                             для разных процессов - параллельно.
+            max_workers: Размер пула потоков для обработчика команд
+            batch_size: Максимум датаграмм, вычитываемых за одно пробуждение.
+                        При значении больше 1 включается пакетный режим: сокет
+                        вычитывается неблокирующе в заранее выделенный буфер,
+                        а быстрые команды чтения (BATCH_COMMANDS) из пакета
+                        обрабатываются одним заданием пула.
+            binary_handler: Обработчик бинарных кадров (BinaryCommandHandler).
+                            Кадры определяются по сигнатуре, текстовые команды
+                            на том же порту продолжают работать.
+            mtu: Максимальный размер отправляемой датаграммы. Ответы большего
+                 размера нарезаются на фрагменты с возможностью выборочного повтора.
+            status_source: Функция, возвращающая (версия, имя -> статус) - полный
+                           список для новых подписчиков (ProcessManager.status_snapshot).
+            subscribe_ttl: Срок подписки по умолчанию, секунд. Клиент продлевает
+                           подписку (keepalive), повторяя subscribe до истечения срока.
+            subscribe_max_ttl: Наибольший срок подписки, секунд
+            coalesce_delay: Изменения статусов, пришедшие за это время, рассылаются
+                            одним сообщением, секунд
+            max_subscribers: Наибольшее число подписчиков
+        """
         self.host = host
         self.port = port
         self.socket = None
         self.running = False
         self.logger = logger or logging.getLogger('network_module')
         self.command_handler = command_handler
-        
+        self.target_resolver = target_resolver
+        self.binary_handler = binary_handler
+        self.fragmenter = Fragmenter(mtu)
+        self.max_workers = max_workers
+        self.batch_size = max(1, int(batch_size))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks = set()
+        self._thread: Optional[threading.Thread] = None
+        self._recv_buffer: Optional[memoryview] = None
+        self._send_backlog = deque()
+        self.status_source = status_source
+        self.subscribe_ttl = float(subscribe_ttl)
+        self.subscribe_max_ttl = float(subscribe_max_ttl)
+        self.coalesce_delay = float(coalesce_delay)
+        self.max_subscribers = int(max_subscribers)
+        # Подписчики на статусы: адрес -> момент истечения подписки (time.monotonic).
+        # Изменяется только в цикле сервера
+        self._subscribers: Dict[tuple, float] = {}
+        # Изменения статусов, ожидающие рассылки: publish_status вызывается из любого потока
+        self._pending_lock = threading.Lock()
+        self._pending_status: Dict[str, str] = {}
+        self._pending_since: Optional[int] = None
+        self._pending_version = 0
+        self.status_messages = 0
+        # Команды, которые выполняются в цикле сервера и получают адрес клиента: имя -> handler(сообщение, адрес)
+        self._local_commands: Dict[str, Callable[[str, tuple], None]] = {
+            "subscribe": self._handle_subscription,
+            "unsubscribe": self._handle_subscription,
+        }
+
         # Fallback если логгер не передан
         if not hasattr(self.logger, 'info'):
             logging.basicConfig(level=logging.INFO)
             self.logger = logging.getLogger('network_module_fallback')
 
     def start(self):
-        """Запускает сервер для прослушивания UDP-порта."""
+        """Запускает сервер в отдельном потоке с собственным циклом asyncio."""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors = []
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start_async())
+            except Exception as e:
+                errors.append(e)
+                return
+            finally:
+                started.set()
+            loop.run_forever()
+            loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    async def start_async(self):
+        """Запускает сервер в текущем цикле asyncio (используется Supervisor)."""
         try:
+            self.loop = asyncio.get_running_loop()
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.socket.bind((self.host, self.port))
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='command')
+            if self.batch_size > 1:
+                self.socket.setblocking(False)
+                self._recv_buffer = memoryview(bytearray(self.RECV_SIZE))
+                self.loop.add_reader(self.socket.fileno(), self._drain_socket)
+            else:
+                await self.loop.create_datagram_endpoint(lambda: _CommandProtocol(self), sock=self.socket)
             self.running = True
             self.logger.info(f"UDP-сервер запущен и слушает порт {self.port}")
-
-            # Запускаем поток для приема сообщений
-            receive_thread = threading.Thread(target=self._receive_messages)
-            receive_thread.daemon = True
-            receive_thread.start()
         except Exception as e:
             self.logger.error(f"Ошибка при запуске сервера: {e}")
             raise
 
     def stop(self):
         """Останавливает сервер."""
+        if self.socket is None:
+            return
         self.running = False
-        if self.socket:
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            if self._thread is not None and self._thread is not threading.current_thread():
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+                loop.call_soon_threadsafe(loop.stop)
+                self._thread.join(timeout=5)
+            else:
+                self._close_transport()
+                for task in self._tasks:
+                    task.cancel()
+        elif self.socket:
             self.socket.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self.socket = None
+        self.loop = None
+        self._subscribers.clear()
         self.logger.info("UDP-сервер остановлен")
 
-    def _receive_messages(self):
-        """Принимает сообщения от клиентов и передает их обработчику команд."""
-        while self.running:
+    async def _shutdown(self):
+        """Закрывает сокет и отменяет незавершенные команды в цикле сервера."""
+        self._close_transport()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _close_transport(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        elif self.socket is not None:
+            self.loop.remove_reader(self.socket.fileno())
+            self.loop.remove_writer(self.socket.fileno())
+            self.socket.close()
+
+    def _dispatch(self, data, client_address):
+        """Планирует обработку датаграммы, не блокируя прием следующих."""
+        request = self._parse(data, client_address)
+        if request is not None:
+            self._spawn(self._execute(request, client_address))
+
+    def _drain_socket(self):
+        """
+        Пакетный режим: вычитывает из сокета до batch_size датаграмм
+        в заранее выделенный буфер и обрабатывает их одним пакетом
+        (_parse копирует датаграмму, поэтому буфер используется повторно).
+        """
+        batch = []
+        view = self._recv_buffer
+        for _ in range(self.batch_size):
             try:
-                data, client_address = self.socket.recvfrom(1024)
-                if not data:
-                    continue
-                
-                message = data.decode('utf-8').strip()
-                self.logger.info(f"Получено от {client_address}: {message}")
-                
-                # Если есть обработчик команд, передаем ему сообщение
-                if self.command_handler:
-                    response = self.command_handler(message)
-                    if response:
-                        self._send_response(client_address, response)
-                        
-            except (socket.error, OSError) as e:
-                if not self.running:
-                    break
-                self.logger.error(f"Ошибка при приеме сообщения: {e}")
+                nbytes, client_address = self.socket.recvfrom_into(view)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                if self.running:
+                    self.logger.error(f"Ошибка при приеме сообщения: {e}")
+                break
+            request = self._parse(view[:nbytes], client_address)
+            if request is not None:
+                batch.append((request, client_address))
+        if batch:
+            self._spawn(self._execute_batch(batch))
+
+    def _spawn(self, coro):
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _parse(self, data, client_address) -> Optional[Union[str, bytes]]:
+        """
+        Определяет протокол датаграммы: бинарный кадр возвращается как bytes,
+        текстовая команда - как str (None для пустых и некорректных).
+        """
+        if not data:
+            return None
+        if is_nack(data):
+            self._handle_nack(data, client_address)
+            return None
+        if self.binary_handler is not None and binary_protocol.is_binary(data):
+            return bytes(data)
+        try:
+            message = str(data, 'utf-8').strip()
+        except UnicodeDecodeError as e:
+            self.logger.error(f"Некорректная кодировка сообщения от {client_address}: {e}")
+            return None
+        self.logger.debug(f"Получено от {client_address}: {message}")
+        words = message.split(None, 2)
+        command = words[0].lower() if words else ""
+        if command in ("success:", "error:") or (len(words) > 1 and words[0] == "STATUS" and words[1].isdigit()):
+            # Ответ или рассылка статусов другого узла, а не команда: ответ на нее зациклил бы обмен
+            return None
+        handler = self._local_commands.get(command)
+        if handler is not None:
+            handler(message, client_address)
+            return None
+        return message
+
+    def add_local_command(self, name: str, handler: Callable[[str, tuple], None]):
+        """
+        Регистрирует команду, которая выполняется в цикле сервера без ответа
+        по умолчанию; handler получает сообщение и адрес клиента и не должен блокироваться.
+        """
+        self._local_commands[name.lower()] = handler
+
+    def _handle_subscription(self, message: str, client_address):
+        """
+        subscribe [ttl] [версия] - подписка на изменения статусов или ее продление.
+        Полный список статусов отправляется, если версия не указана или устарела.
+        unsubscribe - отмена подписки.
+        """
+        parts = message.split()
+        if parts[0].lower() == "unsubscribe":
+            removed = self._subscribers.pop(client_address, None) is not None
+            self._send_response(client_address, (removed, "Подписка отменена" if removed else "Подписки нет"))
+            return
+        try:
+            ttl = float(parts[1]) if len(parts) > 1 else self.subscribe_ttl
+            known = int(parts[2]) if len(parts) > 2 else None
+        except ValueError:
+            ttl = 0
+        if ttl <= 0:
+            self._send_response(client_address, (False, "Использование: subscribe [ttl] [версия]"))
+            return
+        ttl = min(ttl, self.subscribe_max_ttl)
+        now = time.monotonic()
+        self._expire_subscribers(now)
+        if client_address not in self._subscribers:
+            if len(self._subscribers) >= self.max_subscribers:
+                self._send_response(client_address, (False, f"Превышено число подписчиков ({self.max_subscribers})"))
+                return
+            self.logger.info(f"Клиент {client_address} подписался на статусы процессов")
+        self._subscribers[client_address] = now + ttl
+        version, statuses = self.status_source() if self.status_source is not None else (0, {})
+        self._send_response(client_address, (True, f"Подписка на {ttl:g} с, версия {version}"))
+        if known != version:
+            self._sendto(format_status(0, version, statuses), client_address)
+
+    def _expire_subscribers(self, now: float):
+        for client_address in [address for address, deadline in self._subscribers.items() if deadline <= now]:
+            del self._subscribers[client_address]
+            self.logger.info(f"Подписка клиента {client_address} истекла")
+
+    def publish_status(self, version: int, changes: Dict[str, str]):
+        """
+        Принимает изменение статусов версии version (можно вызывать из любого потока).
+
+        Изменения за coalesce_delay секунд после первого объединяются
+        и рассылаются подписчикам одним сообщением format_status.
+        """
+        if not self._subscribers or not self.running or self.loop is None:
+            return
+        with self._pending_lock:
+            first = self._pending_since is None
+            if first:
+                self._pending_since = version - 1
+            self._pending_status.update(changes)
+            self._pending_version = version
+        if first:
+            self.loop.call_soon_threadsafe(self.loop.call_later, self.coalesce_delay, self._flush_status)
+
+    def _flush_status(self):
+        with self._pending_lock:
+            changes, since, version = self._pending_status, self._pending_since, self._pending_version
+            self._pending_status, self._pending_since = {}, None
+        self._expire_subscribers(time.monotonic())
+        if not changes or not self._subscribers or not self.running:
+            return
+        data = format_status(since, version, changes)
+        for client_address in list(self._subscribers):
+            self._sendto(data, client_address)
+        self.status_messages += 1
+
+    def _handle_nack(self, data, client_address):
+        """Повторно отправляет запрошенные клиентом фрагменты."""
+        try:
+            msg_id, seqs = decode_nack(data)
+        except ValueError as e:
+            self.logger.debug(f"Отброшен поврежденный запрос повтора от {client_address}: {e}")
+            return
+        fragments = self.fragmenter.retransmit(msg_id, seqs, client_address)
+        if not fragments:
+            self.logger.warning(f"Отклонен запрос повтора сообщения {msg_id} от {client_address}: "
+                                f"сообщение неизвестно, отправлено другому клиенту или лимит повторов исчерпан")
+        for fragment in fragments:
+            self._sendto(fragment, client_address)
+
+    def _target(self, request: Union[str, bytes]) -> Optional[str]:
+        if isinstance(request, bytes):
+            return self.binary_handler.target(request)
+        return self.target_resolver(request) if self.target_resolver else None
+
+    def _handle(self, request: Union[str, bytes]):
+        if isinstance(request, bytes):
+            return self.binary_handler.handle(request)
+        return self.command_handler(request) if self.command_handler else None
+
+    async def _execute(self, request: Union[str, bytes], client_address):
+        """Выполняет команду в пуле потоков и отправляет ответ."""
+        target = self._target(request)
+        try:
+            if target is None:
+                response = await self.loop.run_in_executor(self.executor, self._handle, request)
+            else:
+                async with self._lock_for(target):
+                    response = await self.loop.run_in_executor(self.executor, self._handle, request)
+        except RuntimeError as e:
+            # Пул потоков уже остановлен
+            self.logger.debug(f"Команда {request!r} не выполнена: {e}")
+            return
+
+        if response:
+            self._send_response(client_address, response)
+
+    async def _execute_batch(self, batch: List[Tuple[Union[str, bytes], tuple]]):
+        """
+        Выполняет пакет команд. Быстрые команды чтения без целевого процесса
+        выполняются одним заданием пула, остальные - отдельными заданиями
+        (адресованные процессу - с учетом их блокировок), как вне пакетного режима.
+        """
+        cheap = []
+        for request, client_address in batch:
+            if self._batchable(request) and self._target(request) is None:
+                cheap.append((request, client_address))
+            else:
+                self._spawn(self._execute(request, client_address))
+        if not cheap:
+            return
+
+        try:
+            responses = await self.loop.run_in_executor(
+                self.executor, self._handle_many, [request for request, _ in cheap])
+        except RuntimeError as e:
+            self.logger.debug(f"Пакет из {len(cheap)} команд не выполнен: {e}")
+            return
+
+        for (_, client_address), response in zip(cheap, responses):
+            if response:
+                self._send_response(client_address, response)
+
+    def _batchable(self, request: Union[str, bytes]) -> bool:
+        """Можно ли выполнить команду в общем задании пакета (BATCH_COMMANDS, BATCH_OPCODES)."""
+        if isinstance(request, bytes):
+            return len(request) >= binary_protocol.HEADER_SIZE and request[3] in self.BATCH_OPCODES
+        command = request.split(None, 1)
+        return bool(command) and command[0].lower() in self.BATCH_COMMANDS
+
+    def _handle_many(self, requests: List[Union[str, bytes]]) -> list:
+        return [self._handle(request) for request in requests]
+
+    def _lock_for(self, target: str) -> asyncio.Lock:
+        lock = self._locks.get(target)
+        if lock is None:
+            lock = self._locks[target] = asyncio.Lock()
+        return lock
 
     def _send_response(self, client_address, response):
         """Отправляет ответ клиенту."""
+        if isinstance(response, bytes):
+            self._sendto(response, client_address)
+            return
+        if isinstance(response, tuple):
+            success, message = response
+            response_str = f"{'SUCCESS' if success else 'ERROR'}: {message}"
+        else:
+            response_str = str(response)
+        self._sendto(response_str.encode('utf-8'), client_address)
+
+    def send_to_client(self, client_address, message):
+        """Отправляет сообщение конкретному клиенту (можно вызывать из любого потока)."""
+        if not self.running or self.loop is None:
+            return
+        data = message.encode('utf-8')
         try:
-            if isinstance(response, tuple):
-                success, message = response
-                response_str = f"{'SUCCESS' if success else 'ERROR'}: {message}"
-            else:
-                response_str = str(response)
-                
-            self.socket.sendto(response_str.encode('utf-8'), client_address)
+            in_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._sendto(data, client_address)
+        else:
+            self.loop.call_soon_threadsafe(self._sendto, data, client_address)
+
+    def _sendto(self, data: bytes, client_address):
+        if self.fragmenter.needs_fragmentation(data):
+            _, fragments = self.fragmenter.split(data, client_address)
+            for fragment in fragments:
+                self._send_datagram(fragment, client_address)
+        else:
+            self._send_datagram(data, client_address)
+
+    def _send_datagram(self, data: bytes, client_address):
+        try:
+            if self.transport is not None:
+                self.transport.sendto(data, client_address)
+            elif self.socket is not None:
+                self._sock_sendto(data, client_address)
         except (socket.error, OSError) as e:
             self.logger.error(f"Ошибка при отправке ответа клиенту {client_address}: {e}")
 
-    def send_to_client(self, client_address, message):
-        """Отправляет сообщение конкретному клиенту."""
-        if self.running:
+    def _sock_sendto(self, data: bytes, client_address):
+        """Неблокирующая отправка в пакетном режиме; при переполнении буфера ответы ставятся в очередь."""
+        if not self._send_backlog:
+            try:
+                self.socket.sendto(data, client_address)
+                return
+            except (BlockingIOError, InterruptedError):
+                self.loop.add_writer(self.socket.fileno(), self._flush_backlog)
+        self._send_backlog.append((data, client_address))
+
+    def _flush_backlog(self):
+        while self._send_backlog:
+            data, client_address = self._send_backlog[0]
             try:
-                self.socket.sendto(message.encode('utf-8'), client_address)
-            except (socket.error, OSError) as e:
-                self.logger.error(f"Ошибка при отправке сообщения клиенту {client_address}: {e}")
\ No newline at end of file
+                self.socket.sendto(data, client_address)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.logger.error(f"Ошибка при отправке ответа клиенту {client_address}: {e}")
+            self._send_backlog.popleft()
+        self.loop.remove_writer(self.socket.fileno())
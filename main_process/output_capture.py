@@ -0,0 +1,188 @@
+"""
+Перехват stdout и stderr дочерних процессов в журнал ProcessManager.
+
+Вывод каждого процесса идет в каналы (pipe), которые читает один поток
+через epoll. Строки помечаются именем процесса и через ограниченную
+очередь передаются второму потоку, который пишет их в логгер
+(stdout - INFO, stderr - WARNING). Поток чтения никогда не ждет логгер:
+если очередь заполнена, строка отбрасывается и учитывается, а число
+отброшенных строк сообщается предупреждением. Поэтому медленный журнал
+не останавливает дочерние процессы на записи в переполненный канал.
+
+Записи строк помечаются атрибутом captured: их объем уже ограничен очередью
+с учетом отброшенного, и RateLimitFilter журнала их не подавляет.
+"""
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from typing import Dict, Optional
+
+READ_SIZE = 65536
+# Отметка записей с выводом процессов (см. RateLimitFilter)
+CAPTURED = {"captured": True}
+
+
+class _Stream:
+    """Один канал вывода процесса и недочитанный остаток строки."""
+
+    __slots__ = ("name", "level", "buffer")
+
+    def __init__(self, name: str, level: int):
+        self.name = name
+        self.level = level
+        self.buffer = bytearray()
+
+
+class OutputCapture:
+    def __init__(self, logger, queue_size: int = 10000, max_line: int = 4096):
+        """
+        Args:
+            logger: Логгер, в который пишутся строки процессов
+            queue_size: Сколько строк может ждать записи в журнал
+            max_line: Наибольшая длина строки, байт (более длинные делятся на части)
+        """
+        self.logger = logger
+        self.max_line = max_line
+        self._lines: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._epoll = select.epoll()
+        self._streams: Dict[int, _Stream] = {}
+        # Счетчики по процессам: строк прочитано и отброшено (за все запуски)
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._unreported: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        self._epoll.register(self._wake_read, select.EPOLLIN)
+        self._stopping = False
+        self._reader: Optional[threading.Thread] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._reader is not None:
+            return
+        self._stopping = False
+        self._reader = threading.Thread(target=self._read_loop, name="output-reader", daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, name="output-writer", daemon=True)
+        self._reader.start()
+        self._writer.start()
+
+    def stop(self) -> None:
+        """Дочитывает доступный вывод, записывает очередь в журнал и останавливает потоки."""
+        if self._reader is None:
+            return
+        self._stopping = True
+        os.write(self._wake_write, b"x")
+        self._reader.join()
+        for fd in list(self._streams):
+            self._read(fd, final=True)
+        self._lines.put(None)
+        self._writer.join()
+        self._reader = self._writer = None
+        self._report_dropped()
+
+    def register(self, name: str, stdout_fd: int, stderr_fd: int) -> None:
+        """Передает дескрипторы чтения каналов процесса name; они закрываются по концу вывода."""
+        with self._lock:
+            self.counters.setdefault(name, {"lines": 0, "dropped": 0})
+        for fd, level in ((stdout_fd, logging.INFO), (stderr_fd, logging.WARNING)):
+            os.set_blocking(fd, False)
+            self._streams[fd] = _Stream(name, level)
+            self._epoll.register(fd, select.EPOLLIN)
+
+    def stats(self, name: str) -> Optional[Dict[str, int]]:
+        return self.counters.get(name)
+
+    def _read_loop(self) -> None:
+        while not self._stopping:
+            try:
+                events = self._epoll.poll()
+            except InterruptedError:
+                continue
+            for fd, _ in events:
+                if fd == self._wake_read:
+                    try:
+                        os.read(self._wake_read, 4096)
+                    except BlockingIOError:
+                        pass
+                elif fd in self._streams:
+                    self._read(fd)
+
+    def _read(self, fd: int, final: bool = False) -> None:
+        """Одно чтение из канала (при final - все доступное); epoll вызовет снова, если данные остались."""
+        stream = self._streams[fd]
+        while True:
+            try:
+                chunk = os.read(fd, READ_SIZE)
+            except BlockingIOError:
+                if final:
+                    self._close(fd)
+                return
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self._close(fd)
+                return
+            self._split(stream, chunk)
+            if not final:
+                return
+
+    def _close(self, fd: int) -> None:
+        # Дескриптор убирается из словаря до закрытия: его номер может сразу получить новый канал
+        stream = self._streams.pop(fd)
+        self._epoll.unregister(fd)
+        os.close(fd)
+        if stream.buffer:
+            # Остаток без перевода строки - последняя строка
+            self._push(stream, bytes(stream.buffer))
+
+    def _split(self, stream: _Stream, chunk: bytes) -> None:
+        buffer = stream.buffer
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            self._push(stream, bytes(buffer[start:end]))
+            start = end + 1
+        while len(buffer) - start > self.max_line:
+            self._push(stream, bytes(buffer[start:start + self.max_line]))
+            start += self.max_line
+        del buffer[:start]
+
+    def _push(self, stream: _Stream, line: bytes) -> None:
+        counters = self.counters[stream.name]
+        counters["lines"] += 1
+        try:
+            self._lines.put_nowait((stream.name, stream.level, line))
+        except queue.Full:
+            counters["dropped"] += 1
+            with self._lock:
+                self._unreported[stream.name] = self._unreported.get(stream.name, 0) + 1
+
+    def _write_loop(self) -> None:
+        reported = time.monotonic()
+        while True:
+            try:
+                item = self._lines.get(timeout=0.5)
+            except queue.Empty:
+                self._report_dropped()
+                continue
+            if item is None:
+                return
+            name, level, line = item
+            text = line.decode("utf-8", "replace").rstrip("\r")
+            self.logger.log(level, f"[{name}] {text}", extra=CAPTURED)
+            # О потерях сообщается, когда очередь разобрана, но не реже раза в секунду
+            if self._unreported and (self._lines.empty() or time.monotonic() - reported >= 1.0):
+                self._report_dropped()
+                reported = time.monotonic()
+
+    def _report_dropped(self) -> None:
+        with self._lock:
+            unreported, self._unreported = self._unreported, {}
+        for name, count in unreported.items():
+            self.logger.warning(f"Процесс '{name}': журнал не успевает, отброшено строк вывода: {count}")
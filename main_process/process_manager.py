@@ -1,15 +1,72 @@
 import subprocess
 import os
 import shlex
-from typing import Dict, Optional, Tuple, List, Any
+import signal
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, List, Any
 from main_process.cfg import ConfigManager
+from main_process.config_schema import (AdcSchema, FftSchema, ProcessSchema, Str3SaverSchema, build_schema,
+                                        override_schema, parse_bool, parse_names)
+from main_process.resources import ResourceLimits
+from main_process.restart_policy import RestartPolicy
+from utils.ready import READY_FD_ENV
 
 class ProcessManager:
+    # Ключи конфигурации, которые читает ProcessManager (в аргументы процесса не передаются)
+    MANAGER_KEYS = ("enable", "depends_on", "ready", "ready_timeout", "zygote", "capture_output",
+                    "restart", "restart_delay", "restart_max_delay", "restart_limit", "restart_window") \
+        + ResourceLimits.KEYS
+    # Ключи менеджера, которые применяются при запуске процесса: их изменение требует перезапуска
+    SPAWN_KEYS = ("zygote", "capture_output") + ResourceLimits.KEYS
+    # Ключи производителя, задающие геометрию кольцевого буфера
+    RING_KEYS = ("ring_slots", "frame_samples", "channels", "bit_depth")
+    # Секции, изменения которых применяются только после перезапуска системы
+    STATIC_SECTIONS = ("logging", "network", "telemetry", "output", "reload")
+
     def __init__(self, logger=None, config_manager=None):
         self.processes: Dict[str, subprocess.Popen] = {}
+        self.exit_codes: Dict[str, int] = {}
+        # Фактические ограничения ресурсов на момент запуска (ResourceLimits.describe) для команды status
+        self.resources: Dict[str, str] = {}
+        self._stopping: set = set()
+        self.rings: Dict[str, Any] = {}
+        self.worker_groups: Dict[str, List[str]] = {}
+        # Дескрипторы чтения каналов готовности запущенных с notify процессов
+        self._ready_pipes: Dict[str, int] = {}
+        # Предзапущенный интерпретатор (секция [zygote]); None - запуск через Popen
+        self.zygote = None
+        self._zygote_unavailable = False
+        # Политики перезапуска и запланированные перезапуски (имя -> срок)
+        self.restart_policies: Dict[str, RestartPolicy] = {}
+        self._restart_pending: Dict[str, float] = {}
+        # Фоновый сбор телеметрии из /proc (start_telemetry)
+        self.telemetry = None
+        # Перехват stdout и stderr процессов в журнал (start_output_capture)
+        self.output = None
+        # Перезагрузки конфигурации (команда reload и наблюдение за файлом) выполняются по одной
+        self._reload_lock = threading.Lock()
+        # Команды выполняются параллельно в потоках NetworkModule, а перезапуски - в потоках
+        # супервизора: проверка и изменение processes, rings, worker_groups, restart_policies,
+        # _restart_pending и _starting выполняются под этой блокировкой. Запуск (Popen, обмен
+        # с zygote) и ожидание завершения процесса - вне ее: reap_children вызывается в цикле
+        # супервизора и не должен ждать медленный запуск или остановку
+        self._lock = threading.RLock()
+        # Процессы, которые сейчас запускаются (место занято, Popen еще не вернулся)
+        self._starting: set = set()
+        # Запуск zygote выполняется одним потоком
+        self._zygote_lock = threading.Lock()
         self.logger = logger or self._create_fallback_logger()
         self.config_manager = config_manager
         self.all_processes = self._get_all_configured_processes()
+        # Таблица статусов и ее версия: обновляются по событиям (_update_status),
+        # команды status только читают снимок (версия, имя -> статус)
+        self._status_lock = threading.Lock()
+        self._status_snapshot: Tuple[int, Dict[str, str]] = (0, {})
+        # Получатели изменений статусов: callback(версия, имя -> новый статус)
+        self._status_listeners: List[Callable[[int, Dict[str, str]], None]] = []
+        self._update_status()
         
     def _create_fallback_logger(self):
         """Создает fallback логгер, если основной не передан"""
@@ -24,17 +81,133 @@ class ProcessManager:
         return self.config_manager.processes_names
     
     def start_configured_processes(self) -> None:
-        """Запускает все процессы, у которых enable=true в конфигурации"""
+        """
+        Запускает все процессы, у которых enable=true в конфигурации.
+
+        Порядок задается ключом depends_on (см. start_processes).
+        """
         if not self.all_processes:
             self.logger.warning("В конфигурации не найдено ни одного процесса")
             return
-            
+
+        enabled = []
         for process_name in self.all_processes:
-            process_config = self.config_manager.get_process_config(process_name)
-            if process_config and process_config.get("enable", "false").lower() == "true":
-                self.start_process(process_name)
+            if self.config_manager.get_process_schema(process_name).enable:
+                enabled.append(process_name)
             else:
                 self.logger.info(f"Процесс '{process_name}' отключен в конфигурации (enable=false)")
+        self.start_processes(enabled)
+
+    def start_processes(self, names: List[str]) -> Dict[str, bool]:
+        """
+        Запускает процессы с учетом зависимостей depends_on.
+
+        Процесс запускается, как только готовы все его зависимости из names
+        (depends_on и источник данных source);
+        независимые процессы запускаются сразу и инициализируются одновременно.
+        Процесс с ready = notify считается готовым после сигнала
+        utils.ready.notify_ready() через канал (не дольше ready_timeout секунд),
+        остальные - сразу после запуска. Если зависимость не запустилась,
+        завершилась или не сообщила о готовности, зависящие от нее процессы
+        не запускаются. Также не запускаются процессы, зависимость которых
+        не запущена и не входит в names (например, отключена): иначе читатель
+        создал бы буфер, в который никто не пишет.
+
+        Returns:
+            Словарь: имя процесса -> готов ли он
+        """
+        import selectors
+
+        selected = set(names)
+        waiting: Dict[str, set] = {}
+        # Процессы, зависимость или источник которых не запущен и не запускается: имя -> зависимость
+        unavailable: Dict[str, str] = {}
+        for name in names:
+            dependencies = set()
+            required = self.config_manager.get_process_dependencies(name)
+            source = self.config_manager.get_process_config(name).get("source")
+            if source and source not in required:
+                required = required + [source]
+            for dependency in required:
+                if dependency in selected:
+                    dependencies.add(dependency)
+                elif dependency not in self.processes:
+                    unavailable.setdefault(name, dependency)
+            waiting[name] = dependencies
+
+        results: Dict[str, bool] = {}
+        # Процессы, от которых ждем сигнала готовности: имя -> (дескриптор канала, срок)
+        pending: Dict[str, Tuple[int, float]] = {}
+        selector = selectors.DefaultSelector()
+
+        def finish(name: str, ready: bool) -> None:
+            results[name] = ready
+            for dependent, dependencies in list(waiting.items()):
+                if name not in dependencies:
+                    continue
+                if ready:
+                    dependencies.discard(name)
+                elif dependent in waiting:
+                    del waiting[dependent]
+                    self.logger.error(f"Процесс '{dependent}' не запущен: зависимость '{name}' не готова")
+                    finish(dependent, False)
+
+        def forget(name: str) -> int:
+            fd, _ = pending.pop(name)
+            selector.unregister(fd)
+            os.close(fd)
+            return fd
+
+        for name, dependency in unavailable.items():
+            if name in waiting:
+                del waiting[name]
+                self.logger.error(f"Процесс '{name}' не запущен: зависимость '{dependency}' не запущена и не запускается")
+                finish(name, False)
+
+        try:
+            while waiting or pending:
+                for name in [name for name, dependencies in waiting.items() if not dependencies]:
+                    del waiting[name]
+                    schema = self.config_manager.get_process_schema(name)
+                    if not self.start_process(name, notify=schema.notify):
+                        finish(name, False)
+                    elif name in self._ready_pipes:
+                        fd = self._ready_pipes.pop(name)
+                        selector.register(fd, selectors.EVENT_READ, name)
+                        pending[name] = (fd, time.monotonic() + schema.ready_timeout)
+                    else:
+                        finish(name, True)
+
+                if not pending:
+                    if waiting and all(waiting.values()):
+                        # Не бывает при проверенной конфигурации (циклы отклоняются при загрузке)
+                        self.logger.error(f"Процессы не запущены из-за зависимостей: {', '.join(waiting)}")
+                        break
+                    continue
+
+                timeout = max(0.0, min(deadline for _, deadline in pending.values()) - time.monotonic())
+                for key, _ in selector.select(timeout):
+                    name = key.data
+                    message = os.read(key.fd, 1)
+                    forget(name)
+                    if message:
+                        self.logger.info(f"Процесс '{name}' сообщил о готовности")
+                        finish(name, True)
+                    else:
+                        self.logger.error(f"Процесс '{name}' завершился, не сообщив о готовности")
+                        finish(name, False)
+
+                now = time.monotonic()
+                for name, (_, deadline) in list(pending.items()):
+                    if deadline <= now:
+                        forget(name)
+                        self.logger.error(f"Процесс '{name}' не сообщил о готовности вовремя")
+                        finish(name, False)
+        finally:
+            for name in list(pending):
+                forget(name)
+            selector.close()
+        return results
 
     def handle_command(self, command: str) -> Tuple[bool, str]:
         """
@@ -42,7 +215,8 @@ class ProcessManager:
         
         Args:
             command: строка команды (например "start adc", "stop fft", "status processes",
-                     "start hello --message ONE --time 2 --file data.txt --directory ./processes")
+                     "start hello --message ONE --time 2 --file data.txt --directory ./processes",
+                     "status processes since 12", "metrics all", "metrics fft history 300", "reload")
             
         Returns:
             Кортеж (успех, сообщение)
@@ -63,6 +237,12 @@ class ProcessManager:
                 return self._handle_stop(parts[1])
             elif cmd == "status":
                 if len(parts) > 1 and parts[1].lower() == "processes":
+                    if len(parts) > 3 and parts[2].lower() == "since":
+                        try:
+                            since = int(parts[3])
+                        except ValueError:
+                            return False, f"Некорректная версия статусов '{parts[3]}': ожидается целое число"
+                        return self._handle_status_all(since)
                     return self._handle_status_all()
                 elif len(parts) > 1:
                     return self._handle_status(parts[1])
@@ -70,12 +250,34 @@ class ProcessManager:
                     return False, "Не указан процесс для статуса"
             elif cmd == "shutdown":
                 return self._handle_shutdown()
+            elif cmd == "ring" and len(parts) > 1:
+                return self._handle_ring(parts[1])
+            elif cmd == "metrics" and len(parts) > 1:
+                return self._handle_metrics(parts[1], parts[2:])
+            elif cmd == "reload":
+                return self.reload_config()
             else:
                 return False, f"Неизвестная команда: {cmd}"
         except Exception as e:
             self.logger.error(f"Ошибка обработки команды '{command}': {e}", exc_info=True)
             return False, f"Ошибка выполнения команды: {str(e)}"
 
+    @staticmethod
+    def command_target(command: str) -> Optional[str]:
+        """
+        Возвращает имя процесса, к которому относится команда, или None.
+
+        Используется NetworkModule для упорядочивания команд, адресованных
+        одному процессу (например "stop fft" и последующий "start fft").
+        """
+        parts = command.split(None, 2)
+        if len(parts) < 2:
+            return None
+        cmd = parts[0].lower()
+        if cmd in ("start", "stop") or (cmd == "status" and parts[1].lower() != "processes"):
+            return parts[1]
+        return None
+
     def _parse_user_args(self, args: List[str]) -> Dict[str, str]:
         """Парсит пользовательские аргументы в формате --key value в словарь"""
         user_args = {}
@@ -94,51 +296,143 @@ class ProcessManager:
                 i += 1
         return user_args
 
+    def manual_start(self, process_name: str, user_args: Dict[str, str] = None) -> str:
+        """
+        Запуск по команде start (текстовой или бинарной).
+
+        Ручной запуск отменяет запланированный перезапуск и снимает защиту
+        от циклических падений.
+
+        Returns:
+            "not_configured", "already_running", "started" или "failed"
+        """
+        with self._lock:
+            if process_name not in self.all_processes:
+                return "not_configured"
+            if process_name in self.processes or process_name in self._starting:
+                return "already_running"
+            self._restart_pending.pop(process_name, None)
+            self._restart_policy(process_name).reset()
+            self._update_status([process_name])
+        return "started" if self.start_process(process_name, user_args or {}) else "failed"
+
+    def manual_stop(self, process_name: str) -> str:
+        """
+        Остановка по команде stop (текстовой или бинарной); для завершившегося
+        процесса отменяет запланированный перезапуск.
+
+        Returns:
+            "not_configured", "not_running", "cancelled", "stopped" или "failed"
+        """
+        if process_name not in self.all_processes:
+            return "not_configured"
+        with self._lock:
+            running = process_name in self.processes
+            cancelled = not running and self._restart_pending.pop(process_name, None) is not None
+        if not running:
+            if not cancelled:
+                return "not_running"
+            if process_name in self.worker_groups:
+                # Сборщик завершился, исполнители пула ждали перезапуска
+                self.stop_process(process_name)
+            self._update_status([process_name])
+            return "cancelled"
+        return "stopped" if self.stop_process(process_name) else "failed"
+
     def _handle_start(self, process_name: str, user_args: Dict[str, str] = None) -> Tuple[bool, str]:
         """Обработка команды start с пользовательскими параметрами"""
-        if process_name not in self.all_processes:
+        result = self.manual_start(process_name, user_args)
+        if result == "not_configured":
             return False, f"Процесс '{process_name}' не найден в конфигурации"
-            
-        if process_name in self.processes:
+        if result == "already_running":
             status = self.get_process_status(process_name)
             return False, f"Процесс '{process_name}' уже запущен (статус: {status})"
-            
-        success = self.start_process(process_name, user_args or {})
-        if success:
+        if result == "started":
             return True, f"Процесс '{process_name}' успешно запущен"
-        else:
-            return False, f"Не удалось запустить процесс '{process_name}'"
+        return False, f"Не удалось запустить процесс '{process_name}'"
 
     def _handle_stop(self, process_name: str) -> Tuple[bool, str]:
         """Обработка команды stop"""
-        if process_name not in self.all_processes:
+        result = self.manual_stop(process_name)
+        if result == "not_configured":
             return False, f"Процесс '{process_name}' не найден в конфигурации"
-            
-        if process_name not in self.processes:
+        if result == "cancelled":
+            return True, f"Перезапуск процесса '{process_name}' отменен"
+        if result == "not_running":
             return False, f"Процесс '{process_name}' не запущен"
-            
-        success = self.stop_process(process_name)
-        if success:
+        if result == "stopped":
             return True, f"Процесс '{process_name}' успешно остановлен"
-        else:
-            return False, f"Не удалось остановить процесс '{process_name}'"
+        return False, f"Не удалось остановить процесс '{process_name}'"
 
     def _handle_status(self, process_name: str) -> Tuple[bool, str]:
-        """Обработка команды status для одного процесса"""
+        """
+        Обработка команды status для одного процесса.
+
+        Только читает таблицы: завершение процессов отмечает reap_children,
+        ограничения ресурсов записываются при запуске (self.resources).
+        """
         if process_name not in self.all_processes:
             return False, f"Процесс '{process_name}' не найден в конфигурации"
             
         status = self.get_process_status(process_name)
-        return True, f"Статус процесса '{process_name}': {status}"
+        lines = [f"Статус процесса '{process_name}': {status}"]
+        policy = self._restart_policy(process_name)
+        if policy.mode != "never" or policy.restarts:
+            lines.append(f"  {policy.status()}")
+        resources = self.resources.get(process_name)
+        if resources is not None and process_name in self.processes:
+            lines.append(f"  {resources}")
+        output = self.output.stats(process_name) if self.output is not None else None
+        if output is not None:
+            lines.append(f"  вывод: строк {output['lines']}, отброшено {output['dropped']}")
+        lines.extend(self._worker_status_lines(process_name))
+        return True, "\n".join(lines)
+
+    def _worker_status_lines(self, name: str) -> List[str]:
+        """Загрузка исполнителей пула: готовые пачки, очередь сборщика, отставание и потери на входе."""
+        workers = self.worker_groups.get(name)
+        if not workers:
+            return []
+
+        producer = self.config_manager.get_process_config(name).get("source")
+        source = self.rings.get(producer)
+        input_stats = dict(zip(self._ring_consumers(producer), source.stats())) if source else {}
+        lines = []
+        for worker in workers:
+            if worker in self.processes:
+                status = "Running"
+            else:
+                status = "Crashed" if self.exit_codes.get(worker, 0) != 0 else "Stopped"
+            line = f"  {worker}: {status}"
+            results = self.rings.get(worker)
+            if results is not None:
+                line += f", пачек {results.write_seq}, в очереди сборщика {results.stats()[0]['lag']}"
+            stats = input_stats.get(worker)
+            if stats is not None:
+                line += f", отставание входа {stats['lag']} (макс. {stats['max_lag']}), потеряно кадров {stats['dropped']}"
+            lines.append(line)
+        return lines
+
+    def _handle_status_all(self, since: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Обработка команды status processes [since <версия>].
 
-    def _handle_status_all(self) -> Tuple[bool, str]:
-        """Обработка команды status processes"""
-        statuses = self.list_all_processes_statuses()
+        С since ответ без списка, если статусы не менялись после указанной
+        версии (загрузка процессора и памяти в версию не входят).
+        """
+        version, statuses = self._status_snapshot
+        if since is not None and since == version:
+            return True, f"Статусы не изменились (версия {version})"
         if not statuses:
             return True, "Нет процессов в конфигурации"
             
-        status_lines = [f"{name}: {status}" for name, status in statuses.items()]
-        return True, "Статусы всех процессов:\n" + "\n".join(status_lines)
+        status_lines = []
+        for name, status in statuses.items():
+            metrics = self.telemetry.latest(name) if self.telemetry is not None else None
+            if metrics is not None:
+                status += f" (cpu {metrics['cpu']}%, rss {metrics['rss'] / (1 << 20):.1f} МБ)"
+            status_lines.append(f"{name}: {status}")
+        return True, f"Статусы всех процессов (версия {version}):\n" + "\n".join(status_lines)
 
     def _handle_shutdown(self) -> Tuple[bool, str]:
         """Обработка команды shutdown"""
@@ -146,7 +440,172 @@ class ProcessManager:
         self.stop_all_processes()
         return True, f"Система выключена. Остановлено процессов: {count}"
 
-    def start_process(self, name: str, user_args: Dict[str, str] = None) -> bool:
+    def _handle_metrics(self, target: str, args: List[str]) -> Tuple[bool, str]:
+        """
+        Обработка команды metrics: последняя выборка телеметрии в JSON.
+
+        metrics <имя> | metrics all              - последняя выборка
+        metrics <имя> history [секунд]           - история по столбцам
+        """
+        if self.telemetry is None:
+            return False, "Сбор телеметрии не запущен"
+        if target.lower() == "all":
+            payload = self.telemetry.latest()
+        elif target not in self.all_processes and target.split("#", 1)[0] not in self.all_processes:
+            return False, f"Процесс '{target}' не найден в конфигурации"
+        elif args and args[0].lower() == "history":
+            seconds = float(args[1]) if len(args) > 1 else None
+            payload = {"name": target, **self.telemetry.history(target, seconds)}
+        else:
+            metrics = self.telemetry.latest(target)
+            if metrics is None:
+                return False, f"Нет телеметрии процесса '{target}' (процесс не запущен)"
+            payload = {"name": target, **metrics}
+        return True, json.dumps(payload, separators=(",", ":"))
+
+    def start_telemetry(self, interval: float = 1.0, history_seconds: float = 600.0) -> None:
+        """Запускает фоновый сбор телеметрии запущенных процессов (см. main_process/telemetry.py)."""
+        from main_process.telemetry import ProcessTelemetry
+
+        def running_pids() -> Dict[str, int]:
+            # returncode обновляет reap_children; поток телеметрии сам waitpid не вызывает
+            return {name: process.pid for name, process in list(self.processes.items())
+                    if process.returncode is None}
+
+        if self.telemetry is None:
+            self.telemetry = ProcessTelemetry(running_pids, interval, history_seconds, logger=self.logger)
+        self.telemetry.start()
+
+    def stop_telemetry(self) -> None:
+        if self.telemetry is not None:
+            self.telemetry.stop()
+
+    def start_output_capture(self, queue_size: int = 10000, max_line: int = 4096) -> None:
+        """
+        Включает перехват stdout и stderr процессов, запускаемых после вызова
+        (см. main_process/output_capture.py). Процесс с capture_output = false
+        выводит, как прежде, в консоль ProcessManager.
+        """
+        from main_process.output_capture import OutputCapture
+
+        if self.output is None:
+            self.output = OutputCapture(self.logger, queue_size, max_line)
+        self.output.start()
+
+    def stop_output_capture(self) -> None:
+        if self.output is not None:
+            self.output.stop()
+
+    def _handle_ring(self, producer: str) -> Tuple[bool, str]:
+        """Обработка команды ring: отставание и переполнения читателей кольцевого буфера"""
+        ring = self.rings.get(producer)
+        if ring is None:
+            return False, f"Кольцевой буфер процесса '{producer}' не создан"
+
+        consumers = self._ring_consumers(producer)
+        lines = [f"write_seq={ring.write_seq} slots={ring.slots} frame_bytes={ring.frame_bytes}"]
+        for name, stats in zip(consumers, ring.stats()):
+            lines.append(f"{name}: lag={stats['lag']} max_lag={stats['max_lag']} "
+                         f"overruns={stats['overruns']} dropped={stats['dropped']}")
+        return True, f"Кольцевой буфер '{producer}':\n" + "\n".join(lines)
+
+    def _ring_consumers(self, producer: str, processes: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+        """
+        Читатели кольцевого буфера производителя (source = <producer>).
+
+        Процесс с пулом исполнителей (workers > 1) представлен своими
+        исполнителями <имя>#0 ... <имя>#N-1, каждый из которых читает буфер.
+        processes - секции процессов другой конфигурации (по умолчанию текущей).
+        """
+        installed = processes is None
+        if installed:
+            processes = self.config_manager.get_config().get("processes", {})
+        consumers = []
+        for name, process_config in processes.items():
+            if process_config.get("source") != producer:
+                continue
+            schema = self.config_manager.get_process_schema(name) if installed else build_schema(name, process_config)
+            workers = self._pool_size(schema)
+            if workers > 1:
+                consumers.extend(f"{name}#{index}" for index in range(workers))
+            else:
+                consumers.append(name)
+        return consumers
+
+    @staticmethod
+    def _pool_size(schema: ProcessSchema) -> int:
+        """Число исполнителей для процесса fft (ключ workers), для остальных - 1."""
+        return schema.workers if isinstance(schema, FftSchema) else 1
+
+    def _ensure_ring(self, producer: str):
+        """Создает кольцевой буфер производителя при первом обращении."""
+        with self._lock:
+            ring = self.rings.get(producer)
+            if ring is not None:
+                return ring
+
+            from utils.ring_buffer import RingBuffer, dtype_for_bit_depth
+            schema = self.config_manager.get_process_schema(producer)
+            ring = RingBuffer.create(
+                slots=schema.ring_slots,
+                frame_samples=schema.frame_samples,
+                channels=schema.channels,
+                dtype=dtype_for_bit_depth(schema.bit_depth),
+                max_consumers=max(1, len(self._ring_consumers(producer))),
+            )
+            self.rings[producer] = ring
+        self.logger.info(f"Создан кольцевой буфер '{ring.spec()}' для процесса '{producer}'")
+        return ring
+
+    def _log_source_rate(self, name: str, schema: ProcessSchema) -> None:
+        """
+        Сообщает нагрузку читателя кольцевого буфера по производным полям схем:
+        поток источника (AdcSchema.bytes_per_second), спектров в секунду для fft
+        (FftSchema.hop) и сколько секунд потока вмещает очередь записи str3_saver.
+        """
+        if not schema.source:
+            return
+        producer = self.config_manager.get_process_schema(schema.source)
+        if not isinstance(producer, AdcSchema):
+            return
+        rate = f"поток источника '{schema.source}' {producer.bytes_per_second / 1e6:.3f} МБ/с"
+        if isinstance(schema, FftSchema):
+            self.logger.info(f"Процесс '{name}': {rate}, {schema.sampling_rate / schema.hop:.1f} спектров/с "
+                             f"по {schema.bins} бинов")
+        elif isinstance(schema, Str3SaverSchema):
+            queue_seconds = schema.queue_buffers * schema.buffer_kb * 1024 / producer.bytes_per_second
+            self.logger.info(f"Процесс '{name}': {rate}, очередь записи вмещает {queue_seconds:.1f} с")
+            if queue_seconds < 1.0:
+                self.logger.warning(f"Очередь записи процесса '{name}' меньше секунды потока: "
+                                    f"увеличьте buffer_kb или queue_buffers")
+
+    def _ring_args(self, name: str, process_config: Dict[str, Any]) -> Dict[str, str]:
+        """Аргументы подключения к кольцевому буферу для производителя (type = adc) и его читателей."""
+        if process_config.get("type") == "adc":
+            return {"ring": self._ensure_ring(name).spec()}
+
+        producer = process_config.get("source")
+        if not producer:
+            return {}
+        if producer not in self.all_processes:
+            raise KeyError(f"Источник '{producer}' процесса '{name}' не найден в конфигурации")
+        ring = self._ensure_ring(producer)
+        args = {"ring": ring.spec(), "ring_consumer": str(self._ring_consumers(producer).index(name))}
+        # Частота дискретизации задается у производителя, читателям она нужна для расчета частот
+        sampling_rate = self.config_manager.get_process_config(producer).get("sampling_rate")
+        if sampling_rate is not None and "sampling_rate" not in process_config:
+            args["sampling_rate"] = str(sampling_rate)
+        return args
+
+    def close_rings(self) -> None:
+        """Удаляет кольцевые буферы (вызывается после остановки всех процессов)."""
+        with self._lock:
+            for producer, ring in list(self.rings.items()):
+                ring.close()
+                del self.rings[producer]
+            self.worker_groups.clear()
+
+    def start_process(self, name: str, user_args: Dict[str, str] = None, notify: bool = False) -> bool:
         """
         Запускает процесс с заданным именем, объединяя параметры из конфигурации
         и пользовательские параметры (пользовательские имеют приоритет).
@@ -154,89 +613,558 @@ class ProcessManager:
         Args:
             name: имя процесса
             user_args: словарь пользовательских параметров (например {'message': 'ONE', 'time': '2'})
+            notify: передать процессу канал готовности (дескриптор чтения - в self._ready_pipes[name])
         """
-        try:
-            script_path = f"processes/{name}.py"
-            if not os.path.exists(script_path):
-                self.logger.error(f"Файл процесса не найден: {script_path}")
-                return False
-                
-            if name in self.processes:
+        script_path = f"processes/{name}.py"
+        if not os.path.exists(script_path):
+            self.logger.error(f"Файл процесса не найден: {script_path}")
+            return False
+
+        with self._lock:
+            if name in self.processes or name in self._starting:
                 self.logger.warning(f"Попытка запуска уже запущенного процесса '{name}'")
                 return False
-            
+            self._starting.add(name)
+        try:
             # Получаем конфигурацию процесса
-            process_config = self.config_manager.get_process_config(name) or {}
-            
-            # Удаляем параметр enable из конфигурации
-            process_config.pop('enable', None)
-            
+            process_config = dict(self.config_manager.get_process_config(name) or {})
+
+            # Удаляем параметры, которые относятся к ProcessManager, а не к процессу
+            for key in self.MANAGER_KEYS:
+                process_config.pop(key, None)
+
             # Объединяем параметры (пользовательские имеют приоритет)
             combined_args = {**process_config, **(user_args or {})}
-            
-            # Формируем команду для запуска
-            command = ["python", script_path]
-            
-            # Добавляем параметры в командную строку
-            for param, value in combined_args.items():
-                command.extend([f"--{param}", str(value)])
-            
-            self.logger.debug(f"Запускаем процесс командой: {' '.join(command)}")
-            
-            process = subprocess.Popen(command)
-            self.processes[name] = process
-            self.logger.info(f"Процесс '{name}' запущен (PID: {process.pid}) с параметрами: {combined_args}")
+            schema = override_schema(self.config_manager.get_process_schema(name), user_args or {})
+            self._log_source_rate(name, schema)
+
+            workers = self._pool_size(schema)
+            combined_args.pop('workers', None)
+            if workers > 1:
+                started = self._start_worker_pool(name, script_path, combined_args, schema, notify)
+                self._restart_policy(name).started(time.monotonic())
+                return started
+
+            combined_args.update(self._ring_args(name, combined_args))
+            self._spawn_process(name, script_path, combined_args, notify)
+            self._restart_policy(name).started(time.monotonic())
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Ошибка при запуске процесса '{name}': {e}", exc_info=True)
             return False
 
+        finally:
+            with self._lock:
+                self._starting.discard(name)
+
+    def _spawn_process(self, name: str, script_path: str, args: Dict[str, Any],
+                       notify: bool = False) -> subprocess.Popen:
+        """
+        Запускает скрипт дочерним процессом и регистрирует его под именем name.
+
+        При notify дочерний процесс получает дескриптор записи канала готовности
+        (переменная окружения POPGM_READY_FD), а дескриптор чтения сохраняется
+        в self._ready_pipes[name]. Ограничения ресурсов из секции процесса
+        (cpu_affinity, nice, rt_priority, memory_limit, io_class) применяются
+        по PID сразу после запуска (preexec_fn небезопасен при потоках супервизора). Если включен перехват вывода, stdout
+        и stderr процесса направляются в каналы, которые читает self.output.
+        """
+        # Формируем команду для запуска
+        command = ["python", script_path]
+
+        # Добавляем параметры в командную строку
+        for param, value in args.items():
+            command.extend([f"--{param}", str(value)])
+
+        self.logger.debug(f"Запускаем процесс командой: {' '.join(command)}")
+
+        # Дочерние процессы импортируют общие модули проекта (utils, main_process)
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+        schema = self.config_manager.get_process_schema(name.split("#", 1)[0])
+        limits = schema.limits
+        capture = self.output is not None and schema.capture_output
+        if notify:
+            ready_read, ready_write = os.pipe()
+        if capture:
+            stdout_read, stdout_write = os.pipe()
+            stderr_read, stderr_write = os.pipe()
+            # Без буферизации stdout строки доходят до журнала сразу, а не блоками по 8 КБ
+            env["PYTHONUNBUFFERED"] = "1"
+        try:
+            process = None
+            zygote = self._zygote_for(name)
+            if zygote is not None:
+                try:
+                    process = zygote.spawn(command, env, {READY_FD_ENV: ready_write} if notify else None,
+                                           (stdout_write, stderr_write) if capture else None)
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"Zygote не запустил процесс '{name}': {e}, запуск через Popen")
+            if process is None:
+                if notify:
+                    env[READY_FD_ENV] = str(ready_write)
+                process = subprocess.Popen(command, env=env, pass_fds=(ready_write,) if notify else (),
+                                           stdout=stdout_write if capture else None,
+                                           stderr=stderr_write if capture else None)
+        except Exception:
+            if notify:
+                os.close(ready_read)
+            if capture:
+                os.close(stdout_read)
+                os.close(stderr_read)
+            raise
+        finally:
+            if notify:
+                os.close(ready_write)
+            if capture:
+                os.close(stdout_write)
+                os.close(stderr_write)
+        if notify:
+            self._ready_pipes[name] = ready_read
+        if capture:
+            self.output.register(name, stdout_read, stderr_read)
+
+        if limits:
+            limits.apply(process.pid)
+        resources = ResourceLimits.describe(process.pid)
+        with self._lock:
+            self.processes[name] = process
+            self.resources[name] = resources
+            self.exit_codes.pop(name, None)
+            self._update_status([name])
+        if process.poll() is not None:
+            # Процесс завершился до регистрации: его SIGCHLD мог быть обработан раньше,
+            # повторный сигнал заставит супервизор забрать его через reap_children
+            os.kill(os.getpid(), signal.SIGCHLD)
+        mode = " через zygote" if not isinstance(process, subprocess.Popen) else ""
+        self.logger.info(f"Процесс '{name}' запущен{mode} (PID: {process.pid}) с параметрами: {args}")
+        if limits:
+            failed = limits.mismatches(process.pid)
+            if failed:
+                self.logger.warning(f"Процессу '{name}' не удалось назначить: {', '.join(failed)} ({resources})")
+        return process
+
+    def _zygote_for(self, name: str):
+        """
+        Zygote для запуска процесса или None, если процесс запускается через Popen.
+
+        Zygote используется, когда в секции [zygote] enable = true и у процесса
+        нет zygote = false. Zygote запускается при первом обращении; если он
+        не запустился, процессы запускаются через Popen до stop_all_processes.
+        """
+        settings = self.config_manager.get_config().get("zygote", {}) if self.config_manager else {}
+        if not parse_bool(settings.get("enable", False)) or self._zygote_unavailable:
+            return None
+        if not self.config_manager.get_process_schema(name.split("#", 1)[0]).zygote:
+            return None
+        zygote = self.zygote
+        if zygote is not None and zygote.alive():
+            return zygote
+
+        from main_process.zygote import ZygoteClient
+        with self._zygote_lock:
+            if self.zygote is not None and self.zygote.alive():
+                return self.zygote
+            if self.zygote is not None:
+                self.logger.warning("Zygote завершился, перезапуск")
+                self.zygote.stop()
+            zygote = ZygoteClient(list(parse_names(settings.get("preload", ""))), logger=self.logger)
+            try:
+                zygote.start()
+            except Exception as e:
+                self.logger.error(f"Не удалось запустить zygote: {e}; процессы запускаются через Popen")
+                zygote = None
+                self._zygote_unavailable = True
+            self.zygote = zygote
+            return zygote
+
+    def _start_worker_pool(self, name: str, script_path: str, combined_args: Dict[str, Any], schema: FftSchema,
+                           notify: bool = False) -> bool:
+        """
+        Запускает пул исполнителей fft и сборщик результатов.
+
+        Исполнители <имя>#i читают общий кольцевой буфер источника и считают
+        пачки кадров по кругу (пачка k - исполнителю k % workers). Каждый пишет
+        готовые пачки с номером в свой кольцевой буфер результатов, а сборщик
+        под именем <имя> выдает спектры в порядке номеров пачек.
+        О готовности пула (notify) сообщает сборщик. Размер пула, пачки и число
+        бинов берутся из схемы процесса (с учетом аргументов команды start).
+        """
+        from utils.ring_buffer import RingBuffer
+
+        workers, chunk_frames = schema.workers, schema.chunk_frames
+        combined_args.pop('chunk_frames', None)
+        combined_args.pop('result_slots', None)
+        # Остатки пула после аварийного завершения сборщика
+        self._stop_worker_pool(name)
+        worker_names = [f"{name}#{index}" for index in range(workers)]
+        with self._lock:
+            self.worker_groups[name] = worker_names
+
+        try:
+            result_specs = []
+            for index, worker in enumerate(worker_names):
+                worker_args = dict(combined_args)
+                worker_args.update(self._ring_args(worker, combined_args))
+                source = self.rings[combined_args["source"]]
+                # Строка 0 слота хранит номер пачки, далее chunk_frames спектров всех каналов
+                results = RingBuffer.create(slots=schema.result_slots, frame_samples=chunk_frames + 1,
+                                            channels=source.channels * schema.bins, dtype='float32',
+                                            max_consumers=1)
+                with self._lock:
+                    self.rings[worker] = results
+                result_specs.append(results.spec())
+
+                worker_args.update({
+                    "worker_index": index,
+                    "workers": workers,
+                    "chunk_frames": chunk_frames,
+                    "result_ring": results.spec(),
+                })
+                self._spawn_process(worker, script_path, worker_args)
+
+            collector_args = {key: value for key, value in worker_args.items()
+                              if key not in ("source", "ring", "ring_consumer", "worker_index", "result_ring")}
+            collector_args.update({"workers": workers, "result_rings": ",".join(result_specs)})
+            self._spawn_process(name, script_path, collector_args, notify)
+            return True
+
+        except Exception:
+            self._stop_worker_pool(name)
+            raise
+
+    def _stop_worker_pool(self, name: str, timeout: float = 5.0) -> None:
+        """Останавливает исполнителей пула и удаляет их буферы результатов."""
+        with self._lock:
+            workers = self.worker_groups.pop(name, [])
+        for worker in workers:
+            if worker in self.processes:
+                self.stop_process(worker, timeout)
+            with self._lock:
+                results = self.rings.pop(worker, None)
+            if results is not None:
+                results.close()
+
     def stop_process(self, name: str, timeout: float = 5.0) -> bool:
         """Останавливает процесс по имени, используя мягкое завершение (SIGTERM)."""
-        if name not in self.processes:
+        with self._lock:
+            self._restart_pending.pop(name, None)
+            process = self.processes.get(name)
+            if process is not None:
+                self._stopping.add(name)
+        if process is None:
+            if name in self.worker_groups:
+                # Сборщик уже завершился, остаются исполнители пула
+                self._stop_worker_pool(name, timeout)
+                return True
             self.logger.warning(f"Попытка остановки несуществующего процесса '{name}'")
             return False
-        
-        process = self.processes[name]
+
         try:
             process.terminate()
             process.wait(timeout=timeout)
-            del self.processes[name]
+            with self._lock:
+                self.processes.pop(name, None)
             self.logger.info(f"Процесс '{name}' (PID: {process.pid}) остановлен")
             return True
             
         except subprocess.TimeoutExpired:
             self.logger.warning(f"Процесс '{name}' не завершился вовремя, принудительное завершение (SIGKILL)")
             process.kill()
-            del self.processes[name]
+            process.wait()
+            with self._lock:
+                self.processes.pop(name, None)
             return True
             
         except Exception as e:
             self.logger.error(f"Ошибка при остановке процесса '{name}': {e}", exc_info=True)
             return False
 
+        finally:
+            with self._lock:
+                self._stopping.discard(name)
+            self._stop_worker_pool(name, timeout)
+            self._update_status([name])
+
+    def reap_children(self) -> List[Tuple[str, int]]:
+        """
+        Забирает завершившиеся дочерние процессы (вызывается по SIGCHLD).
+
+        Процессы, которые сейчас останавливаются через stop_process, пропускаются.
+
+        Returns:
+            Список пар (имя процесса, код возврата) для завершившихся процессов
+        """
+        exited = []
+        with self._lock:
+            for name, process in list(self.processes.items()):
+                if name in self._stopping:
+                    continue
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+
+                self.processes.pop(name, None)
+                self.exit_codes[name] = returncode
+                exited.append((name, returncode))
+                if returncode == 0:
+                    self.logger.info(f"Процесс '{name}' (PID: {process.pid}) завершился")
+                else:
+                    self.logger.error(f"Процесс '{name}' (PID: {process.pid}) аварийно завершился с кодом {returncode}")
+            if exited:
+                self._update_status([name for name, _ in exited])
+        return exited
+
+    def _restart_policy(self, name: str) -> RestartPolicy:
+        """Политика перезапуска процесса из его секции конфигурации (создается при первом обращении)."""
+        with self._lock:
+            policy = self.restart_policies.get(name)
+            if policy is None:
+                process_config = self.config_manager.get_process_config(name) if name in self.all_processes else {}
+                try:
+                    policy = RestartPolicy.from_config(process_config)
+                except ValueError as e:
+                    self.logger.error(f"Некорректная политика перезапуска процесса '{name}': {e}; перезапуск отключен")
+                    policy = RestartPolicy()
+                self.restart_policies[name] = policy
+            return policy
+
+    def plan_restart(self, name: str, returncode: Optional[int]) -> Optional[Tuple[str, float]]:
+        """
+        Решает, перезапускать ли завершившийся процесс (вызывается супервизором после reap_children).
+
+        Завершение исполнителя пула <имя>#i перезапускает пул целиком: сборщик
+        и остальные исполнители останавливаются.
+
+        Returns:
+            (имя процесса, задержка в секундах) или None, если перезапуск не нужен
+        """
+        target = name.split("#", 1)[0]
+        with self._lock:
+            if target not in self.all_processes or target in self._stopping or target in self._restart_pending:
+                return None
+
+            policy = self._restart_policy(target)
+            delay = policy.on_exit(returncode, time.monotonic())
+            if delay is None:
+                self._update_status([target])
+                if policy.tripped:
+                    self.logger.error(f"Процесс '{target}' завершился более {policy.limit} раз за {policy.window:g} с, "
+                                      f"автоматический перезапуск отключен до команды start")
+                return None
+
+        if target != name and target in self.processes:
+            self.logger.warning(f"Исполнитель '{name}' завершился, пул '{target}' перезапускается целиком")
+            self.stop_process(target)
+        with self._lock:
+            self._restart_pending[target] = time.monotonic() + delay
+            self._update_status([target])
+        self.logger.warning(f"Процесс '{target}' будет перезапущен через {delay:g} с")
+        return target, delay
+
+    def restart_process(self, name: str) -> Optional[Tuple[str, float]]:
+        """
+        Выполняет запланированный перезапуск (если его не отменили командой stop или start).
+
+        Returns:
+            Повторный план перезапуска, если процесс не удалось запустить
+        """
+        with self._lock:
+            if self._restart_pending.pop(name, None) is None or name in self.processes or name in self._starting:
+                return None
+            self._update_status([name])
+            policy = self._restart_policy(name)
+            policy.restarts += 1
+        if self.start_process(name):
+            self.logger.info(f"Процесс '{name}' перезапущен (перезапуск {policy.restarts})")
+            return None
+        return self.plan_restart(name, None)
+
     def stop_all_processes(self) -> None:
         """Останавливает все запущенные процессы."""
+        self._restart_pending.clear()
         for name in list(self.processes.keys()):
-            self.stop_process(name)
+            # Исполнители пула останавливаются вместе со своим сборщиком
+            if name in self.processes:
+                self.stop_process(name)
+        if self.zygote is not None:
+            self.zygote.stop()
+            self.zygote = None
+        self._zygote_unavailable = False
+        self._update_status()
+
+    def reload_config(self) -> Tuple[bool, str]:
+        """
+        Перечитывает файл конфигурации и применяет изменения без остановки системы.
+
+        Перезапускаются только запущенные процессы, у которых изменились
+        аргументы запуска (в том числе унаследованная от источника частота
+        дискретизации и геометрия его кольцевого буфера) или ключи,
+        применяемые при запуске (SPAWN_KEYS). Остальные процессы продолжают
+        работать, новые политики перезапуска действуют сразу. Если файл
+        содержит ошибки, текущая конфигурация не меняется.
+        """
+        with self._reload_lock:
+            try:
+                new = self.config_manager.parse_config()
+            except ValueError as e:
+                self.logger.error(f"Конфигурация не перезагружена: {e}")
+                return False, f"Конфигурация не перезагружена: {e}"
+            old = self.config_manager.get_config()
+            diff = self.config_manager.diff_sections(old, new)
+            if not diff:
+                return True, "Конфигурация не изменилась"
+
+            old_processes = old.get("processes", {})
+            new_processes = new.get("processes", {})
+            running = [name for name in old_processes if name in self.processes or name in self.worker_groups]
+            affected = [name for name in running
+                        if self._launch_signature(name, old_processes) != self._launch_signature(name, new_processes)]
+            stale_rings = [producer for producer in self.rings if "#" not in producer
+                           and self._ring_signature(producer, old_processes) != self._ring_signature(producer, new_processes)]
+
+            # Читатели останавливаются раньше производителей кольцевых буферов
+            for name in sorted(affected, key=lambda name: name in self.rings):
+                self.stop_process(name)
+            with self._lock:
+                for producer in stale_rings:
+                    # Все процессы буфера остановлены: их сигнатуры включают геометрию буфера
+                    self.rings.pop(producer).close()
+            for name in old_processes:
+                if name not in new_processes:
+                    self._restart_pending.pop(name, None)
+                    self.restart_policies.pop(name, None)
+                elif any(old_processes[name].get(key) != new_processes[name].get(key)
+                         for key in self.MANAGER_KEYS if key.startswith("restart")):
+                    self.restart_policies.pop(name, None)
+            if "zygote" in diff and self.zygote is not None:
+                # Новый zygote с новым списком preload запустится при следующем запуске процесса
+                self.zygote.stop()
+                self.zygote = None
+            self._zygote_unavailable = False
+
+            self.config_manager.swap_config(new)
+            self.all_processes = self.config_manager.processes_names
+            self._update_status()
+
+            restart = [name for name in affected if name in new_processes]
+            results = self.start_processes(restart) if restart else {}
+
+        labels = {"added": "добавлена", "removed": "удалена", "changed": "изменена"}
+        lines = ["Конфигурация перезагружена: " + ", ".join(f"{name} ({labels[change]})"
+                                                          for name, change in diff.items())]
+        stopped = [name for name in affected if name not in new_processes]
+        if restart:
+            lines.append(f"Перезапущены: {', '.join(restart)}")
+        if stopped:
+            lines.append(f"Остановлены (удалены из конфигурации): {', '.join(stopped)}")
+        failed = [name for name, ready in results.items() if not ready]
+        if failed:
+            lines.append(f"Не запустились: {', '.join(failed)}")
+        if not affected:
+            lines.append("Запущенные процессы не затронуты")
+        static = [name for name in diff if name in self.STATIC_SECTIONS]
+        if static:
+            lines.append(f"Применятся после перезапуска системы: {', '.join(static)}")
+        self.logger.info("; ".join(lines))
+        return not failed, "\n".join(lines)
+
+    def _launch_signature(self, name: str, processes: Dict[str, Dict[str, Any]]) -> Optional[tuple]:
+        """Все, от чего зависит запуск процесса name в конфигурации processes (None - процесса нет)."""
+        process_config = processes.get(name)
+        if process_config is None:
+            return None
+        values = {key: str(value) for key, value in process_config.items()
+                  if key not in self.MANAGER_KEYS or key in self.SPAWN_KEYS}
+        producer = name if process_config.get("type") == "adc" else process_config.get("source")
+        if producer in processes and producer != name and "sampling_rate" not in process_config:
+            values["sampling_rate"] = str(processes[producer].get("sampling_rate"))
+        return tuple(sorted(values.items())), self._ring_signature(producer, processes)
+
+    def _ring_signature(self, producer: Optional[str], processes: Dict[str, Dict[str, Any]]) -> Optional[tuple]:
+        """Геометрия кольцевого буфера производителя и его читатели (порядок читателей задает их номера)."""
+        if producer not in processes:
+            return None
+        producer_config = processes[producer]
+        return (tuple(str(producer_config.get(key)) for key in self.RING_KEYS)
+                + tuple(self._ring_consumers(producer, processes)))
 
     def get_process_status(self, name: str) -> str:
-        """Возвращает статус процесса (Running, Stopped, None или Not Configured)."""
-        if name not in self.all_processes:
-            return "Not Configured"
-            
-        if name not in self.processes:
-            process_config = self.config_manager.get_process_config(name)
-            if process_config and process_config.get("enable", "false").lower() == "true":
+        """Возвращает статус процесса (Running, Stopped, Crashed, Restarting, CrashLoop, None или Not Configured)."""
+        return self._status_snapshot[1].get(name, "Not Configured")
+
+    @property
+    def status_version(self) -> int:
+        """Версия таблицы статусов: увеличивается при каждом изменении статуса любого процесса."""
+        return self._status_snapshot[0]
+
+    def _update_status(self, names: Optional[List[str]] = None) -> None:
+        """
+        Пересчитывает статусы процессов names (всех, если None) после события:
+        запуска, остановки, завершения, планирования перезапуска, перезагрузки
+        конфигурации или изменения каталога processes/. Таблица заменяется
+        целиком, версия увеличивается, только если статус действительно изменился.
+        """
+        with self._status_lock:
+            version, table = self._status_snapshot
+            if names is None:
+                updated = {name: self._compute_status(name) for name in self.all_processes}
+            else:
+                updated = dict(table)
+                for name in {name.split("#", 1)[0] for name in names}:
+                    if name in self.all_processes:
+                        updated[name] = self._compute_status(name)
+            if updated != table:
+                self._status_snapshot = (version + 1, updated)
+                if self._status_listeners:
+                    changes = {name: status for name, status in updated.items() if table.get(name) != status}
+                    changes.update((name, "Not Configured") for name in table if name not in updated)
+                    # Под блокировкой: получатели видят изменения в порядке версий
+                    for listener in self._status_listeners:
+                        try:
+                            listener(version + 1, changes)
+                        except Exception as e:
+                            self.logger.error(f"Ошибка получателя изменений статусов: {e}")
+
+    def status_snapshot(self) -> Tuple[int, Dict[str, str]]:
+        """Текущая версия и статусы всех процессов (таблица не изменяется, копировать не нужно)."""
+        return self._status_snapshot
+
+    def add_status_listener(self, listener: Callable[[int, Dict[str, str]], None]) -> None:
+        """
+        Регистрирует получателя изменений статусов (например NetworkModule.publish_status).
+
+        Вызывается из потока, изменившего статус, с новой версией и словарем
+        изменившихся статусов; не должен блокироваться.
+        """
+        self._status_listeners.append(listener)
+
+    def refresh_status(self) -> None:
+        """Пересчитывает всю таблицу статусов (например, изменились скрипты в processes/)."""
+        self._update_status()
+
+    def _compute_status(self, name: str) -> str:
+        """Статус процесса по текущему состоянию (вызывается только из _update_status)."""
+
+        process = self.processes.get(name)
+        if process is None:
+            policy = self.restart_policies.get(name)
+            if name in self._restart_pending:
+                return "Restarting"
+            if policy is not None and policy.tripped:
+                return "CrashLoop"
+            if self.exit_codes.get(name, 0) != 0:
+                return "Crashed"
+            if self.config_manager.get_process_schema(name).enable:
                 if os.path.exists(f"processes/{name}.py"):
                     return "Stopped"
                 else:
                     return "None"
             else:
                 return "Disabled"
-                
-        process = self.processes[name]
+
         return "Running" if process.poll() is None else "Stopped"
 
     def list_processes(self) -> Dict[str, str]:
@@ -246,4 +1174,4 @@ class ProcessManager:
     
     def list_all_processes_statuses(self) -> Dict[str, str]:
         """Возвращает словарь всех процессов из конфигурации и их статусов."""
-        return {name: self.get_process_status(name) for name in self.all_processes}
+        return dict(self._status_snapshot[1])
@@ -0,0 +1,196 @@
+"""
+Ограничения ресурсов и привязка дочерних процессов к ядрам (ключи секции [process:*]).
+
+    cpu_affinity = 2,3        ядра, на которых выполняется процесс (допустимы диапазоны 2-3)
+    nice = -5                 приоритет планировщика SCHED_OTHER (-20 ... 19)
+    rt_priority = 50          SCHED_FIFO с этим приоритетом (1 ... 99), если разрешено
+    memory_limit = 512M       предел виртуальной памяти (RLIMIT_AS), суффиксы K/M/G
+    io_class = best-effort:2  класс ввода-вывода: realtime[:0-7], best-effort[:0-7], idle
+
+Значения применяются супервизором по PID сразу после запуска процесса
+(Popen или zygote): preexec_fn небезопасен в многопоточном супервизоре.
+Процесс в этот момент только загружает интерпретатор, а потоки, которые
+он создаст позже, наследуют значения. Если значение применить нельзя
+(например нет прав на SCHED_FIFO), процесс продолжает работать,
+а ProcessManager сообщает о расхождении; фактические значения читаются
+системными вызовами по PID процесса.
+"""
+import os
+import platform
+import resource
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+# Номера системных вызовов ioprio_set / ioprio_get
+IOPRIO_SYSCALLS = {
+    "x86_64": (251, 252),
+    "aarch64": (30, 31),
+    "armv7l": (314, 315),
+    "armv6l": (314, 315),
+    "i686": (289, 290),
+}
+
+
+def parse_cpus(value: str) -> Set[int]:
+    """Список ядер "0,2-3" -> {0, 2, 3}."""
+    cpus = set()
+    for part in str(value).replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    if not cpus:
+        raise ValueError(f"пустой список ядер '{value}'")
+    return cpus
+
+
+def format_cpus(cpus) -> str:
+    """{0, 2, 3} -> "0,2-3"."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def parse_size(value: str) -> int:
+    """Размер "512M" -> байты."""
+    text = str(value).strip().upper().rstrip("B")
+    multiplier = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def parse_io_class(value: str) -> Tuple[int, int]:
+    """Класс ввода-вывода "best-effort:2" -> (класс, уровень)."""
+    name, _, level = str(value).lower().partition(":")
+    if name not in IO_CLASSES:
+        raise ValueError(f"неизвестный класс ввода-вывода '{name}' (допустимо: {', '.join(IO_CLASSES)})")
+    level = int(level) if level else 4
+    if not 0 <= level <= 7:
+        raise ValueError(f"уровень ввода-вывода {level} вне диапазона 0-7")
+    return IO_CLASSES[name], 0 if name == "idle" else level
+
+
+def _ioprio_syscall(index: int):
+    numbers = IOPRIO_SYSCALLS.get(platform.machine())
+    if numbers is None:
+        return None
+    import ctypes
+    syscall = ctypes.CDLL(None, use_errno=True).syscall
+    number = numbers[index]
+    return lambda *args: syscall(number, *args)
+
+
+class ResourceLimits:
+    KEYS = ("cpu_affinity", "nice", "rt_priority", "memory_limit", "io_class")
+
+    def __init__(self, cpus: Optional[Set[int]] = None, nice: Optional[int] = None,
+                 rt_priority: Optional[int] = None, memory_limit: Optional[int] = None,
+                 io_class: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            cpus: Ядра процесса
+            nice: Приоритет SCHED_OTHER
+            rt_priority: Приоритет SCHED_FIFO
+            memory_limit: Предел виртуальной памяти, байт
+            io_class: Класс и уровень ввода-вывода
+        """
+        if rt_priority is not None and not 1 <= rt_priority <= 99:
+            raise ValueError(f"rt_priority {rt_priority} вне диапазона 1-99")
+        if nice is not None and not -20 <= nice <= 19:
+            raise ValueError(f"nice {nice} вне диапазона -20..19")
+        self.cpus = cpus
+        self.nice = nice
+        self.rt_priority = rt_priority
+        self.memory_limit = memory_limit
+        self.io_class = io_class
+        # Функция системного вызова готовится один раз при разборе конфигурации
+        self._ioprio_set = _ioprio_syscall(0) if io_class is not None else None
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in (self.cpus, self.nice, self.rt_priority,
+                                                   self.memory_limit, self.io_class))
+
+    def apply(self, pid: int) -> None:
+        """
+        Применяет ограничения к процессу pid; недоступные пропускаются
+        (расхождения сообщает mismatches).
+        """
+        if self.cpus is not None:
+            try:
+                os.sched_setaffinity(pid, self.cpus)
+            except OSError:
+                pass
+        if self.nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, self.nice)
+            except OSError:
+                pass
+        if self.rt_priority is not None:
+            try:
+                os.sched_setscheduler(pid, os.SCHED_FIFO, os.sched_param(self.rt_priority))
+            except OSError:
+                pass
+        if self.memory_limit is not None:
+            try:
+                resource.prlimit(pid, resource.RLIMIT_AS, (self.memory_limit, self.memory_limit))
+            except (OSError, ValueError):
+                pass
+        if self._ioprio_set is not None:
+            io_class, level = self.io_class
+            self._ioprio_set(IOPRIO_WHO_PROCESS, pid, (io_class << IOPRIO_CLASS_SHIFT) | level)
+
+    @staticmethod
+    def effective(pid: int) -> Dict[str, Any]:
+        """Фактические значения для процесса pid (пустой словарь, если процесса уже нет)."""
+        values: Dict[str, Any] = {}
+        try:
+            values["cpus"] = set(os.sched_getaffinity(pid))
+            values["nice"] = os.getpriority(os.PRIO_PROCESS, pid)
+            policy = os.sched_getscheduler(pid)
+            values["rt_priority"] = os.sched_getparam(pid).sched_priority if policy == os.SCHED_FIFO else None
+            values["memory_limit"] = resource.prlimit(pid, resource.RLIMIT_AS)[0]
+        except OSError:
+            return {}
+        ioprio_get = _ioprio_syscall(1)
+        value = ioprio_get(IOPRIO_WHO_PROCESS, pid) if ioprio_get is not None else -1
+        values["io_class"] = (value >> IOPRIO_CLASS_SHIFT, value & 0x7) if value >= 0 else None
+        return values
+
+    def mismatches(self, pid: int) -> List[str]:
+        """Заданные значения, которые не совпадают с фактическими."""
+        actual = self.effective(pid)
+        if not actual:
+            return []
+        expected = {"cpus": self.cpus, "nice": self.nice, "rt_priority": self.rt_priority,
+                    "memory_limit": self.memory_limit, "io_class": self.io_class}
+        return [key for key, value in expected.items() if value is not None and actual.get(key) != value]
+
+    @staticmethod
+    def describe(pid: int) -> str:
+        """Строка фактических значений для команды status."""
+        actual = ResourceLimits.effective(pid)
+        if not actual:
+            return "ресурсы: недоступны"
+        memory = actual["memory_limit"]
+        memory = "без ограничения" if memory == resource.RLIM_INFINITY else f"{memory / (1 << 20):g} МБ"
+        scheduler = f"SCHED_FIFO {actual['rt_priority']}" if actual["rt_priority"] is not None else "SCHED_OTHER"
+        io_names = {value: name for name, value in IO_CLASSES.items()}
+        io_class = actual["io_class"]
+        if io_class is None:
+            io = "неизвестно"
+        elif io_class[0] == 0:
+            io = "по умолчанию"
+        else:
+            io = f"{io_names.get(io_class[0], io_class[0])}:{io_class[1]}"
+        return (f"ресурсы: ядра {format_cpus(actual['cpus'])}, nice {actual['nice']}, {scheduler}, "
+                f"память {memory}, ввод-вывод {io}")
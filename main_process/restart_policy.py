@@ -0,0 +1,104 @@
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class RestartPolicy:
+    """
+    Политика автоматического перезапуска процесса (ключи секции [process:*]).
+
+    restart = always      - перезапускать после любого завершения
+    restart = on-failure  - только после аварийного (код != 0)
+    restart = never       - не перезапускать (по умолчанию)
+
+    Задержка перед перезапуском начинается с restart_delay и удваивается
+    после каждого сбоя до restart_max_delay; если процесс проработал дольше
+    restart_window, задержка сбрасывается. Если за restart_window секунд
+    процесс завершился больше restart_limit раз, срабатывает защита от
+    циклических падений: автоматический перезапуск отключается до ручной
+    команды start.
+    """
+
+    MODES = ("always", "on-failure", "never")
+
+    def __init__(self, mode: str = "never", delay: float = 0.5, max_delay: float = 30.0,
+                 limit: int = 5, window: float = 60.0):
+        """
+        Args:
+            mode: Режим перезапуска (always, on-failure, never)
+            delay: Начальная задержка перед перезапуском, секунд
+            max_delay: Наибольшая задержка, секунд
+            limit: Сколько перезапусков допускается за window секунд
+            window: Окно подсчета сбоев, секунд
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим перезапуска '{mode}' (допустимо: {', '.join(self.MODES)})")
+        self.mode = mode
+        self.initial_delay = delay
+        self.max_delay = max_delay
+        self.limit = limit
+        self.window = window
+
+        self.delay = delay
+        self.restarts = 0
+        self.last_code: Optional[int] = None
+        self.tripped = False
+        self.started_at: Optional[float] = None
+        self._exits = deque()
+
+    @classmethod
+    def from_config(cls, process_config: Dict[str, Any]) -> 'RestartPolicy':
+        return cls(
+            mode=str(process_config.get("restart", "never")).lower(),
+            delay=float(process_config.get("restart_delay", 0.5)),
+            max_delay=float(process_config.get("restart_max_delay", 30.0)),
+            limit=int(process_config.get("restart_limit", 5)),
+            window=float(process_config.get("restart_window", 60.0)),
+        )
+
+    def started(self, now: float) -> None:
+        self.started_at = now
+
+    def on_exit(self, returncode: Optional[int], now: float) -> Optional[float]:
+        """
+        Учитывает завершение процесса (None - процесс не удалось запустить).
+
+        Returns:
+            Задержка перед перезапуском в секундах или None, если перезапускать не нужно
+        """
+        self.last_code = returncode
+        if self.mode == "never" or (self.mode == "on-failure" and returncode == 0):
+            return None
+
+        if self.started_at is not None and now - self.started_at >= self.window:
+            # Процесс работал устойчиво: отсчет задержки начинается заново
+            self.delay = self.initial_delay
+        self.started_at = None
+
+        self._exits.append(now)
+        while self._exits and now - self._exits[0] > self.window:
+            self._exits.popleft()
+        if len(self._exits) > self.limit:
+            self.tripped = True
+            return None
+
+        delay = self.delay
+        self.delay = min(self.delay * 2, self.max_delay)
+        return delay
+
+    def reset(self) -> None:
+        """Сбрасывает защиту от циклических падений и задержку (ручной запуск)."""
+        self.tripped = False
+        self.delay = self.initial_delay
+        self._exits.clear()
+
+    def status(self) -> str:
+        line = f"перезапуск {self.mode}, перезапусков {self.restarts}"
+        if self.last_code is not None:
+            line += f", последний код {self.last_code}"
+        if self._exits:
+            line += f", сбоев за {self.window:g} с: {len(self._exits)}"
+        if self.tripped:
+            line += ", автоперезапуск отключен (циклические падения, нужен start)"
+        elif self.mode != "never":
+            line += f", следующая задержка {self.delay:g} с"
+        return line
@@ -0,0 +1,142 @@
+import asyncio
+import signal
+import logging
+from typing import Optional
+
+
+class Supervisor:
+    """
+    Событийный цикл супервизора.
+
+    Вместо активного ожидания блокируется на реальных событиях: сигналах
+    завершения (SIGINT/SIGTERM), завершении дочерних процессов (SIGCHLD)
+    и готовности UDP-сокета NetworkModule. Все события обрабатываются
+    в одном цикле asyncio; перезапуски по политике restart выполняются
+    таймерами этого же цикла. Если передан ConfigWatcher, запись файла
+    конфигурации тоже событие цикла: через reload_delay секунд после
+    последнего изменения конфигурация перезагружается в потоке исполнителя
+    (остановка процессов может занять секунды). ScriptsWatcher каталога
+    processes/ обновляет таблицу статусов процессов при появлении или
+    удалении скриптов. Federation обменивается gossip с другими узлами
+    таймерами этого же цикла.
+    """
+
+    STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+    def __init__(self, process_manager, network_module=None, logger=None, config_watcher=None,
+                 reload_delay: float = 0.5, scripts_watcher=None, federation=None):
+        """
+        Args:
+            process_manager: ProcessManager, дочерние процессы которого нужно отслеживать
+            network_module: NetworkModule, сокет которого обслуживается в этом же цикле
+            logger: Логгер для записи сообщений
+            config_watcher: ConfigWatcher файла конфигурации (открытый) или None
+            reload_delay: Пауза после изменения файла перед перезагрузкой, секунд
+            scripts_watcher: ScriptsWatcher каталога процессов (открытый) или None
+            federation: Federation узлов (требует network_module) или None
+        """
+        self.process_manager = process_manager
+        self.network_module = network_module
+        self.config_watcher = config_watcher
+        self.reload_delay = reload_delay
+        self.scripts_watcher = scripts_watcher
+        self.federation = federation
+        self._reload_timer: Optional[asyncio.TimerHandle] = None
+        self.logger = logger or logging.getLogger('supervisor')
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def run(self) -> None:
+        """Запускает цикл супервизора и блокируется до получения сигнала остановки."""
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """Корутина основного цикла: регистрирует источники событий и ждет остановки."""
+        self.loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        for sig in self.STOP_SIGNALS:
+            self.loop.add_signal_handler(sig, self.request_stop, sig)
+        self.loop.add_signal_handler(signal.SIGCHLD, self._on_sigchld)
+
+        if self.network_module is not None:
+            await self.network_module.start_async()
+            if self.federation is not None:
+                self.federation.start(self.network_module)
+        if self.config_watcher is not None:
+            self.loop.add_reader(self.config_watcher.fileno(), self._on_config_event)
+        if self.scripts_watcher is not None:
+            self.loop.add_reader(self.scripts_watcher.fileno(), self._on_scripts_event)
+
+        # Процессы могли завершиться до установки обработчика SIGCHLD
+        self._on_sigchld()
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            if self.federation is not None:
+                self.federation.stop()
+            if self.network_module is not None:
+                self.network_module.stop()
+            if self.config_watcher is not None:
+                self.loop.remove_reader(self.config_watcher.fileno())
+            if self.scripts_watcher is not None:
+                self.loop.remove_reader(self.scripts_watcher.fileno())
+            if self._reload_timer is not None:
+                self._reload_timer.cancel()
+            for sig in self.STOP_SIGNALS + (signal.SIGCHLD,):
+                self.loop.remove_signal_handler(sig)
+
+    def request_stop(self, sig: Optional[int] = None) -> None:
+        """Запрашивает остановку цикла супервизора."""
+        if sig is not None:
+            self.logger.info(f"Получен сигнал {signal.Signals(sig).name}, остановка системы...")
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def _on_sigchld(self) -> None:
+        """Забирает завершившиеся дочерние процессы сразу после SIGCHLD и планирует их перезапуск."""
+        for name, returncode in self.process_manager.reap_children():
+            self.logger.debug(f"Обработано завершение процесса '{name}' (код: {returncode})")
+            self._plan_in_executor(self.process_manager.plan_restart, name, returncode)
+
+    def _plan_in_executor(self, method, *args) -> None:
+        """
+        Планирование и перезапуск блокируют (остановка пула, ожидание готовности
+        процесса), поэтому выполняются в потоке исполнителя, как команды NetworkModule:
+        цикл продолжает обрабатывать сигналы и датаграммы.
+        """
+        self.loop.run_in_executor(None, method, *args).add_done_callback(self._on_plan)
+
+    def _on_plan(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.logger.error(f"Ошибка перезапуска процесса: {future.exception()}")
+            return
+        plan = future.result()
+        if plan is not None and not self._stop_event.is_set():
+            name, delay = plan
+            self.loop.call_later(delay, self._restart, name)
+
+    def _restart(self, name: str) -> None:
+        """Перезапускает процесс по таймеру; при неудаче планирует следующую попытку."""
+        self._plan_in_executor(self.process_manager.restart_process, name)
+
+    def _on_config_event(self) -> None:
+        """Файл конфигурации изменился: перезагрузка откладывается, пока редактор не закончит запись."""
+        if not self.config_watcher.changed():
+            return
+        if self._reload_timer is not None:
+            self._reload_timer.cancel()
+        self._reload_timer = self.loop.call_later(self.reload_delay, self._reload)
+
+    def _reload(self) -> None:
+        self._reload_timer = None
+        self.logger.info("Файл конфигурации изменен, перезагрузка")
+        self.loop.run_in_executor(None, self.process_manager.reload_config)
+
+    def _on_scripts_event(self) -> None:
+        """Скрипты процессов добавлены или удалены: пересчитываются статусы."""
+        if self.scripts_watcher.changed():
+            self.process_manager.refresh_status()
@@ -0,0 +1,157 @@
+"""
+Телеметрия дочерних процессов из /proc.
+
+Фоновый поток раз в interval секунд читает для каждого запущенного
+процесса /proc/<pid>/stat, statm, io, status и число открытых дескрипторов
+(/proc/<pid>/fd) и сохраняет последнюю выборку и историю за history_seconds
+в кольцевом буфере. Команды status и metrics читают только эти кэши
+и никогда не обращаются к /proc сами.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Поля выборки (в истории хранятся кортежами в этом порядке)
+FIELDS = ("t", "cpu", "rss", "threads", "fds", "read_bytes", "write_bytes", "ctx_voluntary", "ctx_involuntary")
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def read_proc(pid: int) -> Optional[Dict[str, int]]:
+    """
+    Счетчики процесса из /proc (None, если процесса уже нет).
+
+    Returns:
+        Словарь: ticks (utime + stime), rss (байт), threads, fds, read_bytes,
+        write_bytes, ctx_voluntary, ctx_involuntary
+    """
+    base = f"/proc/{pid}"
+    try:
+        with open(f"{base}/stat", "rb") as f:
+            # Имя процесса в скобках может содержать пробелы: поля считаются после ')'
+            fields = f.read().rsplit(b")", 1)[1].split()
+        with open(f"{base}/statm", "rb") as f:
+            rss_pages = int(f.read().split()[1])
+        counters = {
+            "ticks": int(fields[11]) + int(fields[12]),
+            "rss": rss_pages * PAGE_SIZE,
+            "threads": int(fields[17]),
+            "read_bytes": -1,
+            "write_bytes": -1,
+            "ctx_voluntary": -1,
+            "ctx_involuntary": -1,
+        }
+        with open(f"{base}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"voluntary_ctxt_switches:"):
+                    counters["ctx_voluntary"] = int(line.split()[1])
+                elif line.startswith(b"nonvoluntary_ctxt_switches:"):
+                    counters["ctx_involuntary"] = int(line.split()[1])
+        try:
+            with open(f"{base}/io", "rb") as f:
+                for line in f:
+                    key, _, value = line.partition(b":")
+                    if key in (b"read_bytes", b"write_bytes"):
+                        counters[key.decode()] = int(value)
+        except PermissionError:
+            # /proc/<pid>/io недоступен без прав ptrace на процесс
+            pass
+        counters["fds"] = len(os.listdir(f"{base}/fd"))
+    except (FileNotFoundError, ProcessLookupError, IndexError, ValueError):
+        return None
+    return counters
+
+
+class ProcessTelemetry:
+    def __init__(self, pids: Callable[[], Dict[str, int]], interval: float = 1.0,
+                 history_seconds: float = 600.0, logger=None):
+        """
+        Args:
+            pids: Функция, возвращающая запущенные процессы (имя -> PID)
+            interval: Период выборки, секунд
+            history_seconds: Глубина истории, секунд
+            logger: Логгер для записи сообщений
+        """
+        self.pids = pids
+        self.interval = interval
+        self.history_seconds = history_seconds
+        self.logger = logger
+        self._latest: Dict[str, Dict] = {}
+        self._history: Dict[str, deque] = {}
+        # Предыдущая выборка для расчета загрузки CPU: имя -> (PID, тики, время)
+        self._previous: Dict[str, tuple] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Ошибка сбора телеметрии: {e}", exc_info=True)
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def sample(self) -> None:
+        """Одна выборка по всем запущенным процессам (выполняется фоновым потоком)."""
+        latest: Dict[str, Dict] = {}
+        capacity = max(1, int(self.history_seconds / self.interval))
+        for name, pid in self.pids().items():
+            now = time.monotonic()
+            counters = read_proc(pid)
+            if counters is None:
+                continue
+            previous = self._previous.get(name)
+            cpu = 0.0
+            if previous is not None and previous[0] == pid and now > previous[2]:
+                cpu = (counters["ticks"] - previous[1]) / CLOCK_TICKS / (now - previous[2]) * 100
+            self._previous[name] = (pid, counters["ticks"], now)
+
+            values = (round(time.time(), 3), round(cpu, 1), counters["rss"], counters["threads"], counters["fds"],
+                      counters["read_bytes"], counters["write_bytes"],
+                      counters["ctx_voluntary"], counters["ctx_involuntary"])
+            entry = dict(zip(FIELDS, values))
+            entry["pid"] = pid
+            latest[name] = entry
+            history = self._history.get(name)
+            if history is None or history.maxlen != capacity:
+                history = self._history[name] = deque(history or (), maxlen=capacity)
+            history.append(values)
+
+        for name in list(self._previous):
+            if name not in latest:
+                del self._previous[name]
+        # Замена словаря целиком: читатели видят либо прежнюю, либо новую выборку
+        self._latest = latest
+
+    def latest(self, name: Optional[str] = None):
+        """Последняя выборка процесса (или всех процессов, если name не задан)."""
+        if name is None:
+            return self._latest
+        return self._latest.get(name)
+
+    def history(self, name: str, seconds: Optional[float] = None) -> Dict[str, List]:
+        """История процесса по столбцам FIELDS (за последние seconds секунд или вся)."""
+        rows = list(self._history.get(name, ()))
+        if seconds is not None and rows:
+            since = time.time() - seconds
+            rows = [row for row in rows if row[0] >= since]
+        return {field: [row[index] for row in rows] for index, field in enumerate(FIELDS)}
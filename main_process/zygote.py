@@ -0,0 +1,288 @@
+"""
+Предзапущенный интерпретатор (zygote) для быстрого запуска дочерних процессов.
+
+Запуск `python processes/<name>.py` каждый раз загружает интерпретатор
+и заново импортирует NumPy и модули проекта. Zygote запускается один раз,
+заранее импортирует тяжелые модули (preload) и по запросу ProcessManager
+порождает fork'ом процесс, в котором выполняется скрипт с переданными
+аргументами командной строки, окружением и рабочим каталогом.
+
+Процесс порождается двойным fork: промежуточный процесс сразу завершается,
+и скрипт переходит к ProcessManager, который объявлен subreaper'ом
+(prctl PR_SET_CHILD_SUBREAPER). Поэтому ProcessManager получает SIGCHLD
+и код возврата так же, как для процессов, запущенных через Popen.
+
+Протокол - сообщения SOCK_SEQPACKET в JSON; дескрипторы (например канал
+готовности, каналы stdout и stderr) передаются через SCM_RIGHTS.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+MAX_MESSAGE = 1 << 20
+PR_SET_CHILD_SUBREAPER = 36
+
+
+def set_child_subreaper() -> bool:
+    """Делает текущий процесс subreaper'ом: осиротевшие потомки переходят к нему, а не к init."""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+class ZygoteChild:
+    """Процесс, порожденный zygote; повторяет нужную ProcessManager часть интерфейса subprocess.Popen."""
+
+    def __init__(self, pid: int, args: List[str]):
+        self.pid = pid
+        self.args = args
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            try:
+                pid, status = os.waitpid(self.pid, os.WNOHANG)
+            except ChildProcessError:
+                # Процесс уже забран (не должно происходить, если ProcessManager - subreaper)
+                self.returncode = 0
+                return self.returncode
+            if pid:
+                self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(0.005)
+        return self.returncode
+
+    def send_signal(self, sig: int) -> None:
+        if self.poll() is None:
+            os.kill(self.pid, sig)
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+class ZygoteClient:
+    """Сторона ProcessManager: запускает zygote и передает ему запросы на запуск скриптов."""
+
+    def __init__(self, preload: List[str], logger=None, start_timeout: float = 30.0):
+        """
+        Args:
+            preload: Модули, импортируемые в zygote заранее (например ['numpy', 'utils.ring_buffer'])
+            logger: Логгер для записи сообщений
+            start_timeout: Сколько ждать готовности zygote после запуска, секунд
+        """
+        self.preload = preload
+        self.logger = logger
+        self.start_timeout = start_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._socket: Optional[socket.socket] = None
+        # Запрос и ответ идут по одному сокету: параллельные start не должны получать чужие PID
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Запускает zygote и ждет окончания предварительного импорта."""
+        if not set_child_subreaper():
+            raise OSError("не удалось установить PR_SET_CHILD_SUBREAPER")
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+        command = ["python", "-m", "main_process.zygote", "--fd", str(theirs.fileno()),
+                   "--preload", ",".join(self.preload)]
+        try:
+            self.process = subprocess.Popen(command, env=env, pass_fds=(theirs.fileno(),))
+        finally:
+            theirs.close()
+        self._socket = ours
+        ours.settimeout(self.start_timeout)
+        try:
+            reply = json.loads(ours.recv(MAX_MESSAGE) or b"{}")
+        except (OSError, ValueError) as e:
+            self.stop()
+            raise OSError(f"zygote не ответил: {e}")
+        finally:
+            if self._socket is not None:
+                self._socket.settimeout(None)
+        if "ready" not in reply:
+            self.stop()
+            raise OSError("zygote завершился при запуске")
+        if self.logger:
+            self.logger.info(f"Zygote запущен (PID: {self.process.pid}), модули: {', '.join(reply['ready']) or 'нет'}")
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def spawn(self, command: List[str], env: Dict[str, str], fds: Optional[Dict[str, int]] = None,
+              stdio: Optional[Tuple[int, int]] = None) -> ZygoteChild:
+        """
+        Запускает скрипт в процессе, порожденном от zygote.
+
+        Args:
+            command: Команда как для Popen: ["python", скрипт, аргументы...]
+            env: Окружение процесса
+            fds: Дескрипторы для процесса: имя переменной окружения -> дескриптор;
+                 процесс получает их копии и номера в этих переменных
+            stdio: Дескрипторы, которые станут stdout и stderr процесса
+        """
+        fds = fds or {}
+        request = {"argv": command[1:], "env": env, "cwd": os.getcwd(), "fds": list(fds),
+                   "stdio": stdio is not None}
+        with self._lock:
+            socket.send_fds(self._socket, [json.dumps(request).encode("utf-8")],
+                            list(fds.values()) + list(stdio or ()))
+            reply = json.loads(self._socket.recv(MAX_MESSAGE) or b"{}")
+        if "pid" not in reply:
+            raise OSError(reply.get("error", "zygote завершился"))
+        return ZygoteChild(reply["pid"], command)
+
+    def stop(self) -> None:
+        """Останавливает zygote (запущенные им процессы продолжают работать)."""
+        with self._lock:
+            if self._socket is not None:
+                # Закрытие сокета - сигнал zygote завершиться
+                self._socket.close()
+                self._socket = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+
+def _run_child(request: dict, fds: List[int]) -> None:
+    """Выполняет скрипт в порожденном процессе как `python <скрипт> <аргументы>` и завершает процесс."""
+    import runpy
+    import traceback
+
+    code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        for name, fd in zip(request["fds"], fds):
+            os.environ[name] = str(fd)
+        if request.get("stdio"):
+            stdout_fd, stderr_fd = fds[len(request["fds"]):][:2]
+            os.dup2(stdout_fd, 1)
+            os.dup2(stderr_fd, 2)
+            # Вывод в канал, как у Popen с PYTHONUNBUFFERED: строки доходят до журнала сразу
+            sys.stdout.reconfigure(line_buffering=True)
+            sys.stderr.reconfigure(line_buffering=True)
+        # Глобальный генератор NumPy после fork одинаков во всех процессах (random пересеивается сам)
+        if "numpy.random" in sys.modules:
+            sys.modules["numpy.random"].seed()
+        script = request["argv"][0]
+        sys.argv = list(request["argv"])
+        sys.path[0] = os.path.dirname(os.path.abspath(script))
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _spawn(request: dict, fds: List[int], control: socket.socket) -> int:
+    """Двойной fork: возвращает PID процесса скрипта, который после выхода промежуточного процесса переходит к subreaper."""
+    pid_read, pid_write = os.pipe()
+    intermediate = os.fork()
+    if intermediate == 0:
+        try:
+            os.close(pid_read)
+            pid = os.fork()
+            if pid == 0:
+                os.close(pid_write)
+                control.close()
+                _run_child(request, fds)
+            os.write(pid_write, str(pid).encode())
+        finally:
+            os._exit(0)
+
+    os.close(pid_write)
+    try:
+        pid = int(os.read(pid_read, 32) or 0)
+    finally:
+        os.close(pid_read)
+        os.waitpid(intermediate, 0)
+    if not pid:
+        raise OSError("не удалось породить процесс")
+    return pid
+
+
+def serve(control: socket.socket, preload: List[str]) -> None:
+    """Цикл zygote: импортирует модули preload и обслуживает запросы до закрытия сокета."""
+    import gc
+    import importlib
+
+    loaded = []
+    for module in preload:
+        try:
+            importlib.import_module(module)
+            loaded.append(module)
+        except Exception as e:
+            print(f"Zygote: не удалось импортировать {module}: {e}", file=sys.stderr)
+    # resource_tracker (разделяемая память кольцевых буферов) запускается один раз
+    # и наследуется порожденными процессами, а не запускается в каждом из них
+    if "multiprocessing.resource_tracker" in sys.modules:
+        sys.modules["multiprocessing.resource_tracker"].ensure_running()
+    # Объекты, созданные при импорте, не трогает сборщик мусора - страницы остаются общими после fork
+    gc.freeze()
+    control.send(json.dumps({"ready": loaded}).encode("utf-8"))
+
+    while True:
+        message, fds, _, _ = socket.recv_fds(control, MAX_MESSAGE, 16)
+        if not message:
+            break
+        try:
+            reply = {"pid": _spawn(json.loads(message), fds, control)}
+        except Exception as e:
+            reply = {"error": str(e)}
+        finally:
+            for fd in fds:
+                os.close(fd)
+        control.send(json.dumps(reply).encode("utf-8"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fd", type=int, required=True, help="Управляющий сокет от ProcessManager")
+    parser.add_argument("--preload", type=str, default="", help="Модули для предварительного импорта через запятую")
+    args = parser.parse_args()
+
+    # Ctrl+C в терминале обрабатывает ProcessManager; zygote завершается, когда закрыт сокет
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    serve(socket.socket(fileno=args.fd), [name.strip() for name in args.preload.split(",") if name.strip()])
@@ -0,0 +1,63 @@
+import argparse
+
+from utils.dsp_image import DspImage
+from utils.dsp_shadow import RegisterShadow, apply_delta, apply_overrides, default_records, load_overrides, words_of
+from utils.i2c import ADAU1761, FakeSMBus
+from utils.ready import notify_ready
+
+if __name__ == "__main__":
+    # Парсим аргументы командной строки (лишние параметры конфигурации игнорируются)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--i2c_bus", type=int, default=5)
+    parser.add_argument("--i2c_address", type=lambda value: int(value, 0), default=0x38)
+    parser.add_argument("--shadow", type=str, default="/data/dsp/shadow.json", help="Файл теневой копии регистров")
+    parser.add_argument("--image", type=str, default=None,
+                        help="Образ конфигурации DSP (python -m utils.dsp_image convert), иначе default_download")
+    parser.add_argument("--params", type=str, default=None, help="Файл подстройки регистров и параметров")
+    parser.add_argument("--readback", type=str, default="false",
+                        help="Прочитать состояние из микросхемы вместо сохраненной копии (true/false)")
+    parser.add_argument("--safeload", type=str, default="true", help="Параметры работающего DSP через safeload")
+    parser.add_argument("--fake_bus", type=str, default="false", help="Программная модель шины вместо /dev/i2c")
+    args, _ = parser.parse_known_args()
+
+    image = None
+    try:
+        bus = FakeSMBus() if args.fake_bus.lower() == "true" else None
+        programmer = ADAU1761(i2c_bus=args.i2c_bus, i2c_address=args.i2c_address, bus=bus)
+
+        if args.image:
+            image = DspImage(args.image)
+            records = image.records()
+        else:
+            records = default_records()
+        if args.params:
+            records = apply_overrides(records, load_overrides(args.params))
+
+        shadow = RegisterShadow.load(args.shadow)
+        if args.readback.lower() == "true":
+            shadow.read_from_chip(programmer, words_of(records).keys())
+
+        stats = apply_delta(programmer, shadow, records, use_safeload=args.safeload.lower() == "true")
+        if image is not None and not image.check_crc(programmer) and not stats["full"]:
+            # Теневая копия не соответствует микросхеме (например после сброса питания) - полная загрузка
+            print("DSP: CRC в регистрах R16 не совпадает с образом, выполняется полная загрузка")
+            shadow.words.clear()
+            stats = apply_delta(programmer, shadow, records, use_safeload=args.safeload.lower() == "true")
+        if image is not None and not image.check_crc(programmer):
+            raise RuntimeError("CRC программы в регистрах R16 не совпадает с образом")
+        shadow.save()
+        # Зависящие от DSP процессы запускаются после его настройки
+        notify_ready()
+        if stats["full"]:
+            print(f"DSP: полная загрузка, слов {stats['words']}")
+        else:
+            print(f"DSP: изменено слов {stats['changed']} из {stats['words']}, "
+                  f"блоков {stats['blocks']}, safeload {stats['safeloads']}")
+    except Exception as e:
+        print(f"Ошибка: {e}")
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        print("Программа остановлена пользователем")
+    finally:
+        if image is not None:
+            image.close()
@@ -0,0 +1,170 @@
+import argparse
+import signal
+import time
+
+import numpy as np
+
+from utils.ready import notify_ready
+from utils.ring_buffer import RingBuffer
+from utils.spectrum_store import SpectrumWriter, frame_timestamps
+from utils.stft import ReorderBuffer, StreamingSTFT, StripedSTFT, parse_frequency_range
+
+running = True
+
+
+def on_terminate(signum, frame):
+    global running
+    running = False
+
+
+def stft_options(args, channels):
+    return dict(
+        window_size=args.window_size,
+        overlap=args.overlap,
+        sample_rate=args.sampling_rate,
+        frequency_range=parse_frequency_range(args.frequency_range),
+        channels=channels,
+    )
+
+
+def open_store(args, stft, channels):
+    """Хранилище спектров в output_dir с сегментами по segment_mb / segment_seconds."""
+    writer = SpectrumWriter(
+        args.output_dir,
+        bins=stft.bins,
+        channels=channels,
+        segment_bytes=int(args.segment_mb * 1024 * 1024),
+        segment_seconds=args.segment_seconds,
+        max_files=args.max_files,
+        frequency_start=float(stft.frequencies[0]) if stft.bins else 0.0,
+        frequency_step=stft.sample_rate / stft.window_size,
+    )
+    hop_ns = int(stft.hop * 1e9 / stft.sample_rate)
+    return writer, hop_ns
+
+
+def store(writer, hop_ns, spectra):
+    writer.append(spectra, frame_timestamps(len(spectra), hop_ns))
+
+
+def run_single(args):
+    """Один процесс: читает кольцевой буфер источника и пишет спектры."""
+    ring = RingBuffer.attach(args.ring)
+    try:
+        consumer = ring.consumer(args.ring_consumer)
+        consumer.seek_latest()
+        stft = StreamingSTFT(**stft_options(args, ring.channels))
+        writer, hop_ns = open_store(args, stft, ring.channels)
+        notify_ready()
+        while running:
+            frames = consumer.acquire()
+            if frames is None:
+                time.sleep(args.poll_interval)
+                continue
+            spectra = stft.push(frames.reshape(-1, ring.channels))
+            consumer.release()
+            if len(spectra):
+                store(writer, hop_ns, spectra)
+        writer.close()
+    finally:
+        ring.close()
+
+
+def run_worker(args):
+    """Исполнитель пула: считает свои пачки кадров и пишет их с номером в буфер результатов."""
+    ring = RingBuffer.attach(args.ring)
+    results = RingBuffer.attach(args.result_ring)
+    try:
+        consumer = ring.consumer(args.ring_consumer)
+        consumer.seek_latest()
+        stft = StripedSTFT(**stft_options(args, ring.channels), chunk_frames=args.chunk_frames,
+                           index=args.worker_index, workers=args.workers)
+        notify_ready()
+        while running:
+            frames = consumer.acquire()
+            if frames is None:
+                time.sleep(args.poll_interval)
+                continue
+            # Позиция после acquire() - номер первого полученного кадра (с учетом переполнения)
+            start_index = consumer.position * ring.frame_samples
+            chunks = stft.push(frames.reshape(-1, ring.channels), start_index)
+            consumer.release()
+            for seq, spectra in chunks:
+                slot = results.claim()
+                slot[0, :2].view(np.int64)[0] = seq
+                slot[1:] = spectra.reshape(stft.chunk_frames, -1)
+                results.commit()
+    finally:
+        results.close()
+        ring.close()
+
+
+def run_collector(args):
+    """Сборщик пула: принимает пачки исполнителей и пишет спектры в порядке номеров."""
+    rings = [RingBuffer.attach(spec) for spec in args.result_rings.split(',')]
+    try:
+        consumers = [ring.consumer(0) for ring in rings]
+        reorder = ReorderBuffer(max_pending=len(rings) * 4, warmup=len(rings))
+        # В буфере результатов каналы и бины одного кадра уложены в одну строку
+        geometry = StreamingSTFT(**stft_options(args, 1))
+        writer, hop_ns = open_store(args, geometry, rings[0].channels // geometry.bins)
+        notify_ready()
+        while running:
+            received = False
+            for consumer in consumers:
+                chunks = consumer.acquire()
+                if chunks is None:
+                    continue
+                received = True
+                for chunk in chunks:
+                    reorder.put(int(chunk[0, :2].view(np.int64)[0]), chunk[1:].copy())
+                consumer.release()
+            for _, spectra in reorder.pop_ready():
+                store(writer, hop_ns, spectra)
+            if not received:
+                time.sleep(args.poll_interval)
+        writer.close()
+    finally:
+        for ring in rings:
+            ring.close()
+
+
+if __name__ == "__main__":
+    # Парсим аргументы командной строки (лишние параметры конфигурации игнорируются)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window_size", type=int, default=4096)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    parser.add_argument("--frequency_range", type=str, default=None)
+    parser.add_argument("--sampling_rate", type=float, default=16000)
+    parser.add_argument("--output_dir", type=str, default="/data/fft")
+    parser.add_argument("--ring", type=str, default=None, help="Спецификация кольцевого буфера источника")
+    parser.add_argument("--ring_consumer", type=int, default=0)
+    parser.add_argument("--poll_interval", type=float, default=0.005)
+    parser.add_argument("--max_files", type=int, default=None, help="Сколько последних сегментов хранить")
+    parser.add_argument("--segment_mb", type=float, default=64)
+    parser.add_argument("--segment_seconds", type=float, default=3600)
+    # Режим пула исполнителей (задается ProcessManager при workers > 1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--worker_index", type=int, default=None)
+    parser.add_argument("--chunk_frames", type=int, default=8)
+    parser.add_argument("--result_ring", type=str, default=None, help="Буфер результатов исполнителя")
+    parser.add_argument("--result_rings", type=str, default=None, help="Буферы результатов всех исполнителей (сборщик)")
+    args, _ = parser.parse_known_args()
+
+    signal.signal(signal.SIGTERM, on_terminate)
+
+    try:
+        if args.worker_index is not None:
+            run_worker(args)
+        else:
+            if args.result_rings is None and args.ring is None:
+                parser.error("не задан --ring или --result_rings")
+            if args.result_rings is not None:
+                run_collector(args)
+            else:
+                run_single(args)
+    except Exception as e:
+        print(f"Ошибка: {e}")
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        print("Программа остановлена пользователем")
@@ -0,0 +1,76 @@
+import argparse
+import signal
+import time
+
+from utils.block_writer import WriteBehindWriter
+from utils.ready import notify_ready
+from utils.ring_buffer import RingBuffer
+
+running = True
+
+
+def on_terminate(signum, frame):
+    global running
+    running = False
+
+
+def report(writer, ring_consumer):
+    stats = writer.stats()
+    print(f"str3_saver: {stats['mb_per_s']:.2f} МБ/с (носитель {stats['device_mb_per_s']:.1f} МБ/с), "
+          f"очередь {stats['queue_depth']}, свободных буферов {stats['free_buffers']}, "
+          f"отброшено блоков {stats['dropped_blocks']}, файлов {stats['files']}, "
+          f"отставание от источника {ring_consumer.available()} кадров", flush=True)
+
+
+if __name__ == "__main__":
+    # Парсим аргументы командной строки (лишние параметры конфигурации игнорируются)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output_dir", type=str, default="/data/str3")
+    parser.add_argument("--max_files", type=int, default=None)
+    parser.add_argument("--ring", type=str, required=True, help="Спецификация кольцевого буфера источника")
+    parser.add_argument("--ring_consumer", type=int, default=0)
+    parser.add_argument("--buffer_kb", type=int, default=4096, help="Размер буфера записи")
+    parser.add_argument("--queue_buffers", type=int, default=8, help="Число буферов в очереди записи")
+    parser.add_argument("--file_mb", type=int, default=256, help="Размер файла до перехода к следующему")
+    parser.add_argument("--direct", type=str, default="false", help="Писать с O_DIRECT (true/false)")
+    parser.add_argument("--stats_interval", type=float, default=60.0)
+    parser.add_argument("--poll_interval", type=float, default=0.005)
+    args, _ = parser.parse_known_args()
+
+    signal.signal(signal.SIGTERM, on_terminate)
+
+    ring = RingBuffer.attach(args.ring)
+    consumer = ring.consumer(args.ring_consumer)
+    consumer.seek_latest()
+    writer = WriteBehindWriter(
+        args.output_dir,
+        buffer_bytes=args.buffer_kb * 1024,
+        queue_buffers=args.queue_buffers,
+        file_bytes=args.file_mb * 1024 * 1024,
+        max_files=args.max_files,
+        direct=args.direct.lower() == "true",
+    )
+    notify_ready()
+
+    try:
+        next_report = time.monotonic() + args.stats_interval
+        while running:
+            frames = consumer.acquire()
+            if frames is None:
+                time.sleep(args.poll_interval)
+            else:
+                # Кадры подряд идущих слотов непрерывны в памяти: копируется один блок
+                writer.write(frames)
+                consumer.release()
+            if time.monotonic() >= next_report:
+                report(writer, consumer)
+                next_report += args.stats_interval
+    except Exception as e:
+        print(f"Ошибка: {e}")
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        print("Программа остановлена пользователем")
+    finally:
+        writer.close()
+        report(writer, consumer)
+        ring.close()
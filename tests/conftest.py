@@ -0,0 +1,7 @@
+"""Общие настройки тестов: корень проекта в sys.path (utils, main_process)."""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,117 @@
+"""
+Частичная перезагрузка ADAU1761 (utils/dsp_shadow.py) на модели шины FakeSMBus.
+
+После полной загрузки конфигурации на шину должны уходить только
+изменившиеся слова: параметры при работающем DSP - через safeload,
+программа - при остановленном DSP.
+"""
+import random
+
+import pytest
+
+from utils.dsp_shadow import RegisterShadow, apply_delta, apply_overrides, default_records, is_volatile, words_of
+from utils.i2c import ADAU1761, DSP_RUN_REGISTER, SAFELOAD_DATA, SAFELOAD_TARGET, FakeSMBus
+
+PARAM_WORDS = 64
+PROGRAM_WORDS = 64
+PARAMETER = 0x0020
+PROGRAM = 0x0810
+CONTROL = 0x4019
+
+
+@pytest.fixture
+def records():
+    """default_download с ОЗУ параметров и программы, записанными до запуска DSP."""
+    rng = random.Random(1)
+    records = default_records()
+    params = bytes(rng.randrange(256) for _ in range(PARAM_WORDS * 4))
+    program = bytes(rng.randrange(256) for _ in range(PROGRAM_WORDS * 5))
+    run_index = next(index for index, record in enumerate(records)
+                     if record[0] == "write" and record[1] == DSP_RUN_REGISTER)
+    return records[:run_index] + [("write", 0x0800, program), ("write", 0x0000, params)] + records[run_index:]
+
+
+@pytest.fixture
+def loaded(records):
+    """Шина, программатор и теневая копия после полной загрузки; журнал шины очищен."""
+    bus = FakeSMBus()
+    programmer = ADAU1761(bus=bus)
+    shadow = RegisterShadow()
+    stats = apply_delta(programmer, shadow, records)
+    assert stats["full"] == 1
+    bus.log.clear()
+    return bus, programmer, shadow
+
+
+def changed(records, address, value):
+    return apply_overrides(records, {address: value})
+
+
+def test_unchanged_config_writes_nothing(records, loaded):
+    bus, programmer, shadow = loaded
+    transactions = bus.transactions
+
+    stats = apply_delta(programmer, shadow, records)
+
+    assert stats["changed"] == 0 and stats["blocks"] == 0
+    assert bus.log == []
+    assert bus.transactions == transactions
+
+
+def test_control_register_writes_only_that_register(records, loaded):
+    bus, programmer, shadow = loaded
+    value = bytes([shadow.words[CONTROL][0] ^ 0xFF])
+
+    stats = apply_delta(programmer, shadow, changed(records, CONTROL, value))
+
+    assert stats["changed"] == 1
+    assert bus.log == [(CONTROL, value)]
+
+
+def test_parameter_is_written_through_safeload(records, loaded):
+    bus, programmer, shadow = loaded
+    value = bytes(byte ^ 0xFF for byte in shadow.words[PARAMETER])
+    safeloads = bus.safeloads
+
+    stats = apply_delta(programmer, shadow, changed(records, PARAMETER, value))
+
+    assert stats["changed"] == 1 and stats["safeloads"] == 1
+    assert bus.safeloads == safeloads + 1
+    # Данные, затем одним блоком целевой адрес - 1 и число слов; сам адрес параметра напрямую не пишется
+    assert bus.log == [(SAFELOAD_DATA, value),
+                       (SAFELOAD_TARGET, (PARAMETER - 1).to_bytes(4, "big") + (1).to_bytes(4, "big"))]
+    assert bus.memory[PARAMETER] == value
+
+
+def test_parameter_without_safeload_is_written_directly(records, loaded):
+    bus, programmer, shadow = loaded
+    value = bytes(byte ^ 0xFF for byte in shadow.words[PARAMETER])
+
+    stats = apply_delta(programmer, shadow, changed(records, PARAMETER, value), use_safeload=False)
+
+    assert stats["safeloads"] == 0
+    assert bus.log == [(PARAMETER, value)]
+
+
+def test_program_word_is_written_with_dsp_stopped(records, loaded):
+    bus, programmer, shadow = loaded
+    value = bytes(byte ^ 0xFF for byte in shadow.words[PROGRAM])
+
+    stats = apply_delta(programmer, shadow, changed(records, PROGRAM, value))
+
+    assert stats["changed"] == 1
+    assert bus.log == [(DSP_RUN_REGISTER, b"\x00"), (PROGRAM, value), (DSP_RUN_REGISTER, b"\x01")]
+
+
+def test_readback_shadow_has_no_differences(records, loaded, tmp_path):
+    bus, programmer, shadow = loaded
+    target = words_of(changed(records, PARAMETER, bytes(4)))
+    apply_delta(programmer, shadow, changed(records, PARAMETER, bytes(4)))
+
+    readback = RegisterShadow(path=str(tmp_path / "shadow.json"))
+    readback.read_from_chip(programmer, [address for address in target if not is_volatile(address)])
+
+    assert readback.diff(target) == []
+    assert shadow.diff(target) == []
+    readback.save()
+    assert RegisterShadow.load(readback.path).words == readback.words
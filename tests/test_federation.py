@@ -0,0 +1,151 @@
+"""
+Федерация супервизоров на петлевом интерфейсе (main_process/federation.py).
+
+Три экземпляра main.py запускаются в отдельных рабочих каталогах с общим
+списком [network] hosts, в который входит и собственный адрес каждого
+узла. Проверяются сходимость вида "cluster view", рассылка "cluster
+<команда>" всем узлам и то, что убитый узел помечается недоступным.
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from main_process.fragmentation import receive_message
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NODES = 3
+TIMEOUT = 1.0
+GOSSIP_INTERVAL = 0.2
+PEER_TTL = 1.0
+
+SLEEPER = '''
+import time
+time.sleep(600)
+'''
+
+
+def free_ports(count):
+    sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(count)]
+    try:
+        for sock in sockets:
+            sock.bind(('127.0.0.1', 0))
+        return [sock.getsockname()[1] for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+def request(port, command, timeout=2.0):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.sendto(command.encode('utf-8'), ('127.0.0.1', port))
+        return receive_message(sock, ('127.0.0.1', port), timeout=timeout).decode('utf-8')
+    finally:
+        sock.close()
+
+
+def wait_for(predicate, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return True
+        except socket.timeout:
+            # Узел еще не запустил UDP-сервер
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def start_node(workdir, index, ports):
+    os.makedirs(os.path.join(workdir, 'processes'))
+    with open(os.path.join(workdir, 'processes', 'worker.py'), 'w', encoding='utf-8') as f:
+        f.write(SLEEPER)
+    hosts = ",".join(f"127.0.0.1:{port}" for port in ports)
+    sections = {
+        'logging': {'log_dir': 'logs', 'log_level': 'WARNING', 'use_console': 'false'},
+        'network': {'host': '127.0.0.1', 'port': ports[index], 'hosts': hosts, 'federation': 'true',
+                    'node': f'node{index}', 'timeout': TIMEOUT, 'gossip_interval': GOSSIP_INTERVAL,
+                    'peer_ttl': PEER_TTL},
+        'output': {'capture': 'false'},
+        'reload': {'watch': 'false'},
+        'process:worker': {'enable': 'true'},
+    }
+    with open(os.path.join(workdir, 'cfg.ini'), 'w', encoding='utf-8') as f:
+        for section, values in sections.items():
+            f.write(f'[{section}]\n' + ''.join(f'{key} = {value}\n' for key, value in values.items()))
+    env = {**os.environ, 'PYTHONPATH': ROOT_DIR}
+    # Отдельная группа процессов: узел убивается вместе со своими дочерними процессами
+    return subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, 'main.py')], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+@pytest.fixture(scope='module')
+def cluster(tmp_path_factory):
+    ports = free_ports(NODES)
+    nodes = [start_node(str(tmp_path_factory.mktemp(f'node{index}')), index, ports) for index in range(NODES)]
+    try:
+        yield ports, nodes
+    finally:
+        for node in nodes:
+            if node.poll() is None:
+                os.killpg(node.pid, signal.SIGTERM)
+        for node in nodes:
+            try:
+                node.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(node.pid, signal.SIGKILL)
+                node.wait()
+
+
+def view(port):
+    return request(port, 'cluster view', timeout=0.5)
+
+
+def test_view_converges(cluster):
+    ports, _ = cluster
+    for port in ports:
+        assert wait_for(lambda: view(port).splitlines()[0].endswith(f"Узлов: {NODES}, доступно: {NODES}"))
+    reply = view(ports[0])
+    for index in range(NODES):
+        assert f"[node{index}] версия" in reply
+    assert reply.count("worker=Running") == NODES
+
+
+def test_cluster_command_reaches_every_node(cluster):
+    ports, _ = cluster
+    reply = request(ports[0], 'cluster status processes')
+    assert reply.startswith("SUCCESS")
+    assert f"Узлов: {NODES}, ответили: {NODES}" in reply.splitlines()[0]
+    # Собственный адрес из hosts пропущен: каждый узел отвечает ровно один раз
+    for index in range(NODES):
+        assert reply.count(f"[node{index}]") == 1
+
+    reply = request(ports[0], 'cluster stop worker')
+    assert f"ответили: {NODES}" in reply.splitlines()[0]
+    for port in ports:
+        assert request(port, 'status worker').find("Stopped") >= 0
+    assert wait_for(lambda: view(ports[0]).count("worker=Stopped") == NODES)
+
+
+def test_killed_node_is_marked_lost(cluster):
+    ports, nodes = cluster
+    assert wait_for(lambda: view(ports[0]).splitlines()[0].endswith(f"доступно: {NODES}"))
+    os.killpg(nodes[-1].pid, signal.SIGKILL)
+    nodes[-1].wait()
+
+    started = time.monotonic()
+    reply = request(ports[0], 'cluster status processes', timeout=TIMEOUT * 3)
+    # Ответ не ждет убитый узел дольше timeout
+    assert time.monotonic() - started < TIMEOUT * 2
+    assert f"ответили: {NODES - 1}" in reply.splitlines()[0]
+    assert f"нет ответа за {TIMEOUT:g} с" in reply
+
+    assert wait_for(lambda: view(ports[0]).splitlines()[0].endswith(f"доступно: {NODES - 1}"),
+                    timeout=PEER_TTL + 5)
+    assert f"[node{NODES - 1}] недоступен" in view(ports[0])
@@ -0,0 +1,226 @@
+"""
+Запись потока блоков на носитель с отложенной записью (write-behind).
+
+Производитель копирует блоки в большой выровненный по странице буфер.
+Заполненный буфер ставится в ограниченную очередь, а фоновый поток пишет
+его в файл одним вызовом os.write. Буферы берутся из заранее выделенного
+пула; если пул исчерпан (носитель не успевает), блок отбрасывается
+и учитывается в счетчике dropped_blocks - производитель никогда не ждет.
+
+Размер буфера кратен странице, а файл - размеру буфера, поэтому все записи,
+кроме последней, выровнены по длине и смещению и допускают O_DIRECT
+(параметр direct). Файлы нумеруются последовательно (<prefix>NNNNNNNN<suffix>),
+индекс файлов (номер, первый байт потока, время открытия) ведется в
+<prefix>index.tsv. Старые файлы удаляются по max_files.
+"""
+import fcntl
+import logging
+import mmap
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.spectrum_store import cleanup_old_segments
+
+PAGE = mmap.PAGESIZE
+
+
+class WriteBehindWriter:
+    def __init__(self, output_dir: str, prefix: str = "str3_", suffix: str = ".raw",
+                 buffer_bytes: int = 4 * 1024 * 1024, queue_buffers: int = 8,
+                 file_bytes: int = 256 * 1024 * 1024, max_files: Optional[int] = None,
+                 direct: bool = False, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            output_dir: Каталог файлов
+            prefix: Начало имени файла
+            suffix: Расширение файла
+            buffer_bytes: Размер буфера (округляется вверх до страницы)
+            queue_buffers: Число буферов в пуле (глубина очереди записи)
+            file_bytes: Размер файла, после которого начинается новый (округляется до буфера)
+            max_files: Сколько последних файлов хранить (None - не удалять)
+            direct: Открывать файлы с O_DIRECT, если носитель это поддерживает
+            logger: Логгер (по умолчанию логгер модуля)
+        """
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.suffix = suffix
+        self.buffer_bytes = max(PAGE, (buffer_bytes + PAGE - 1) // PAGE * PAGE)
+        self.file_bytes = max(1, file_bytes // self.buffer_bytes) * self.buffer_bytes
+        self.max_files = max_files
+        self.direct = direct and hasattr(os, "O_DIRECT")
+        self.logger = logger or logging.getLogger(__name__)
+
+        # Анонимные отображения выровнены по странице, как требует O_DIRECT
+        self._free: "queue.Queue[mmap.mmap]" = queue.Queue()
+        for _ in range(max(2, queue_buffers)):
+            self._free.put(mmap.mmap(-1, self.buffer_bytes))
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._current: Optional[mmap.mmap] = None
+        self._filled = 0
+
+        self.accepted_bytes = 0
+        self.written_bytes = 0
+        self.dropped_blocks = 0
+        self.dropped_bytes = 0
+        self.files_opened = 0
+        self.write_seconds = 0.0
+        self.started = time.monotonic()
+        self.error: Optional[BaseException] = None
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._file_number = self._last_file_number() + 1
+        self._fd: Optional[int] = None
+        self._file_written = 0
+        self._thread = threading.Thread(target=self._writer_loop, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # --- производитель ---
+
+    def write(self, data) -> bool:
+        """
+        Копирует блок в текущий буфер; заполненные буферы уходят фоновому потоку.
+
+        Returns:
+            False, если свободных буферов нет и блок отброшен
+        """
+        view = memoryview(data).cast('B')
+        size = len(view)
+        if self._current is None and not self._take_buffer():
+            self._drop(size)
+            return False
+
+        offset = 0
+        while offset < size:
+            count = min(size - offset, self.buffer_bytes - self._filled)
+            self._current[self._filled:self._filled + count] = view[offset:offset + count]
+            self._filled += count
+            offset += count
+            if self._filled == self.buffer_bytes:
+                self._pending.put((self._current, self._filled))
+                self._current = None
+                if offset < size and not self._take_buffer():
+                    # Начало блока уже ушло в запись, хвост теряется
+                    self._drop(size - offset)
+                    return False
+        self.accepted_bytes += size
+        return True
+
+    def _take_buffer(self) -> bool:
+        try:
+            self._current = self._free.get_nowait()
+        except queue.Empty:
+            return False
+        self._filled = 0
+        return True
+
+    def _drop(self, size: int) -> None:
+        self.dropped_blocks += 1
+        self.dropped_bytes += size
+
+    def flush(self) -> None:
+        """Отдает фоновому потоку частично заполненный буфер."""
+        if self._current is not None and self._filled:
+            self._pending.put((self._current, self._filled))
+            self._current = None
+
+    def close(self) -> None:
+        """Дописывает все буферы, закрывает файл и останавливает фоновый поток."""
+        self.flush()
+        self._pending.put(None)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        """Скорость записи, глубина очереди и потери."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "mb_per_s": self.written_bytes / elapsed / 1e6,
+            "device_mb_per_s": self.written_bytes / self.write_seconds / 1e6 if self.write_seconds else 0.0,
+            "queue_depth": self._pending.qsize(),
+            "free_buffers": self._free.qsize(),
+            "dropped_blocks": self.dropped_blocks,
+            "dropped_bytes": self.dropped_bytes,
+            "files": self.files_opened,
+        }
+
+    # --- фоновый поток ---
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            buffer, length = item
+            try:
+                if self.error is None:
+                    self._write_buffer(buffer, length)
+            except Exception as e:
+                # Ошибка носителя: дальнейшие буферы отбрасываются, производитель продолжает работу
+                self.error = e
+                self.logger.error(f"Ошибка записи в {self.output_dir}: {e}")
+            finally:
+                self._free.put(buffer)
+        self._close_file()
+
+    def _write_buffer(self, buffer: mmap.mmap, length: int) -> None:
+        if self._fd is None or self._file_written >= self.file_bytes:
+            self._open_next_file()
+        if length % PAGE and self.direct:
+            # Последний неполный буфер O_DIRECT не примет
+            self._clear_direct()
+        started = time.monotonic()
+        view = memoryview(buffer)[:length]
+        written = 0
+        while written < length:
+            written += os.write(self._fd, view[written:])
+        view.release()
+        self.write_seconds += time.monotonic() - started
+        self.written_bytes += length
+        self._file_written += length
+
+    def _open_next_file(self) -> None:
+        self._close_file()
+        path = os.path.join(self.output_dir, f"{self.prefix}{self._file_number:08d}{self.suffix}")
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        if self.direct:
+            try:
+                self._fd = os.open(path, flags | os.O_DIRECT, 0o644)
+            except OSError as e:
+                self.logger.warning(f"O_DIRECT не поддерживается для {path}: {e}")
+                self.direct = False
+        if self._fd is None:
+            self._fd = os.open(path, flags, 0o644)
+        try:
+            # Резервируем место под весь файл, чтобы он не фрагментировался при росте
+            os.posix_fallocate(self._fd, 0, self.file_bytes)
+        except (AttributeError, OSError):
+            pass
+
+        with open(os.path.join(self.output_dir, f"{self.prefix}index.tsv"), "a", encoding="utf-8") as index:
+            index.write(f"{self._file_number}\t{self.written_bytes}\t{time.time():.6f}\n")
+        self.logger.info(f"Открыт файл {path}")
+        self._file_number += 1
+        self._file_written = 0
+        self.files_opened += 1
+        if self.max_files is not None:
+            cleanup_old_segments(self.output_dir, self.max_files, self.logger, self.prefix, self.suffix)
+
+    def _clear_direct(self) -> None:
+        flags = fcntl.fcntl(self._fd, fcntl.F_GETFL)
+        fcntl.fcntl(self._fd, fcntl.F_SETFL, flags & ~os.O_DIRECT)
+
+    def _close_file(self) -> None:
+        if self._fd is None:
+            return
+        # Отрезаем зарезервированный, но не записанный хвост
+        os.ftruncate(self._fd, self._file_written)
+        os.close(self._fd)
+        self._fd = None
+
+    def _last_file_number(self) -> int:
+        numbers = [int(name[len(self.prefix):-len(self.suffix)]) for name in os.listdir(self.output_dir)
+                   if name.startswith(self.prefix) and name.endswith(self.suffix)
+                   and name[len(self.prefix):-len(self.suffix)].isdigit()]
+        return max(numbers, default=0)
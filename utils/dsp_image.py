@@ -0,0 +1,241 @@
+"""
+Двоичный образ конфигурации ADAU1761 вместо списков в исходном коде.
+
+Формат (все поля big-endian):
+
+    заголовок  HEADER:  magic "DSPI", версия, флаги, число записей,
+                        размер записей в байтах, CRC32 записей,
+                        ожидаемый CRC программы (регистры R16 0x40C0-0x40C3)
+    записи     RECORD:  тип, резерв, адрес, длина; для записи регистров
+                        за ним следуют length байт данных, для задержки
+                        length - задержка в мс
+
+Загрузчик отображает файл в память (mmap) и передает данные секций
+в пакетную запись ADAU1761 без разбора Python-литералов. После загрузки
+CRC программы, записанный в образе, сверяется с регистрами R16 микросхемы.
+
+Образ собирается из экспорта SigmaStudio (заголовки *_IC_1.h, *_IC_1_PARAM.h,
+*_IC_1_REG.h с функцией default_download_IC_1) или из встроенной
+ADAU1761.default_download:
+
+    python -m utils.dsp_image convert -o default.dspimg IC_1.h IC_1_PARAM.h IC_1_REG.h
+    python -m utils.dsp_image convert -o default.dspimg --builtin
+    python -m utils.dsp_image info default.dspimg
+"""
+import mmap
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"DSPI"
+VERSION = 1
+HEADER = struct.Struct("!4sHHIIII")
+RECORD = struct.Struct("!BBHI")
+
+RECORD_WRITE = 1
+RECORD_DELAY = 2
+
+FLAG_PROGRAM_CRC = 0x0001
+
+# Регистры R16: ожидаемый CRC ОЗУ программы (4 байта) и включение проверки
+CRC_REGISTER = 0x40C0
+CRC_BYTES = 4
+
+
+class ImageError(ValueError):
+    pass
+
+
+def _program_crc(records) -> Optional[int]:
+    """Значение регистров 0x40C0-0x40C3 после выполнения записей (или None, если они не пишутся)."""
+    registers: Dict[int, int] = {}
+    for record in records:
+        if record[0] != "write" or record[1] < 0x4000:
+            continue
+        for offset, value in enumerate(bytes(record[2])):
+            registers[record[1] + offset] = value
+    if not all(CRC_REGISTER + index in registers for index in range(CRC_BYTES)):
+        return None
+    return int.from_bytes(bytes(registers[CRC_REGISTER + index] for index in range(CRC_BYTES)), "big")
+
+
+def build_image(records) -> bytes:
+    """Собирает образ из записей ("write", адрес, данные) и ("delay", мс)."""
+    body = bytearray()
+    for record in records:
+        if record[0] == "write":
+            data = bytes(record[2])
+            body += RECORD.pack(RECORD_WRITE, 0, record[1], len(data)) + data
+        elif record[0] == "delay":
+            body += RECORD.pack(RECORD_DELAY, 0, 0, int(record[1]))
+        else:
+            raise ImageError(f"Неизвестный тип записи: {record[0]}")
+    program_crc = _program_crc(records)
+    flags = FLAG_PROGRAM_CRC if program_crc is not None else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, len(records), len(body), zlib.crc32(body), program_crc or 0)
+    return header + bytes(body)
+
+
+def write_image(path: str, records) -> None:
+    with open(path, "wb") as f:
+        f.write(build_image(records))
+
+
+class DspImage:
+    """Образ, отображенный в память; данные записей - представления без копирования."""
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._map)
+        if len(self.view) < HEADER.size:
+            self.close()
+            raise ImageError(f"Файл '{path}' слишком короткий для образа DSP")
+        magic, version, self.flags, self.record_count, self.payload_size, self.payload_crc, crc = \
+            HEADER.unpack_from(self.view)
+        if magic != MAGIC or version != VERSION or HEADER.size + self.payload_size != len(self.view):
+            self.close()
+            raise ImageError(f"Файл '{path}' не является образом DSP версии {VERSION}")
+        self.program_crc = crc if self.flags & FLAG_PROGRAM_CRC else None
+        if verify and zlib.crc32(self.view[HEADER.size:]) != self.payload_crc:
+            self.close()
+            raise ImageError(f"Контрольная сумма образа '{path}' не совпадает")
+
+    def __iter__(self) -> Iterator[Tuple]:
+        """Записи ("write", адрес, memoryview) и ("delay", мс) в порядке выполнения."""
+        offset = HEADER.size
+        for _ in range(self.record_count):
+            kind, _, address, length = RECORD.unpack_from(self.view, offset)
+            offset += RECORD.size
+            if kind == RECORD_WRITE:
+                yield "write", address, self.view[offset:offset + length]
+                offset += length
+            elif kind == RECORD_DELAY:
+                yield "delay", length
+            else:
+                raise ImageError(f"Неизвестный тип записи {kind} в образе '{self.path}'")
+
+    def records(self) -> List[Tuple]:
+        return list(self)
+
+    def download(self, programmer) -> None:
+        """Передает все записи в пакетную запись ADAU1761 (задержки выполняются по месту)."""
+        for record in self:
+            if record[0] == "delay":
+                programmer.write_delay(record[1])
+            else:
+                programmer.write_register_block(record[1], record[2])
+        programmer.flush()
+
+    def check_crc(self, programmer) -> bool:
+        """Сверяет ожидаемый CRC программы из образа с регистрами R16 микросхемы."""
+        if self.program_crc is None:
+            return True
+        actual = int.from_bytes(programmer.read_register_block(CRC_REGISTER, CRC_BYTES), "big")
+        return actual == self.program_crc
+
+    def close(self) -> None:
+        if self._map is None:
+            return
+        self.view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Представления записей еще используются: отображение освободится вместе с ними
+            pass
+        self._map = None
+
+
+# --- конвертер экспорта SigmaStudio ---
+
+# re и argparse нужны только конвертеру и импортируются в нем, чтобы не замедлять старт загрузчика
+_DEFINE = r"^\s*#define\s+(\w+)\s+(\S+)"
+_ARRAY = r"ADI_REG_TYPE\s+(\w+)\s*\[[^\]]*\]\s*=\s*\{([^}]*)\}"
+_CALL = r"SIGMA_WRITE_(REGISTER_BLOCK|DELAY)\s*\(\s*(\w+)\s*,\s*(\w+)\s*,\s*(\w+)\s*(?:,\s*(\w+)\s*)?\)"
+_DOWNLOAD = r"void\s+default_download\w*\s*\([^)]*\)\s*\{(.*?)\n\}"
+
+
+def parse_sigmastudio(sources: List[str]) -> List[Tuple]:
+    """
+    Записи функции default_download из текстов заголовков экспорта SigmaStudio.
+
+    Макросы адресов и размеров и массивы данных могут находиться в любом из файлов.
+    """
+    import re
+
+    text = "\n".join(sources)
+    defines = dict(re.findall(_DEFINE, text, re.MULTILINE))
+    arrays = {name: bytes(int(value, 0) for value in body.replace("\n", " ").split(",") if value.strip())
+              for name, body in re.findall(_ARRAY, text, re.DOTALL)}
+
+    def resolve(name: str) -> int:
+        seen = set()
+        while name in defines and name not in seen:
+            seen.add(name)
+            name = defines[name]
+        try:
+            return int(name, 0)
+        except ValueError:
+            raise ImageError(f"Не удалось определить значение макроса {name}")
+
+    download = re.search(_DOWNLOAD, text, re.DOTALL)
+    if download is None:
+        raise ImageError("В экспорте не найдена функция default_download")
+
+    records = []
+    for kind, _, first, second, third in re.findall(_CALL, download.group(1)):
+        if kind == "REGISTER_BLOCK":
+            # SIGMA_WRITE_REGISTER_BLOCK(устройство, адрес, длина, данные)
+            data = arrays.get(third)
+            if data is None:
+                raise ImageError(f"Массив данных {third} не найден в экспорте")
+            records.append(("write", resolve(first), data[:resolve(second)]))
+        else:
+            # SIGMA_WRITE_DELAY(устройство, длина, данные) - задержка в мс big-endian
+            data = arrays.get(second)
+            if data is None:
+                raise ImageError(f"Массив задержки {second} не найден в экспорте")
+            records.append(("delay", int.from_bytes(data[:resolve(first)], "big")))
+    return records
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Образы конфигурации DSP ADAU1761")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="Собрать образ из экспорта SigmaStudio")
+    convert.add_argument("sources", nargs="*", help="Заголовки экспорта SigmaStudio (*.h)")
+    convert.add_argument("-o", "--output", required=True)
+    convert.add_argument("--builtin", action="store_true", help="Взять конфигурацию из ADAU1761.default_download")
+    info = commands.add_parser("info", help="Показать содержимое образа")
+    info.add_argument("image")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        if args.builtin:
+            from utils.dsp_shadow import default_records
+            records = default_records()
+        else:
+            sources = []
+            for path in args.sources:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    sources.append(f.read())
+            records = parse_sigmastudio(sources)
+        write_image(args.output, records)
+        print(f"Образ {args.output}: записей {len(records)}")
+    else:
+        image = DspImage(args.image)
+        crc = f"0x{image.program_crc:08X}" if image.program_crc is not None else "нет"
+        print(f"Записей {image.record_count}, данных {image.payload_size} байт, CRC программы {crc}")
+        for record in image:
+            if record[0] == "delay":
+                print(f"  задержка {record[1]} мс")
+            else:
+                print(f"  0x{record[1]:04X}: {len(record[2])} байт")
+        image.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Теневая копия регистров ADAU1761 и частичная перезагрузка DSP.
+
+Конфигурация DSP - последовательность записей ("write", адрес, данные)
+и задержек ("delay", мс), как в ADAU1761.default_download. Теневая копия
+хранит последнее известное значение каждого слова (адрес -> байты слова),
+сохраняется на диск и может быть прочитана из микросхемы.
+
+Новая конфигурация сравнивается с копией, и на шину уходят только
+изменившиеся слова:
+  - управляющие регистры пишутся напрямую в порядке конфигурации;
+  - слова ОЗУ параметров при работающем DSP пишутся через safeload
+    (без щелчков и остановки звука), иначе напрямую;
+  - при изменении программы DSP останавливается на время записи ОЗУ
+    программы и запускается снова.
+Если копия пуста (состояние неизвестно), выполняется полная загрузка
+с обязательными задержками.
+"""
+import contextlib
+import io
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.i2c import (ADAU1761, DSP_RUN_REGISTER, SAFELOAD_DATA, SAFELOAD_TRIGGER, word_size)
+
+# ("write", адрес, данные) или ("delay", задержка в мс)
+Record = Tuple
+
+# Объединять изменившиеся слова через неизменные, если разрыв не длиннее
+# накладных расходов новой транзакции (адрес устройства + 2 байта подадреса + START/STOP)
+MERGE_GAP_BYTES = 4
+
+
+def is_volatile(address: int) -> bool:
+    """Регистры safeload меняются при каждом safeload и в сравнении не участвуют."""
+    return SAFELOAD_DATA <= address <= SAFELOAD_TRIGGER
+
+
+def is_program(address: int) -> bool:
+    return 0x0800 <= address < 0x4000
+
+
+def is_parameter(address: int) -> bool:
+    """Слово ОЗУ параметров, которое можно записать через safeload (целевой адрес safeload - адрес - 1 >= 0)."""
+    return 0 < address < 0x0800 and not is_volatile(address)
+
+
+class _Recorder(ADAU1761):
+    # Записывает операции default_download вместо передачи на шину
+    def __init__(self):
+        self.records: List[Record] = []
+
+    def write_register_block(self, address, data):
+        data = bytes(data) if isinstance(data, (list, tuple, bytes, bytearray)) else bytes([data & 0xFF])
+        self.records.append(("write", address, data))
+        return True
+
+    def write_delay(self, delay_ms):
+        self.records.append(("delay", delay_ms))
+
+    def flush(self):
+        pass
+
+
+def default_records() -> List[Record]:
+    """Последовательность записей ADAU1761.default_download."""
+    recorder = _Recorder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        recorder.default_download()
+    return recorder.records
+
+
+def words_of(records: Iterable[Record]) -> Dict[int, bytes]:
+    """Итоговое значение каждого слова после выполнения записей (в порядке первого упоминания)."""
+    words: Dict[int, bytes] = {}
+    for record in records:
+        if record[0] != "write":
+            continue
+        _, address, data = record
+        size = word_size(address)
+        for offset in range(0, len(data), size):
+            words[address + offset // size] = bytes(data[offset:offset + size])
+    return words
+
+
+def apply_overrides(records: List[Record], overrides: Dict[int, bytes]) -> List[Record]:
+    """Добавляет к конфигурации записи поверх нее (например подстройка параметров)."""
+    return list(records) + [("write", address, data) for address, data in overrides.items()]
+
+
+def load_overrides(path: str) -> Dict[int, bytes]:
+    """
+    Читает файл подстройки: строки "0x0010: 00 80 00 00" (адрес и байты),
+    пустые строки и комментарии после # пропускаются.
+    """
+    overrides: Dict[int, bytes] = {}
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                address, data = line.split(':', 1)
+                overrides[int(address, 0)] = bytes.fromhex(data)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: некорректная строка подстройки: {e}")
+    return overrides
+
+
+class RegisterShadow:
+    def __init__(self, words: Optional[Dict[int, bytes]] = None, path: Optional[str] = None):
+        """
+        Args:
+            words: Известные значения слов (адрес -> байты)
+            path: Файл, в котором хранится копия
+        """
+        self.words: Dict[int, bytes] = dict(words or {})
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str) -> 'RegisterShadow':
+        """Загружает копию из файла; если файла нет, копия пуста."""
+        if not os.path.exists(path):
+            return cls(path=path)
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls({int(address, 16): bytes.fromhex(value) for address, value in raw.items()}, path=path)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Атомарно сохраняет копию (через временный файл и os.replace)."""
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({f"{address:04X}": value.hex() for address, value in sorted(self.words.items())}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    def read_from_chip(self, programmer: ADAU1761, addresses: Iterable[int]) -> None:
+        """Обновляет копию значениями из микросхемы (адреса читаются непрерывными диапазонами)."""
+        for address, count in _ranges(sorted(set(addresses))):
+            data = programmer.read_register_block(address, count)
+            size = word_size(address)
+            for index in range(count):
+                self.words[address + index] = data[index * size:(index + 1) * size]
+
+    def diff(self, target: Dict[int, bytes]) -> List[Tuple[int, bytes]]:
+        """
+        Изменившиеся слова target, сгруппированные в непрерывные блоки.
+
+        Блоки идут в порядке адресов target; неизменные слова между
+        изменившимися включаются в блок, если это дешевле новой транзакции.
+        """
+        runs: List[Tuple[int, bytearray]] = []
+        # Неизменные слова после последнего изменившегося в текущем непрерывном участке
+        gap: List[bytes] = []
+        last_changed = None
+        previous = None
+        for address, value in target.items():
+            if is_volatile(address):
+                previous = None
+                continue
+            size = word_size(address)
+            if previous is None or address != previous + 1 or word_size(previous) != size:
+                last_changed, gap = None, []
+            previous = address
+
+            if self.words.get(address) == value:
+                if last_changed is not None:
+                    gap.append(value)
+                continue
+            if last_changed is not None and len(gap) * size <= MERGE_GAP_BYTES:
+                runs[-1][1].extend(b"".join(gap) + value)
+            else:
+                runs.append((address, bytearray(value)))
+            last_changed, gap = address, []
+        return [(address, bytes(data)) for address, data in runs]
+
+    def update(self, target: Dict[int, bytes]) -> None:
+        for address, value in target.items():
+            if not is_volatile(address):
+                self.words[address] = value
+
+
+def _ranges(addresses: List[int]) -> List[Tuple[int, int]]:
+    """Разбивает отсортированные адреса на непрерывные диапазоны одного типа памяти."""
+    ranges: List[Tuple[int, int]] = []
+    for address in addresses:
+        if ranges:
+            start, count = ranges[-1]
+            if start + count == address and word_size(start) == word_size(address):
+                ranges[-1] = (start, count + 1)
+                continue
+        ranges.append((address, 1))
+    return ranges
+
+
+def apply_delta(programmer: ADAU1761, shadow: RegisterShadow, records: List[Record],
+                use_safeload: bool = True) -> Dict[str, int]:
+    """
+    Приводит DSP к конфигурации records, записывая только отличия от теневой копии.
+
+    Returns:
+        Счетчики: слов в конфигурации, изменившихся слов, блоков, safeload и признак полной загрузки
+    """
+    target = words_of(records)
+    if not shadow.words:
+        # Состояние микросхемы неизвестно: полная загрузка с обязательными задержками
+        for record in records:
+            if record[0] == "delay":
+                programmer.write_delay(record[1])
+            else:
+                programmer.write_register_block(record[1], record[2])
+        programmer.flush()
+        shadow.update(target)
+        return {"words": len(target), "changed": len(target), "blocks": len(records), "safeloads": 0, "full": 1}
+
+    runs = shadow.diff(target)
+    running = shadow.words.get(DSP_RUN_REGISTER) == b"\x01"
+    program_changed = any(is_program(address) for address, _ in runs)
+    stats = {"words": len(target), "blocks": len(runs), "safeloads": 0, "full": 0,
+             "changed": sum(1 for address, value in target.items()
+                            if not is_volatile(address) and shadow.words.get(address) != value)}
+
+    if program_changed and running:
+        programmer.write_register_block(DSP_RUN_REGISTER, 0x00)
+    for address, data in runs:
+        if address == DSP_RUN_REGISTER and program_changed:
+            # Запуск DSP выполняется после записи программы
+            continue
+        if use_safeload and running and not program_changed and is_parameter(address):
+            programmer.safeload(address, data)
+            stats["safeloads"] += -(-len(data) // 20)
+        else:
+            programmer.write_register_block(address, data)
+    if program_changed and target.get(DSP_RUN_REGISTER, b"\x01" if running else b"\x00") == b"\x01":
+        programmer.write_register_block(DSP_RUN_REGISTER, 0x01)
+    programmer.flush()
+
+    shadow.update(target)
+    return stats
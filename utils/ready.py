@@ -0,0 +1,36 @@
+"""
+Сигнал готовности дочернего процесса для ProcessManager.
+
+Для процессов с ready = notify ProcessManager передает в переменной
+окружения POPGM_READY_FD номер дескриптора записи канала (pipe).
+Процесс вызывает notify_ready(), когда инициализация закончена
+(подключены буферы, открыты файлы, настроено оборудование), и только
+после этого ProcessManager запускает зависящие от него процессы.
+Завершение процесса до сигнала означает, что он не смог запуститься.
+"""
+import os
+
+READY_FD_ENV = "POPGM_READY_FD"
+
+
+def notify_ready() -> bool:
+    """
+    Сообщает ProcessManager о готовности процесса (повторные вызовы ничего не делают).
+
+    Returns:
+        True, если сигнал отправлен; False, если процесс запущен без ожидания готовности
+    """
+    fd = os.environ.pop(READY_FD_ENV, None)
+    if fd is None:
+        return False
+    try:
+        os.write(int(fd), b"1")
+        return True
+    except (OSError, ValueError):
+        # ProcessManager уже перестал ждать (истекло время ожидания)
+        return False
+    finally:
+        try:
+            os.close(int(fd))
+        except (OSError, ValueError):
+            pass
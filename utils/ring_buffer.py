@@ -0,0 +1,242 @@
+"""
+Кольцевой буфер кадров в разделяемой памяти: один писатель, несколько читателей.
+
+Буфер создается и принадлежит ProcessManager. Дочерние процессы подключаются
+к нему по имени и геометрии, переданным в аргументах командной строки
+(--ring <спецификация> и --ring_consumer <номер читателя>), и получают кадры
+как представления NumPy поверх разделяемого блока без копирования.
+
+Блокировки не используются. Писатель публикует кадры увеличением счетчика
+write_seq, каждый читатель хранит свой read_seq в заголовке. Слот, в который
+сейчас пишет писатель, читателям недоступен, поэтому полезная емкость буфера
+равна slots - 1 кадрам. Если читатель отстал больше чем на емкость, его позиция
+переносится на самый старый доступный кадр, а пропущенные кадры учитываются
+в счетчиках переполнений.
+
+Счетчики write_seq и read_seq - 64-битные слова, которые пишутся одной
+инструкцией и читаются без блокировок. Это атомарно только на 64-битных
+платформах (x86_64, aarch64): на 32-битных (armv7l, i686) запись слова может
+быть разорвана пополам, и читатель увидит несуществующую позицию. Поэтому
+буфер поддерживается только в 64-битном интерпретаторе, create отказывает
+на остальных.
+"""
+import sys
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = 0x52494E4731  # "RING1"
+HEADER_WORDS = 8
+CONSUMER_WORDS = 4
+DATA_ALIGN = 64
+
+# Слова общего заголовка
+_MAGIC, _SLOTS, _FRAME_SAMPLES, _CHANNELS, _DTYPE, _WRITE_SEQ, _CONSUMERS = range(7)
+# Слова заголовка читателя
+_READ_SEQ, _OVERRUNS, _DROPPED, _MAX_LAG = range(CONSUMER_WORDS)
+
+DTYPES = {1: np.int16, 2: np.int32, 3: np.float32}
+DTYPE_CODES = {np.dtype(dtype): code for code, dtype in DTYPES.items()}
+
+
+def dtype_for_bit_depth(bit_depth: int) -> np.dtype:
+    """Тип отсчета АЦП по разрядности (24-битные отсчеты хранятся в int32)."""
+    return np.dtype(np.int16 if int(bit_depth) <= 16 else np.int32)
+
+
+class RingBuffer:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        self.slots = int(self.header[_SLOTS])
+        self.frame_samples = int(self.header[_FRAME_SAMPLES])
+        self.channels = int(self.header[_CHANNELS])
+        self.dtype = np.dtype(DTYPES[int(self.header[_DTYPE])])
+        self.max_consumers = int(self.header[_CONSUMERS])
+        self.consumers = np.ndarray((self.max_consumers, CONSUMER_WORDS), dtype=np.uint64,
+                                    buffer=shm.buf, offset=HEADER_WORDS * 8)
+        self.frames = np.ndarray((self.slots, self.frame_samples, self.channels), dtype=self.dtype,
+                                 buffer=shm.buf, offset=self._data_offset(self.max_consumers))
+
+    @staticmethod
+    def _data_offset(max_consumers: int) -> int:
+        header_bytes = (HEADER_WORDS + max_consumers * CONSUMER_WORDS) * 8
+        return (header_bytes + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+
+    @classmethod
+    def create(cls, slots: int, frame_samples: int, channels: int = 1, dtype=np.int16,
+               max_consumers: int = 4, name: Optional[str] = None) -> 'RingBuffer':
+        """
+        Создает новый буфер (вызывается владельцем - ProcessManager).
+
+        Raises:
+            RuntimeError: На 32-битной платформе (см. описание модуля)
+        """
+        dtype = np.dtype(dtype)
+        if sys.maxsize <= 2 ** 32:
+            raise RuntimeError("Кольцевой буфер требует 64-битной платформы: "
+                               "счетчики write_seq и read_seq на 32-битной могут читаться разорванными")
+        if slots < 2:
+            raise ValueError("Кольцевой буфер должен содержать минимум 2 слота")
+        size = cls._data_offset(max_consumers) + slots * frame_samples * channels * dtype.itemsize
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[_MAGIC] = MAGIC
+        header[_SLOTS] = slots
+        header[_FRAME_SAMPLES] = frame_samples
+        header[_CHANNELS] = channels
+        header[_DTYPE] = DTYPE_CODES[dtype]
+        header[_CONSUMERS] = max_consumers
+        np.ndarray((max_consumers * CONSUMER_WORDS,), dtype=np.uint64, buffer=shm.buf,
+                   offset=HEADER_WORDS * 8)[:] = 0
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, spec: str) -> 'RingBuffer':
+        """
+        Подключается к существующему буферу по спецификации из spec().
+
+        Raises:
+            ValueError: Если геометрия буфера не совпадает со спецификацией
+        """
+        name, slots, frame_samples, channels, dtype = spec.split(':')
+        shm = shared_memory.SharedMemory(name=name)
+        # Буфером владеет ProcessManager: не даем resource_tracker дочернего
+        # процесса удалить блок при его завершении
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        ring = cls(shm, owner=False)
+        expected = (int(slots), int(frame_samples), int(channels), np.dtype(dtype))
+        if int(ring.header[_MAGIC]) != MAGIC or (ring.slots, ring.frame_samples, ring.channels, ring.dtype) != expected:
+            ring.close()
+            raise ValueError(f"Геометрия кольцевого буфера '{name}' не совпадает со спецификацией {spec}")
+        return ring
+
+    def spec(self) -> str:
+        """Имя и геометрия буфера для передачи дочерним процессам."""
+        return f"{self.shm.name}:{self.slots}:{self.frame_samples}:{self.channels}:{self.dtype.name}"
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.frame_samples * self.channels * self.dtype.itemsize
+
+    @property
+    def write_seq(self) -> int:
+        return int(self.header[_WRITE_SEQ])
+
+    # --- писатель ---
+
+    def claim(self) -> np.ndarray:
+        """Представление слота, в который будет записан следующий кадр."""
+        return self.frames[int(self.header[_WRITE_SEQ]) % self.slots]
+
+    def commit(self, count: int = 1) -> None:
+        """Публикует записанные кадры."""
+        self.header[_WRITE_SEQ] += count
+
+    def write(self, frame) -> None:
+        """Копирует кадр в буфер и публикует его."""
+        self.claim()[...] = np.asarray(frame).reshape(self.frame_samples, self.channels)
+        self.commit()
+
+    # --- читатели ---
+
+    def consumer(self, index: int) -> 'RingConsumer':
+        if not 0 <= index < self.max_consumers:
+            raise ValueError(f"Номер читателя {index} вне диапазона 0..{self.max_consumers - 1}")
+        return RingConsumer(self, index)
+
+    def stats(self) -> List[Dict[str, int]]:
+        """Позиция, отставание и счетчики переполнений каждого читателя."""
+        write_seq = self.write_seq
+        return [
+            {
+                'read_seq': int(row[_READ_SEQ]),
+                'lag': write_seq - int(row[_READ_SEQ]),
+                'max_lag': int(row[_MAX_LAG]),
+                'overruns': int(row[_OVERRUNS]),
+                'dropped': int(row[_DROPPED]),
+            }
+            for row in self.consumers
+        ]
+
+    def close(self) -> None:
+        """Отключается от буфера; владелец также удаляет разделяемый блок."""
+        self.header = self.consumers = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingConsumer:
+    """Читатель кольцевого буфера со своей позицией и счетчиками в заголовке."""
+
+    def __init__(self, ring: RingBuffer, index: int):
+        self.ring = ring
+        self.index = index
+        self.row = ring.consumers[index]
+        self._pending: Optional[Tuple[int, int]] = None
+
+    def seek_latest(self) -> None:
+        """Начинает чтение с текущей позиции писателя (пропуская историю)."""
+        self.row[_READ_SEQ] = self.ring.header[_WRITE_SEQ]
+
+    @property
+    def position(self) -> int:
+        """Номер следующего кадра, который вернет acquire()."""
+        return int(self.row[_READ_SEQ])
+
+    def available(self) -> int:
+        return self.ring.write_seq - int(self.row[_READ_SEQ])
+
+    def acquire(self, max_frames: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Возвращает представление подряд идущих непрочитанных кадров формы
+        (n, frame_samples, channels) без копирования или None, если данных нет.
+        После обработки нужно вызвать release().
+        """
+        ring = self.ring
+        write_seq = ring.write_seq
+        read_seq = int(self.row[_READ_SEQ])
+        lag = write_seq - read_seq
+        if lag > int(self.row[_MAX_LAG]):
+            self.row[_MAX_LAG] = lag
+        if lag >= ring.slots:
+            # Писатель обогнал читателя: переносимся на самый старый целый кадр
+            oldest = write_seq - ring.slots + 1
+            self.row[_OVERRUNS] += 1
+            self.row[_DROPPED] += oldest - read_seq
+            read_seq = oldest
+            self.row[_READ_SEQ] = read_seq
+            lag = write_seq - read_seq
+        if lag <= 0:
+            return None
+
+        start = read_seq % ring.slots
+        count = min(lag, ring.slots - start)
+        if max_frames is not None:
+            count = min(count, max_frames)
+        self._pending = (read_seq, count)
+        return ring.frames[start:start + count]
+
+    def release(self) -> bool:
+        """
+        Отмечает кадры из acquire() прочитанными.
+
+        Returns:
+            False, если писатель перезаписал кадры во время их обработки
+            (они учитываются как потерянные)
+        """
+        if self._pending is None:
+            return True
+        read_seq, count = self._pending
+        self._pending = None
+        intact = self.ring.write_seq - read_seq < self.ring.slots
+        if not intact:
+            self.row[_OVERRUNS] += 1
+            self.row[_DROPPED] += count
+        self.row[_READ_SEQ] = read_seq + count
+        return intact
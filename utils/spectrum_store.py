@@ -0,0 +1,258 @@
+"""
+Хранилище спектров fft: сегменты только для дозаписи в output_dir.
+
+Сегмент - файл spectra_<время создания, нс>.seg фиксированного размера
+со столбцовой раскладкой:
+
+    [заголовок HEADER_BYTES][индекс времени int64 x capacity][спектры float32 x capacity x channels x bins]
+
+Файл создается разреженным (ftruncate), поэтому незаполненная часть
+не занимает место на карте памяти. Писатель отображает сегмент в память
+и публикует строки увеличением счетчика rows в заголовке после записи
+данных, читатели открывают сегменты через np.memmap и вырезают нужный
+диапазон времени по индексу (searchsorted) без чтения файла целиком.
+
+Новый сегмент начинается, когда текущий заполнен (segment_bytes) или
+прошло segment_seconds. Лишние старые сегменты удаляются по max_files
+так же, как LoggerManager._cleanup_old_logs удаляет старые лог-файлы.
+"""
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = 0x3147455343455053  # "SPECSEG1"
+VERSION = 1
+HEADER_BYTES = 4096
+HEADER_WORDS = 16
+PAGE = 4096
+PREFIX = "spectra_"
+SUFFIX = ".seg"
+
+# Слова заголовка (int64); частоты хранятся как float64 в тех же словах
+_MAGIC, _VERSION, _BINS, _CHANNELS, _CAPACITY, _ROWS, _CREATED, _FREQ_START, _FREQ_STEP = range(9)
+
+
+def _align(value: int) -> int:
+    return (value + PAGE - 1) // PAGE * PAGE
+
+
+def cleanup_old_segments(output_dir: str, max_files: int, logger: Optional[logging.Logger] = None,
+                         prefix: str = PREFIX, suffix: str = SUFFIX) -> None:
+    """Оставляет в output_dir не больше max_files последних файлов prefix*suffix."""
+    logger = logger or logging.getLogger(__name__)
+    try:
+        segments = [name for name in os.listdir(output_dir) if name.startswith(prefix) and name.endswith(suffix)]
+
+        if len(segments) > max_files:
+            # Имена содержат время создания или номер с ведущими нулями, поэтому сортируются по времени
+            segments.sort()
+            files_to_delete = segments[:-max_files]
+
+            for filename in files_to_delete:
+                try:
+                    os.remove(os.path.join(output_dir, filename))
+                    logger.debug(f"Удален старый файл данных: {filename}")
+                except Exception as e:
+                    logger.warning(f"Не удалось удалить старый файл данных {filename}: {e}")
+
+    except Exception as e:
+        logger.warning(f"Ошибка при очистке старых файлов данных в {output_dir}: {e}")
+
+
+def frame_timestamps(count: int, hop_ns: int, now_ns: Optional[int] = None) -> np.ndarray:
+    """Метки времени count последних кадров: последний кадр - сейчас, предыдущие - с шагом hop_ns назад."""
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    return now_ns - np.arange(count - 1, -1, -1, dtype=np.int64) * hop_ns
+
+
+class SpectrumSegment:
+    """Один сегмент, отображенный в память."""
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r+' if writable else 'r')
+        self.header = self._map[:HEADER_WORDS * 8].view(np.int64)
+        if int(self.header[_MAGIC]) != MAGIC or int(self.header[_VERSION]) != VERSION:
+            raise ValueError(f"Файл '{path}' не является сегментом спектров")
+        self.bins = int(self.header[_BINS])
+        self.channels = int(self.header[_CHANNELS])
+        self.capacity = int(self.header[_CAPACITY])
+        self.created_ns = int(self.header[_CREATED])
+        self.frequency_start, self.frequency_step = (float(value) for value in
+                                                     self.header[_FREQ_START:_FREQ_STEP + 1].view(np.float64))
+
+        index_offset = HEADER_BYTES
+        data_offset = index_offset + _align(self.capacity * 8)
+        self.timestamps = self._map[index_offset:index_offset + self.capacity * 8].view(np.int64)
+        row_bytes = self.channels * self.bins * 4
+        self.data = self._map[data_offset:data_offset + self.capacity * row_bytes].view(np.float32) \
+            .reshape(self.capacity, self.channels, self.bins)
+
+    @classmethod
+    def create(cls, path: str, bins: int, channels: int, capacity: int, created_ns: int,
+               frequency_start: float = 0.0, frequency_step: float = 0.0) -> 'SpectrumSegment':
+        size = HEADER_BYTES + _align(capacity * 8) + capacity * channels * bins * 4
+        with open(path, 'wb') as f:
+            # Разреженный файл: место на носителе занимают только записанные страницы
+            os.ftruncate(f.fileno(), size)
+            header = np.zeros(HEADER_WORDS, dtype=np.int64)
+            header[[_MAGIC, _VERSION, _BINS, _CHANNELS, _CAPACITY, _ROWS, _CREATED]] = \
+                [MAGIC, VERSION, bins, channels, capacity, 0, created_ns]
+            header[_FREQ_START:_FREQ_STEP + 1].view(np.float64)[:] = [frequency_start, frequency_step]
+            f.write(header.tobytes())
+        return cls(path, writable=True)
+
+    @property
+    def rows(self) -> int:
+        """Число опубликованных строк (растет, пока сегмент дописывается)."""
+        return int(self.header[_ROWS])
+
+    def slice(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Строки с временем в диапазоне [start_ns, end_ns) без копирования.
+
+        Returns:
+            (метки времени формы (n,), спектры формы (n, channels, bins))
+        """
+        rows = self.rows
+        timestamps = self.timestamps[:rows]
+        first = 0 if start_ns is None else int(np.searchsorted(timestamps, start_ns, side='left'))
+        last = rows if end_ns is None else int(np.searchsorted(timestamps, end_ns, side='left'))
+        return timestamps[first:last], self.data[first:last]
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        self.header = self.timestamps = self.data = None
+        self._map = None
+
+
+class SpectrumWriter:
+    def __init__(self, output_dir: str, bins: int, channels: int = 1, segment_bytes: int = 64 * 1024 * 1024,
+                 segment_seconds: float = 3600.0, max_files: Optional[int] = None,
+                 frequency_start: float = 0.0, frequency_step: float = 0.0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            output_dir: Каталог сегментов
+            bins: Число бинов в спектре
+            channels: Число каналов
+            segment_bytes: Размер сегмента, при заполнении которого начинается новый
+            segment_seconds: Длительность сегмента, после которой начинается новый
+            max_files: Сколько последних сегментов хранить (None - не удалять)
+            frequency_start: Частота первого бина, Гц (сохраняется в заголовке)
+            frequency_step: Шаг частот между бинами, Гц
+            logger: Логгер (по умолчанию логгер модуля)
+        """
+        self.output_dir = output_dir
+        self.bins = int(bins)
+        self.channels = int(channels)
+        self.capacity = max(1, (segment_bytes - HEADER_BYTES) // (8 + self.channels * self.bins * 4))
+        self.segment_ns = int(segment_seconds * 1e9)
+        self.max_files = max_files
+        self.frequency_start = frequency_start
+        self.frequency_step = frequency_step
+        self.logger = logger or logging.getLogger(__name__)
+        self.segment: Optional[SpectrumSegment] = None
+        self.rows_total = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def append(self, spectra: np.ndarray, timestamps: np.ndarray) -> None:
+        """
+        Дописывает спектры формы (n, channels, bins) с метками времени (нс) формы (n,).
+        Метки времени должны не убывать.
+        """
+        spectra = np.asarray(spectra, dtype=np.float32).reshape(-1, self.channels, self.bins)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        written = 0
+        while written < len(spectra):
+            segment = self._segment_for(int(timestamps[written]))
+            rows = segment.rows
+            count = min(len(spectra) - written, segment.capacity - rows)
+            segment.data[rows:rows + count] = spectra[written:written + count]
+            segment.timestamps[rows:rows + count] = timestamps[written:written + count]
+            # Строки становятся видны читателям только после записи данных
+            segment.header[_ROWS] = rows + count
+            written += count
+        self.rows_total += written
+
+    def _segment_for(self, timestamp_ns: int) -> SpectrumSegment:
+        segment = self.segment
+        if segment is not None and segment.rows < segment.capacity \
+                and timestamp_ns - segment.created_ns < self.segment_ns:
+            return segment
+
+        self._close_segment()
+        path = os.path.join(self.output_dir, f"{PREFIX}{timestamp_ns:020d}{SUFFIX}")
+        self.segment = SpectrumSegment.create(path, self.bins, self.channels, self.capacity, timestamp_ns,
+                                              self.frequency_start, self.frequency_step)
+        self.logger.info(f"Начат сегмент спектров {path} (строк {self.capacity})")
+        if self.max_files is not None:
+            cleanup_old_segments(self.output_dir, self.max_files, self.logger)
+        return self.segment
+
+    def _close_segment(self) -> None:
+        if self.segment is not None:
+            self.segment.flush()
+            self.segment.close()
+            self.segment = None
+
+    def close(self) -> None:
+        self._close_segment()
+
+
+class SpectrumReader:
+    """Чтение диапазонов времени из всех сегментов каталога."""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._segments: Dict[str, SpectrumSegment] = {}
+
+    def segment_paths(self) -> List[str]:
+        names = sorted(name for name in os.listdir(self.output_dir) if name.startswith(PREFIX) and name.endswith(SUFFIX))
+        return [os.path.join(self.output_dir, name) for name in names]
+
+    def segments(self) -> List[SpectrumSegment]:
+        """Открытые сегменты по возрастанию времени; удаленные при очистке забываются."""
+        paths = self.segment_paths()
+        for path in set(self._segments) - set(paths):
+            self._segments.pop(path).close()
+        for path in paths:
+            if path not in self._segments:
+                self._segments[path] = SpectrumSegment(path)
+        return [self._segments[path] for path in paths]
+
+    def read(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Спектры с временем в диапазоне [start_ns, end_ns) из всех сегментов.
+
+        Returns:
+            (метки времени формы (n,), спектры формы (n, channels, bins));
+            если диапазон целиком в одном сегменте, это представления без копирования
+        """
+        parts = []
+        segments = self.segments()
+        for index, segment in enumerate(segments):
+            # Сегменты упорядочены по времени: пропускаем заведомо не попадающие в диапазон
+            if start_ns is not None and index + 1 < len(segments) and segments[index + 1].created_ns <= start_ns:
+                continue
+            if end_ns is not None and segment.created_ns >= end_ns:
+                break
+            timestamps, spectra = segment.slice(start_ns, end_ns)
+            if len(timestamps):
+                parts.append((timestamps, spectra))
+
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0, 0), dtype=np.float32)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def close(self) -> None:
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
@@ -0,0 +1,231 @@
+"""
+Потоковое STFT для процесса fft.
+
+Отсчеты поступают блоками произвольной длины и дописываются в заранее
+выделенный рабочий буфер после хвоста предыдущего блока. Накопленные
+данные режутся на перекрывающиеся окна через strided-представление
+(без цикла по кадрам на Python), и все кадры блока считаются одним
+вызовом numpy.fft.rfft. Окно, масштаб и диапазон бинов вычисляются один
+раз при создании; план БПФ для фиксированной длины окна кэшируется
+самим pocketfft внутри NumPy.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+def parse_frequency_range(value: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Разбирает диапазон частот вида '1-1500' в пару (1.0, 1500.0)."""
+    if value is None or str(value).strip() == "":
+        return None
+    low, high = str(value).split('-', 1)
+    low, high = float(low), float(high)
+    if low < 0 or high <= low:
+        raise ValueError(f"Некорректный диапазон частот: {value}")
+    return low, high
+
+
+class StreamingSTFT:
+    def __init__(self, window_size: int, overlap: float, sample_rate: float,
+                 frequency_range: Optional[Tuple[float, float]] = None, channels: int = 1):
+        """
+        Args:
+            window_size: Длина окна БПФ в отсчетах
+            overlap: Доля перекрытия соседних окон (0 <= overlap < 1)
+            sample_rate: Частота дискретизации, Гц
+            frequency_range: Диапазон частот (Гц), бины вне которого отбрасываются
+            channels: Число каналов во входных блоках
+        """
+        self.window_size = int(window_size)
+        self.sample_rate = float(sample_rate)
+        self.channels = int(channels)
+        self.hop, self.bin_start, self.bin_stop = frame_geometry(self.window_size, overlap, self.sample_rate,
+                                                                 frequency_range)
+
+        self.window = np.hanning(self.window_size).astype(np.float32)
+        # Амплитудный масштаб одностороннего спектра с учетом окна
+        self.scale = np.float32(2.0 / self.window.sum())
+
+        freqs = np.fft.rfftfreq(self.window_size, d=1.0 / self.sample_rate)
+        self.frequencies = freqs[self.bin_start:self.bin_stop].astype(np.float32)
+
+        # Рабочий буфер хранится по каналам, чтобы каждое окно было непрерывным в памяти
+        self._buffer = np.empty((self.channels, self.window_size * 2), dtype=np.float32)
+        self._filled = 0
+        self.frames_total = 0
+
+    @property
+    def bins(self) -> int:
+        return self.bin_stop - self.bin_start
+
+    def push(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Добавляет блок отсчетов и возвращает спектры всех завершенных кадров.
+
+        Args:
+            samples: Массив формы (n,) или (n, channels)
+
+        Returns:
+            Амплитудные спектры формы (кадры, каналы, бины) в float32
+        """
+        self._append(samples)
+        count = 0 if self._filled < self.window_size else 1 + (self._filled - self.window_size) // self.hop
+        if count == 0:
+            return np.empty((0, self.channels, self.bins), dtype=np.float32)
+
+        magnitude = self._transform(0, count)
+        # Хвост, нужный следующим кадрам, переносится в начало буфера
+        self._discard(count * self.hop)
+        self.frames_total += count
+        return magnitude
+
+    def reset(self) -> None:
+        self._filled = 0
+
+    def _append(self, samples: np.ndarray) -> None:
+        samples = np.asarray(samples).reshape(-1, self.channels)
+        needed = self._filled + len(samples)
+        capacity = self._buffer.shape[1]
+        if needed > capacity:
+            grown = np.empty((self.channels, max(needed, 2 * capacity)), dtype=np.float32)
+            grown[:, :self._filled] = self._buffer[:, :self._filled]
+            self._buffer = grown
+        self._buffer[:, self._filled:needed] = samples.T
+        self._filled = needed
+
+    def _discard(self, count: int) -> None:
+        """Удаляет из начала буфера count отсчетов, которые больше не понадобятся."""
+        count = min(count, self._filled)
+        self._buffer[:, :self._filled - count] = self._buffer[:, count:self._filled]
+        self._filled -= count
+
+    def _transform(self, offset: int, count: int) -> np.ndarray:
+        """Спектры count кадров, первый из которых начинается с отсчета offset буфера."""
+        # (кадры, каналы, окно) - представление рабочего буфера без копирования
+        channel_stride, sample_stride = self._buffer.strides
+        frames = as_strided(self._buffer[:, offset:], shape=(count, self.channels, self.window_size),
+                            strides=(self.hop * sample_stride, channel_stride, sample_stride), writeable=False)
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)[..., self.bin_start:self.bin_stop]
+        magnitude = np.abs(spectrum).astype(np.float32, copy=False)
+        magnitude *= self.scale
+        return magnitude
+
+
+class StripedSTFT(StreamingSTFT):
+    """
+    STFT для одного исполнителя из пула.
+
+    Поток кадров делится на пачки по chunk_frames кадров. Пачка с номером k
+    начинается с абсолютного отсчета k * chunk_frames * hop и принадлежит
+    исполнителю k % workers. Каждый исполнитель получает весь поток отсчетов,
+    но считает только свои пачки, поэтому пачки разных исполнителей
+    не зависят друг от друга и их можно собрать по номеру.
+    """
+
+    def __init__(self, window_size: int, overlap: float, sample_rate: float,
+                 frequency_range: Optional[Tuple[float, float]] = None, channels: int = 1,
+                 chunk_frames: int = 8, index: int = 0, workers: int = 1):
+        super().__init__(window_size, overlap, sample_rate, frequency_range, channels)
+        self.chunk_frames = int(chunk_frames)
+        self.index = int(index)
+        self.workers = int(workers)
+        self.chunk_step = self.chunk_frames * self.hop
+        self.chunk_span = (self.chunk_frames - 1) * self.hop + self.window_size
+        self._base: Optional[int] = None
+        self._next_chunk = 0
+
+    def push(self, samples: np.ndarray, start_index: int) -> List[Tuple[int, np.ndarray]]:
+        """
+        Добавляет блок отсчетов, начинающийся с абсолютного отсчета start_index.
+
+        Returns:
+            Список (номер пачки, спектры формы (chunk_frames, каналы, бины))
+            для всех завершенных пачек этого исполнителя
+        """
+        if self._base is None or start_index != self._base + self._filled:
+            # Первый блок или разрыв потока (переполнение буфера источника)
+            self._filled = 0
+            self._base = start_index
+            first = -(-start_index // self.chunk_step)
+            self._next_chunk = first + (self.index - first) % self.workers
+        self._append(samples)
+
+        results = []
+        while True:
+            offset = self._next_chunk * self.chunk_step - self._base
+            if offset + self.chunk_span > self._filled:
+                break
+            results.append((self._next_chunk, self._transform(offset, self.chunk_frames)))
+            self.frames_total += self.chunk_frames
+            self._next_chunk += self.workers
+
+        drop = max(0, min(self._next_chunk * self.chunk_step - self._base, self._filled))
+        self._discard(drop)
+        self._base += drop
+        return results
+
+
+class ReorderBuffer:
+    """
+    Выдает результаты исполнителей строго по возрастанию номера.
+
+    Если недостающий номер не пришел, а ожидающих результатов накопилось
+    больше max_pending, номер считается потерянным и пропускается.
+    """
+
+    def __init__(self, max_pending: int = 64, warmup: int = 1):
+        """
+        Args:
+            max_pending: Предел ожидающих результатов до пропуска недостающего номера
+            warmup: Сколько результатов накопить, прежде чем выбрать начальный номер
+                    (исполнители стартуют не одновременно)
+        """
+        self.max_pending = max_pending
+        self.warmup = warmup
+        self.next_seq: Optional[int] = None
+        self.skipped = 0
+        self.late = 0
+        self._pending: Dict[int, object] = {}
+
+    def put(self, seq: int, item) -> None:
+        if self.next_seq is not None and seq < self.next_seq:
+            self.late += 1
+            return
+        self._pending[seq] = item
+
+    def pop_ready(self) -> List[Tuple[int, object]]:
+        if self.next_seq is None:
+            if len(self._pending) < self.warmup:
+                return []
+            self.next_seq = min(self._pending)
+
+        ready = []
+        while True:
+            item = self._pending.pop(self.next_seq, None)
+            if item is None:
+                if len(self._pending) <= self.max_pending:
+                    break
+                following = min(self._pending)
+                self.skipped += following - self.next_seq
+                self.next_seq = following
+                continue
+            ready.append((self.next_seq, item))
+            self.next_seq += 1
+        return ready
+
+
+def frame_geometry(window_size: int, overlap: float, sample_rate: float,
+                   frequency_range: Optional[Tuple[float, float]] = None) -> Tuple[int, int, int]:
+    """
+    Шаг кадров и полуинтервал [bin_start, bin_stop) бинов в диапазоне частот
+    для заданных параметров STFT (используется и схемой конфигурации fft).
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError(f"Перекрытие должно быть в диапазоне [0, 1): {overlap}")
+    hop = max(1, int(round(window_size * (1 - overlap))))
+    freqs = np.fft.rfftfreq(window_size, d=1.0 / sample_rate)
+    if frequency_range is None:
+        return hop, 0, len(freqs)
+    low, high = frequency_range
+    return hop, int(np.searchsorted(freqs, low, side='left')), int(np.searchsorted(freqs, high, side='right'))